@@ -0,0 +1,77 @@
+"""Compares the size and the write and read throughput of plain, gzip compressed and BTLZ (zip) BTLx files.
+
+Usage:
+
+    python scripts/benchmark_btlx_compression.py [path/to/model.btlx] [--copies N] [--levels 1 6 9] [--repeat N]
+
+Defaults to the BTLx file of the test model in the data folder. To get a file of a more realistic size, the elements of
+the model are added ``--copies`` times, each copy shifted along the x axis. Throughput is given in MB of uncompressed
+XML per second.
+
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from compas.geometry import Translation
+
+import compas_timber
+from compas_timber.btlx import BTLxReader
+from compas_timber.fabrication import BTLxWriter
+from compas_timber.model import TimberModel
+
+
+def scaled_model(path, copies):
+    source = BTLxReader().read(path)
+    model = TimberModel(tolerance=source.tolerance)
+    for index in range(copies):
+        shift = Translation.from_vector([index * 20000.0, 0, 0])
+        for beam in source.beams:
+            copy = beam.copy()
+            copy.frame.transform(shift)
+            copy.features = [feature.copy() for feature in beam.features]
+            model.add_element(copy)
+    return model
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.path.join(compas_timber.DATA, "model_test.btlx"))
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = scaled_model(args.path, args.copies)
+    writer = BTLxWriter()
+    megabytes = len(writer.model_to_xml(model).encode("utf-8")) / 1e6
+    print("{} parts, {:.2f} MB of XML".format(len(model.beams), megabytes))
+
+    variants = [("plain", None, None)]
+    variants += [("gzip", "gzip", level) for level in args.levels]
+    variants += [("btlz", "zip", level) for level in args.levels]
+
+    print("{:<6} {:>5} {:>10} {:>7} {:>12} {:>12}".format("format", "level", "size [MB]", "ratio", "write [MB/s]", "read [MB/s]"))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, compression, level in variants:
+            file_path = os.path.join(directory, "model_{}_{}".format(name, level))
+            write = best_of(args.repeat, lambda: writer.write(model, file_path, compression=compression, compression_level=level or 6))
+            written = [os.path.join(directory, file) for file in os.listdir(directory) if file.startswith(os.path.basename(file_path))][0]
+            read = best_of(args.repeat, lambda: BTLxReader().read(written))
+            size = os.path.getsize(written) / 1e6
+            print("{:<6} {:>5} {:>10.2f} {:>7.1f} {:>12.1f} {:>12.1f}".format(name, level or "-", size, megabytes / size, megabytes / write, megabytes / read))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measures the time it takes to serialize one processing of every BTLx processing type.
+
+Usage:
+
+    python scripts/benchmark_btlx_processings.py [--number N]
+
+For every processing type, an instance with default parameters is serialized with ``BTLxProcessingParams.as_dict()``
+and into a processing XML element with the writer. For reference, ``generic`` formats the parameters the way they were
+formatted before the serializers were compiled per processing class: looking up each attribute by name and dispatching
+on the type of its value.
+
+"""
+
+import argparse
+import timeit
+from collections import OrderedDict
+
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.tolerance import Tolerance
+
+from compas_timber.fabrication import BTLxProcessing
+from compas_timber.fabrication import BTLxWriter
+from compas_timber.fabrication import Contour
+from compas_timber.fabrication import FreeContour
+from compas_timber.fabrication import StepJoint
+from compas_timber.fabrication import StepJointNotch
+from compas_timber.fabrication import Text
+from compas_timber.fabrication.btlx import BTLxProcessingParams
+from compas_timber.utils import get_leaf_subclasses
+
+ARGUMENTS = {
+    StepJoint: {"strut_inclination": 45.0},
+    StepJointNotch: {"strut_inclination": 45.0},
+    Text: {"text": "A1"},
+    FreeContour: {"contour_param_object": Contour(Polyline([Point(0, 0, 0), Point(100, 0, 0), Point(100, 50, 0), Point(0, 0, 0)]), depth=10.0)},
+}
+
+
+def generic_as_dict(processing):
+    result = OrderedDict()
+    for btlx_name, attr_spec in processing.ATTRIBUTE_MAP.items():
+        value = getattr(processing, attr_spec.python_name)
+        result[btlx_name] = BTLxProcessingParams._format_value(value)
+    return result
+
+
+def microseconds(number, func):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    writer = BTLxWriter()
+    writer._tolerance = Tolerance(unit="MM")
+
+    print("{:<16} {:>7} {:>14} {:>14} {:>14}".format("processing", "params", "generic [us]", "as_dict [us]", "element [us]"))
+    totals = [0.0, 0.0, 0.0]
+    for cls in sorted(get_leaf_subclasses(BTLxProcessing), key=lambda cls: cls.__name__):
+        processing = cls(**ARGUMENTS.get(cls, {}))
+        timings = [
+            microseconds(args.number, lambda: generic_as_dict(processing)),
+            microseconds(args.number, lambda: processing.params.as_dict()),
+            microseconds(args.number, lambda: writer._create_processing(processing)),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        print("{:<16} {:>7} {:>14.1f} {:>14.1f} {:>14.1f}".format(cls.__name__, len(cls.ATTRIBUTE_MAP), *timings))
+    print("{:<16} {:>7} {:>14.1f} {:>14.1f} {:>14.1f}".format("total", "", *totals))
+
+
+if __name__ == "__main__":
+    main()
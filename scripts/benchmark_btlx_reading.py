@@ -0,0 +1,79 @@
+"""Compares the time it takes to read a BTLx file with and without deferring the processings.
+
+Usage:
+
+    python scripts/benchmark_btlx_reading.py [path/to/model.btlx] [--copies N] [--repeat N]
+
+Defaults to the BTLx file of the test model in the data folder, with its parts written ``--copies`` times, each copy
+shifted along the x axis. ``lazy`` reads only the part headers, ``lazy + features`` additionally accesses the features
+of every element, which parses the processings that were deferred.
+
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+from compas.geometry import Translation
+
+import compas_timber
+from compas_timber.btlx import BTLxReader
+from compas_timber.fabrication import BTLxWriter
+from compas_timber.model import TimberModel
+
+
+def scaled_model(path, copies):
+    source = BTLxReader().read(path)
+    model = TimberModel(tolerance=source.tolerance)
+    for index in range(copies):
+        shift = Translation.from_vector([index * 20000.0, 0, 0])
+        for beam in source.beams:
+            copy = beam.copy()
+            copy.frame.transform(shift)
+            copy.features = [feature.copy() for feature in beam.features]
+            model.add_element(copy)
+    return model
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def read_with_features(path):
+    model = BTLxReader(lazy=True).read(path)
+    for beam in model.beams:
+        _ = beam.features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.path.join(compas_timber.DATA, "model_test.btlx"))
+    parser.add_argument("--copies", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.btlx")
+        BTLxWriter().write(scaled_model(args.path, args.copies), path)
+        print("{} parts, {:.2f} MB".format(args.copies * len(BTLxReader().read(args.path).beams), os.path.getsize(path) / 1e6))
+
+        variants = [
+            ("eager", lambda: BTLxReader().read(path)),
+            ("lazy", lambda: BTLxReader(lazy=True).read(path)),
+            ("lazy + features", lambda: read_with_features(path)),
+        ]
+        print("{:<16} {:>10}".format("read", "time [s]"))
+        for name, func in variants:
+            print("{:<16} {:>10.3f}".format(name, best_of(args.repeat, func)))
+
+
+if __name__ == "__main__":
+    main()
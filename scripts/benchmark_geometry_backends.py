@@ -0,0 +1,67 @@
+"""Compares the time it takes to compute the geometry of all elements with the brep and the mesh geometry backends.
+
+Usage:
+
+    python scripts/benchmark_geometry_backends.py [path/to/model.json] [--repeat N]
+
+Defaults to the test model in the data folder. Joinery is processed once, the element geometry is then recomputed
+from scratch for each backend and the volumes of the resulting geometries are compared.
+
+"""
+
+import argparse
+import os
+import time
+
+from compas.data import json_load
+
+import compas_timber
+from compas_timber.geometry import GeometryBackend
+
+
+def compute_all(model):
+    for element in model.elements():
+        element.reset_computed_properties()
+    start = time.perf_counter()
+    geometries = [element.geometry for element in model.beams + model.plates]
+    return time.perf_counter() - start, geometries
+
+
+def volume(geometry):
+    if geometry is None:
+        return 0.0
+    if isinstance(geometry.volume, float):
+        return geometry.volume  # Brep
+    return geometry.volume() or 0.0  # Mesh, None if not closed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.path.join(compas_timber.DATA, "model_test.json"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = json_load(args.path)
+    model.process_joinery()
+    print(model)
+
+    results = {}
+    for backend in (GeometryBackend.BREP, GeometryBackend.MESH):
+        model.geometry_backend = backend
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, geometries = compute_all(model)
+            timings.append(elapsed)
+        results[backend] = geometries
+        print("{:<5} best: {:.3f}s  mean: {:.3f}s".format(backend, min(timings), sum(timings) / len(timings)))
+
+    deviations = []
+    for brep, mesh in zip(results[GeometryBackend.BREP], results[GeometryBackend.MESH]):
+        brep_volume = volume(brep)
+        if brep_volume:
+            deviations.append(abs(volume(mesh) - brep_volume) / brep_volume)
+    print("max relative volume deviation: {:.2e}".format(max(deviations) if deviations else 0.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compares the ways the prism of a plate can be built, across outline vertex counts.
+
+Usage:
+
+    python scripts/benchmark_plate_prism.py [--counts 4 16 64 256] [--repeat N]
+
+For every vertex count a circular outline is tested twice: once with outline_b a translated copy of outline_a, as for
+plates without angled edge extensions, and once with outline_b scaled, as for plates whose edges are mitered.
+Timed are sewing the faces into a brep (``Brep.from_polygons``), extruding outline_a (translated case only), building
+the mesh prism (``mesh_from_outlines``), and copying a cached brep, which is what ``PlateGeometry.compute_shape`` returns
+while the outlines and edge planes do not change.
+
+"""
+
+import argparse
+import math
+import time
+
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.geometry import Scale
+from compas_brep import Brep
+
+from compas_timber.geometry import _prism_polygons
+from compas_timber.geometry import brep_from_outlines
+from compas_timber.geometry import mesh_from_outlines
+
+
+def circular_outline(count, radius=1000.0):
+    points = [Point(radius * math.cos(2 * math.pi * i / count), radius * math.sin(2 * math.pi * i / count), 0) for i in range(count)]
+    return Polyline(points + points[:1])
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    brep_from_outlines(circular_outline(4), circular_outline(4).translated([0, 0, 1]))  # warm up the kernel
+
+    print("{:<10} {:>8} {:>12} {:>12} {:>12} {:>12}".format("outlines", "vertices", "sewn [ms]", "extruded", "mesh", "cached copy"))
+    for count in args.counts:
+        outline_a = circular_outline(count)
+        translated = outline_a.translated([0, 0, 100])
+        scaled = translated.transformed(Scale.from_factors([1.1, 1.1, 1.0]))
+        for name, outline_b in (("translated", translated), ("scaled", scaled)):
+            sewn = best_of(args.repeat, lambda: Brep.from_polygons(_prism_polygons(outline_a, outline_b)))
+            fast = best_of(args.repeat, lambda: brep_from_outlines(outline_a, outline_b))
+            mesh = best_of(args.repeat, lambda: mesh_from_outlines(outline_a, outline_b))
+            cached = brep_from_outlines(outline_a, outline_b)
+            copy = best_of(args.repeat, cached.copy)
+            extruded = "{:>12.2f}".format(fast) if name == "translated" else "{:>12}".format("-")
+            print("{:<10} {:>8} {:>12.2f} {} {:>12.2f} {:>12.2f}".format(name, count, sewn, extruded, mesh, copy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Measures the time it takes to serialize a TimberModel to protobuf and back.
+
+Usage:
+
+    python scripts/benchmark_proto.py [path/to/model.json] [--copies N] [--repeat N] [--workers N [N ...]] [--json] [--check]
+
+Defaults to the test model in the data folder, with its beams added ``--copies`` times, each copy shifted along the x
+axis and given a few drillings, so the model has features to serialize as well. With ``--workers``, the time of
+:func:`compas_timber.proto.parallel.dump_model_bts` with each of the given numbers of worker processes is printed as
+well, with its speedup over ``pb_dump_bts``, after checking that it gives the same bytes. The workers only pay off on a
+machine with several cores, e.g. ``--copies 200 --workers 1 2 4 8``. With ``--json``, the size and time of compas JSON
+and of :mod:`compas_timber.proto.compact_json` are compared too.
+
+With ``--check``, the script exits with an error if dumping or loading the model takes longer than :data:`BUDGETS` times
+compas JSON on the same machine. The work the codec must not repeat per object, compiling a field's codec and
+decomposing a beam's transformation into its frame, is checked by ``tests/compas_timber/test_proto_model.py``.
+
+"""
+
+import argparse
+import json
+import os
+import time
+
+from compas.data import json_dumps
+from compas.data import json_load
+from compas.data import json_loads
+from compas.geometry import Translation
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+from compas_pb.core import serialize_message
+
+import compas_timber
+import compas_timber.proto.conversions  # noqa: F401
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+from compas_timber.proto import model_pb2
+from compas_timber.proto.compact_json import model_from_json
+from compas_timber.proto.compact_json import model_to_json
+from compas_timber.proto.parallel import dump_model_bts
+
+# protobuf time over compas JSON time, about 0.9 for dump and 1.3 for load when recorded, with some headroom
+BUDGETS = {"dump": 1.5, "load": 1.7}
+
+
+def scaled_model(path, copies):
+    source = json_load(path)
+    model = TimberModel(tolerance=source.tolerance)
+    for index in range(copies):
+        shift = Translation.from_vector([index * 20000.0, 0, 0])
+        for beam in source.beams:
+            copy = beam.copy()
+            copy.frame.transform(shift)
+            copy.add_features([Drilling(start_x=100.0 * i, diameter=12.0, depth=50.0, is_joinery=False) for i in range(5)])
+            model.add_element(copy)
+    return model
+
+
+def deterministic_bts(model):
+    # what pb_dump_bts gives, with the map entries sorted as dump_model_bts sorts them
+    envelope = serialize_message(model)
+    msg = model_pb2.TimberModelData()
+    envelope.data.message.Unpack(msg)
+    envelope.data.message.Pack(msg, deterministic=True)
+    return envelope.SerializeToString(deterministic=True)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.path.join(compas_timber.DATA, "model_test.json"))
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[], help="numbers of worker processes to compare")
+    parser.add_argument("--json", action="store_true", help="compare compas JSON and compact JSON as well")
+    parser.add_argument("--check", action="store_true", help="exit with an error if protobuf is slower than its budget")
+    args = parser.parse_args()
+
+    model = scaled_model(args.path, args.copies)
+    data = pb_dump_bts(model)
+    print("{} elements, {:.2f} MB".format(len(list(model.elements())), len(data) / 1e6))
+
+    print("{:<16} {:>10} {:>10}".format("protobuf", "time [s]", "speedup"))
+    dump = best_of(args.repeat, lambda: pb_dump_bts(model))
+    print("{:<16} {:>10.3f} {:>10.2f}".format("dump", dump, 1.0))
+    if args.workers:
+        expected = deterministic_bts(model)
+        print("{} CPUs".format(os.cpu_count()))
+    for workers in args.workers:
+        if dump_model_bts(model, workers=workers) != expected:
+            raise SystemExit("dump_model_bts(workers={}) differs from pb_dump_bts".format(workers))
+        timing = best_of(args.repeat, lambda: dump_model_bts(model, workers=workers))
+        print("{:<16} {:>10.3f} {:>10.2f}".format("dump {} workers".format(workers), timing, dump / timing))
+    load = best_of(args.repeat, lambda: pb_load_bts(data))
+    print("{:<16} {:>10.3f}".format("load", load))
+
+    if args.check:
+        text = json_dumps(model)
+        ratios = {"dump": dump / best_of(args.repeat, lambda: json_dumps(model)), "load": load / best_of(args.repeat, lambda: json_loads(text))}
+        found = []
+        for step, ratio in ratios.items():
+            print("protobuf {} takes {:.2f} times as long as compas JSON, the budget is {:.2f}".format(step, ratio, BUDGETS[step]))
+            if ratio > BUDGETS[step]:
+                found.append(step)
+        if found:
+            raise SystemExit("protobuf {} exceeded its budget".format(" and ".join(found)))
+
+    if args.json:
+        texts = {
+            "compas json": (json_dumps(model), lambda: json_dumps(model), json_loads),
+            "compact json": (model_to_json(model), lambda: model_to_json(model), model_from_json),
+            "compact json q": (model_to_json(model, quantize=True), lambda: model_to_json(model, quantize=True), model_from_json),
+        }
+        print()
+        print("{:<16} {:>10} {:>10} {:>10} {:>10}".format("", "size [MB]", "dump [s]", "parse [s]", "load [s]"))
+        for name, (text, dump, load) in texts.items():
+            print(
+                "{:<16} {:>10.2f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                    name,
+                    len(text) / 1e6,
+                    best_of(args.repeat, dump),
+                    best_of(args.repeat, lambda: json.loads(text)),
+                    best_of(args.repeat, lambda: load(text)),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
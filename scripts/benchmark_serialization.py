@@ -0,0 +1,127 @@
+"""Measures the encode / decode time and the size of representative objects, protobuf against compas JSON.
+
+Usage:
+
+    python scripts/benchmark_serialization.py [--count N] [--repeat N] [--check] [--update]
+
+The objects are built by ``tests/compas_timber/fixtures/serialization_models.py``: timber frames with joints and
+drillings, layered panels with openings, plate fasteners, a nesting result and a building plan, each with ``--count``
+repetitions. With ``--check``, the script exits with an error if an object got larger, or slower to encode or decode,
+than its budget in ``tests/compas_timber/fixtures/serialization_budgets.json``. Sizes are only checked at the count
+the budgets were recorded for, times are checked as the ratio of protobuf to JSON time on the same machine. With
+``--update``, the budgets are recorded from this run instead, with some headroom.
+
+The sizes are also checked by ``tests/compas_timber/test_serialization_budgets.py``.
+
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from compas.data import json_dumps
+from compas.data import json_loads
+from compas.tolerance import TOL
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+import compas_timber.proto.conversions  # noqa: F401
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TESTS = os.path.join(HERE, "..", "tests", "compas_timber")
+BUDGETS = os.path.join(TESTS, "fixtures", "serialization_budgets.json")
+
+sys.path.insert(0, TESTS)
+from fixtures.serialization_models import COUNT  # noqa: E402
+from fixtures.serialization_models import MODELS  # noqa: E402
+
+SIZE_HEADROOM = 1.02
+TIME_HEADROOM = 2.0
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(obj, repeat):
+    data = pb_dump_bts(obj)
+    text = json_dumps(obj)
+    return {
+        "protobuf_bytes": len(data),
+        "json_bytes": len(text.encode("utf-8")),
+        "protobuf_encode": best_of(repeat, lambda: pb_dump_bts(obj)),
+        "protobuf_decode": best_of(repeat, lambda: pb_load_bts(data)),
+        "json_encode": best_of(repeat, lambda: json_dumps(obj)),
+        "json_decode": best_of(repeat, lambda: json_loads(text)),
+    }
+
+
+def regressions(name, result, budget, check_sizes):
+    found = []
+    if check_sizes:
+        for key in ("protobuf_bytes", "json_bytes"):
+            if result[key] > budget[key]:
+                found.append("{}: {} is {}, the budget is {}".format(name, key, result[key], budget[key]))
+    for step in ("encode", "decode"):
+        ratio = result["protobuf_" + step] / result["json_" + step]
+        if ratio > budget[step + "_ratio"]:
+            found.append("{}: protobuf {} takes {:.2f} times as long as JSON, the budget is {:.2f}".format(name, step, ratio, budget[step + "_ratio"]))
+    return found
+
+
+def recorded(result):
+    return {
+        "protobuf_bytes": int(math.ceil(result["protobuf_bytes"] * SIZE_HEADROOM)),
+        "json_bytes": int(math.ceil(result["json_bytes"] * SIZE_HEADROOM)),
+        "encode_ratio": round(result["protobuf_encode"] / result["json_encode"] * TIME_HEADROOM, 2),
+        "decode_ratio": round(result["protobuf_decode"] / result["json_decode"] * TIME_HEADROOM, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=COUNT)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="exit with an error if a budget is exceeded")
+    parser.add_argument("--update", action="store_true", help="record the budgets from this run")
+    args = parser.parse_args()
+    TOL.unit = "MM"  # as in the tests, see tests/compas_timber/conftest.py
+    if args.update and args.count != COUNT:
+        parser.error("budgets are recorded for --count {}".format(COUNT))
+
+    with open(BUDGETS) as f:
+        budgets = json.load(f)
+
+    header = "{:<14} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}"
+    row = "{:<14} {:>10} {:>10} {:>10.4f} {:>10.4f} {:>10.4f} {:>10.4f}"
+    print(header.format("object", "pb [B]", "json [B]", "pb enc [s]", "pb dec [s]", "json enc", "json dec"))
+    found = []
+    for name, build in MODELS.items():
+        result = measure(build(args.count), args.repeat)
+        print(row.format(name, result["protobuf_bytes"], result["json_bytes"], result["protobuf_encode"], result["protobuf_decode"], result["json_encode"], result["json_decode"]))
+        if args.update:
+            budgets[name] = recorded(result)
+        elif args.check:
+            found.extend(regressions(name, result, budgets[name], args.count == COUNT))
+
+    if args.update:
+        with open(BUDGETS, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("budgets written to {}".format(os.path.normpath(BUDGETS)))
+    for message in found:
+        print(message)
+    if found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
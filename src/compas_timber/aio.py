@@ -0,0 +1,281 @@
+"""Loading and saving of timber models from asyncio code.
+
+Encoding and decoding a model is CPU bound and can take seconds, which would block the event loop if done directly in a
+coroutine. The functions of this module run that work on an executor instead, a thread pool unless one is given, and
+read and write files in chunks, so that other tasks keep running in the meantime.
+
+Cancellation takes effect between two steps of the work: between two chunks of a file, two batches of BTLx parts, or
+around a whole encoding or decoding call, which runs on to its end in the executor. A file which is being saved when
+the task is cancelled, or fails, is removed again.
+
+"""
+
+import asyncio
+import functools
+import os
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_EXTENSIONS = {
+    "btlx": (".btlx", ".btlz", ".gz"),
+    "json": (".json",),
+    "protobuf": (".bts", ".pb"),
+}
+
+
+async def run_in_executor(func, *args, executor=None, **kwargs):
+    """Calls a blocking function on an executor and waits for its result without blocking the event loop.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call.
+    *args, **kwargs
+        The arguments to call it with.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to call it on. Defaults to the default executor of the running loop, a thread pool.
+
+    Returns
+    -------
+    object
+        The return value of the function.
+
+    Notes
+    -----
+    If the waiting task is cancelled, the call itself runs on to its end in the executor and its result is dropped.
+
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def _settle(future):
+    # waits for an executor future; on cancellation, lets the call finish before re-raising, so that whatever it is
+    # working on (an open file, a generator) is not used by two threads at once while it is cleaned up
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+def _next_batch(iterator, batch_size):
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            break
+    return batch
+
+
+async def iterate_in_executor(iterable, batch_size=DEFAULT_BATCH_SIZE, executor=None):
+    """Advances a blocking iterator on an executor and yields its items in batches.
+
+    If the iterator is a generator, it is closed on the executor once iteration stops, whether it was exhausted,
+    failed or the consuming task was cancelled, so that its ``finally`` blocks and context managers run.
+
+    Parameters
+    ----------
+    iterable : iterable
+        The items to iterate over.
+    batch_size : int, optional
+        The number of items advanced per call on the executor. Defaults to 64.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to advance the iterator on. Defaults to the default executor of the running loop.
+
+    Yields
+    ------
+    list
+        The next at most ``batch_size`` items.
+
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    try:
+        while True:
+            batch = await _settle(loop.run_in_executor(executor, _next_batch, iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await loop.run_in_executor(executor, close)
+
+
+async def read_file_async(path, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """Reads a file in chunks on an executor.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        The file to read.
+    chunk_size : int, optional
+        The number of bytes read per call on the executor. Defaults to 1 MiB.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to read on. Defaults to the default executor of the running loop.
+
+    Returns
+    -------
+    bytes
+        The content of the file.
+
+    """
+    loop = asyncio.get_running_loop()
+    chunks = []
+    with open(path, "rb") as file:
+        while True:
+            chunk = await _settle(loop.run_in_executor(executor, file.read, chunk_size))
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+async def write_file_async(path, data, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """Writes bytes to a file in chunks on an executor.
+
+    If writing fails or is cancelled, the partially written file is removed.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        The file to write.
+    data : bytes
+        The content to write.
+    chunk_size : int, optional
+        The number of bytes written per call on the executor. Defaults to 1 MiB.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to write on. Defaults to the default executor of the running loop.
+
+    """
+    loop = asyncio.get_running_loop()
+    view = memoryview(data)
+    try:
+        with open(path, "wb") as file:
+            for start in range(0, len(view), chunk_size):
+                await _settle(loop.run_in_executor(executor, file.write, view[start : start + chunk_size]))
+    except (Exception, asyncio.CancelledError):
+        _remove(path)
+        raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _model_format(path, format):
+    if format is None:
+        name = os.fspath(path).lower()
+        for candidate, extensions in _EXTENSIONS.items():
+            if name.endswith(extensions):
+                return candidate
+        raise ValueError("Cannot infer the model format from the extension of {}. Pass one of: {}".format(path, ", ".join(_EXTENSIONS)))
+    if format not in _EXTENSIONS:
+        raise ValueError("Unsupported model format: {}. Use one of: {}".format(format, ", ".join(_EXTENSIONS)))
+    return format
+
+
+async def load_model_async(path, format=None, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Loads a timber model from a file without blocking the event loop.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        The file to load.
+    format : str, optional
+        ``"btlx"``, ``"json"`` or ``"protobuf"``. If None (default), it is inferred from the extension of ``path``:
+        ``.btlx``, ``.btlz`` and ``.gz`` for BTLx, ``.json`` for JSON and ``.bts`` and ``.pb`` for protobuf.
+        JSON files may be in the compact format of :mod:`compas_timber.proto.compact_json` or in compas JSON.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to decode on. Defaults to the default executor of the running loop.
+    chunk_size : int, optional
+        The number of bytes read per call on the executor. Defaults to 1 MiB.
+
+    Returns
+    -------
+    :class:`~compas_timber.model.TimberModel`
+        The loaded model.
+
+    Raises
+    ------
+    ValueError
+        If the format is not supported, or cannot be inferred from the extension.
+
+    """
+    format = _model_format(path, format)
+    if format == "btlx":
+        from compas_timber.btlx import BTLxReader
+
+        return await BTLxReader().read_async(path, executor=executor)
+
+    data = await read_file_async(path, chunk_size, executor)
+    if format == "json":
+        from compas_timber.proto.compact_json import model_from_json
+
+        return await run_in_executor(model_from_json, data.decode("utf-8"), executor=executor)
+
+    from compas_pb import pb_load_bts
+
+    import compas_timber.proto.conversions  # noqa: F401
+
+    return await run_in_executor(pb_load_bts, data, executor=executor)
+
+
+async def save_model_async(model, path, format=None, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Saves a timber model to a file without blocking the event loop.
+
+    The model must not be changed until saving is done, as it is encoded on another thread.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to save.
+    path : str | os.PathLike
+        The file to save to.
+    format : str, optional
+        ``"btlx"``, ``"json"`` or ``"protobuf"``, see :func:`load_model_async`. If None (default), it is inferred
+        from the extension of ``path``. JSON is written in the format of :mod:`compas_timber.proto.compact_json`.
+    executor : :class:`concurrent.futures.Executor`, optional
+        The executor to encode on. Defaults to the default executor of the running loop.
+    chunk_size : int, optional
+        The number of bytes written per call on the executor. Defaults to 1 MiB.
+
+    Raises
+    ------
+    ValueError
+        If the format is not supported, or cannot be inferred from the extension.
+
+    """
+    format = _model_format(path, format)
+    if format == "btlx":
+        from compas_timber.fabrication import BTLxWriter
+
+        await BTLxWriter().write_async(model, os.fspath(path), executor=executor)
+        return
+
+    if format == "json":
+        from compas_timber.proto.compact_json import model_to_json
+
+        text = await run_in_executor(model_to_json, model, executor=executor)
+        data = text.encode("utf-8")
+    else:
+        from compas_pb import pb_dump_bts
+
+        import compas_timber.proto.conversions  # noqa: F401
+
+        data = await run_in_executor(pb_dump_bts, model, executor=executor)
+    await write_file_async(path, data, chunk_size, executor)
+
+
+__all__ = [
+    "iterate_in_executor",
+    "load_model_async",
+    "read_file_async",
+    "run_in_executor",
+    "save_model_async",
+    "write_file_async",
+]
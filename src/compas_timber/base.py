@@ -9,6 +9,8 @@ from compas.geometry import Vector
 from compas_model.elements import Element
 from compas_model.elements import reset_computed
 
+from compas_timber.geometry import GeometryBackend
+
 
 def reset_timber_attrs(f):
     """Decorator to reset cached timber-specific attributes."""
@@ -110,6 +112,14 @@ class TimberElement(Element, abc.ABC):
         self._ref_frame = None
         self._geometry = None
 
+    @property
+    def geometry_backend(self):
+        # type: () -> str
+        """The geometry backend used to compute this element's geometry, taken from the model. Brep for standalone elements."""
+        if self.model is None:
+            return GeometryBackend.BREP
+        return getattr(self.model, "geometry_backend", GeometryBackend.BREP)
+
     @property
     def is_beam(self):
         return False
@@ -133,11 +143,58 @@ class TimberElement(Element, abc.ABC):
     def features(self, features):
         self._features = features
 
+    _feature_loader = None
+
+    @property
+    def _features(self):
+        # deferred features are created on first access, before any other change to the features
+        if self._feature_loader is not None:
+            loader, self._feature_loader = self._feature_loader, None
+            self._feature_list[:0] = loader()
+        return self._feature_list
+
+    @_features.setter
+    def _features(self, features):
+        self._feature_loader = None
+        self._feature_list = features
+
+    @property
+    def has_deferred_features(self):
+        """True if the element has features which were not created yet, see :meth:`defer_features`."""
+        return self._feature_loader is not None
+
+    def defer_features(self, loader):
+        """Defers the creation of the element's features until they are first accessed.
+
+        Used when reading elements whose features are expensive to create and often not needed, e.g. from a BTLx file.
+        The features returned by ``loader`` come before any features which are added to the element afterwards.
+
+        Parameters
+        ----------
+        loader : callable
+            Called without arguments on first access to the features. Returns a list of features.
+
+        """
+        self._feature_loader = loader
+
     @reset_timber_attrs
     def transform(self, transformation):
         # override to reset timber-specific cached attributes
         super().transform(transformation)
 
+    @property
+    def elementgeometry(self):
+        """The geometry of the element in local coordinates.
+
+        Within a model, elements with the same :meth:`compute_instance_key` share a single instance of this geometry.
+        """
+        if self._elementgeometry is None:
+            if self.model is not None and hasattr(self.model, "shared_elementgeometry"):
+                self._elementgeometry = self.model.shared_elementgeometry(self)
+            else:
+                self._elementgeometry = self.compute_elementgeometry()
+        return self._elementgeometry
+
     @property
     def geometry(self):
         """The geometry of the element in the model's global coordinates."""
@@ -161,6 +218,25 @@ class TimberElement(Element, abc.ABC):
             return self.elementgeometry.transformed(self.transformation)
         return super().compute_modelgeometry()
 
+    def compute_instance_key(self):
+        """Computes a hash of all the data which determines the geometry of this element in local coordinates.
+
+        Elements with equal keys have identical element geometry, which the model computes only once and shares between them.
+        This method is intended to be overridden by subclasses which support instancing.
+
+        Returns
+        -------
+        str | None
+            The key, or None if this element's geometry cannot be shared.
+
+        """
+        return None
+
+    @staticmethod
+    def _features_instance_data(features):
+        # processings are parametrized relative to the element's reference sides, their data is independent of the element's position
+        return [feature.unproxified() if hasattr(feature, "unproxified") else feature for feature in features]
+
     # ========================================================================
     # Feature management & Modification methods
     # ========================================================================
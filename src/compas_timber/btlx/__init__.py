@@ -1,5 +1,9 @@
+from .reader import BTLxIndex
 from .reader import BTLxReader
+from .reader import open_btlx
 
 __all__ = [
+    "BTLxIndex",
     "BTLxReader",
+    "open_btlx",
 ]
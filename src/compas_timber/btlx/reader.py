@@ -1,13 +1,26 @@
+import gzip
+import io
+import json
+import math
+import os
+import re
 import uuid
+import warnings
 import xml.etree.ElementTree as ET
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from warnings import warn
+from xml.parsers import expat
+from xml.sax.saxutils import quoteattr
 
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import Polyline
-from compas.geometry import Vector
 from compas.tolerance import Tolerance
 
+from compas_timber.aio import iterate_in_executor
 from compas_timber.elements import Beam
 from compas_timber.elements import Plate
 from compas_timber.errors import BTLxParsingError
@@ -29,6 +42,17 @@ class BTLxReader(object):
         TODO: Add optional tolerance parameter to allow users to specify model units (MM or M).
         This would enable automatic scaling of geometry when creating models in different units.
 
+    Parameters
+    ----------
+    workers : int, optional
+        If larger than 1, the parts are parsed in this many worker processes, see :meth:`BTLxReader.iter_elements`.
+    chunk_size : int, optional
+        The number of parts sent to a worker process at once. Defaults to 256.
+    lazy : bool, optional
+        If True, only the part headers are parsed when reading. The processings of a part are parsed into features the
+        first time the features of its element are accessed, see :meth:`TimberElement.defer_features`. Errors in the
+        processings are added to :attr:`errors` at that point. Defaults to False.
+
     Attributes
     ----------
     errors : list
@@ -38,7 +62,10 @@ class BTLxReader(object):
 
     DESERIALIZERS = {}  # Maps child element names to deserializer functions
 
-    def __init__(self):
+    def __init__(self, workers=None, chunk_size=256, lazy=False):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lazy = lazy
         self._errors = []
         self._processing_types = {cls.PROCESSING_NAME: cls for cls in get_leaf_subclasses(BTLxProcessing)}
 
@@ -73,10 +100,44 @@ class BTLxReader(object):
     def read(self, file_path):
         """Read a BTLx file and return a TimberModel.
 
+        The file is parsed part by part, see :meth:`BTLxReader.iter_elements`, so only the model and one part of the
+        XML document are held in memory at a time.
+        Compressed files, BTLZ archives (a zip archive containing the BTLx file) and gzip compressed BTLx files, are
+        detected by their content regardless of the file extension and decompressed while they are parsed.
+
+        Parameters
+        ----------
+        file_path : str | os.PathLike | file-like
+            The path to the BTLx file to read, or a binary stream to read it from.
+
+        Returns
+        -------
+        :class:`~compas_timber.model.TimberModel`
+            The timber model containing the elements and features from the BTLx file.
+
+        """
+        # Create model with default tolerance (BTLx files are always in mm)
+        model = TimberModel(tolerance=Tolerance(unit="MM"))
+        for element in self.iter_elements(file_path):
+            model.add_element(element)
+        self._warn_errors()
+        return model
+
+    async def read_async(self, file_path, executor=None, batch_size=64):
+        """Read a BTLx file and return a TimberModel, without blocking the event loop.
+
+        The parts are parsed as in :meth:`BTLxReader.read`, a batch of them at a time on an executor, and their
+        elements added to the model in between. If the task is cancelled, the file is closed once the current batch
+        is parsed.
+
         Parameters
         ----------
-        file_path : str
-            The path to the BTLx file to read.
+        file_path : str | os.PathLike | file-like
+            The path to the BTLx file to read, or a binary stream to read it from. May be compressed, see :meth:`read`.
+        executor : :class:`concurrent.futures.Executor`, optional
+            The executor to parse on. Defaults to the default executor of the running loop, a thread pool.
+        batch_size : int, optional
+            The number of parts parsed per call on the executor. Defaults to 64.
 
         Returns
         -------
@@ -84,9 +145,190 @@ class BTLxReader(object):
             The timber model containing the elements and features from the BTLx file.
 
         """
-        with open(file_path, "r") as f:
-            xml_string = f.read()
-        return self.xml_to_model(xml_string)
+        model = TimberModel(tolerance=Tolerance(unit="MM"))
+        async for elements in iterate_in_executor(self.iter_elements(file_path), batch_size, executor):
+            for element in elements:
+                model.add_element(element)
+        self._warn_errors()
+        return model
+
+    def iter_elements(self, file_path):
+        """Reads a BTLx file part by part and yields the element of every part, with its features, in file order.
+
+        The file is parsed incrementally with :func:`xml.etree.ElementTree.iterparse`. The XML of each part is
+        discarded as soon as its element was created, so memory use does not grow with the size of the file unless
+        the caller keeps the elements. Parts which cannot be parsed are skipped and their errors added to :attr:`errors`.
+
+        Parameters
+        ----------
+        file_path : str | os.PathLike | file-like
+            The path to the BTLx file to read, or a binary stream to read it from. May be compressed, see :meth:`read`.
+
+        Yields
+        ------
+        :class:`~compas_timber.elements.Beam` | :class:`~compas_timber.elements.Plate`
+            The element of each part.
+
+        Raises
+        ------
+        ValueError
+            If the file has no Project element. Raised once the end of the file was reached.
+
+        Notes
+        -----
+        If :attr:`workers` is larger than 1, the parts are split into chunks of :attr:`chunk_size` parts at the level
+        of the raw XML, without parsing it. The chunks are parsed in a process pool into records of the parts'
+        dimensions, transformations and processing parameters. The elements and their processings are then created
+        from these records in this process, in file order. Deserializers registered with
+        :meth:`register_type_deserializer` after the worker processes were started are not available to them.
+
+        If :attr:`lazy` is True, the parts are split into chunks the same way, also without workers. The processings of
+        each part are cut out of the raw XML and kept as bytes until the features of the element are accessed, so only
+        the part headers are parsed while reading.
+
+        """
+        if self.workers and self.workers > 1:
+            for element in self._iter_elements_parallel(file_path):
+                yield element
+            return
+        if self.lazy:
+            for element in self._iter_elements_lazy(file_path):
+                yield element
+            return
+
+        with open_btlx(file_path) as stream:
+            found_project = found_parts = False
+            parts_elem = None
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                tag = elem.tag.rpartition("}")[2]  # Remove namespace
+                if event == "start":
+                    if tag == "Project":
+                        found_project = True
+                    elif tag == "Parts" and parts_elem is None:
+                        parts_elem = elem
+                        found_parts = True
+                    continue
+
+                if tag == "Part" and parts_elem is not None:
+                    try:
+                        element = self._parse_part(elem)
+                    except BTLxParsingError as e:
+                        self._errors.append(e)
+                        element = None
+                    # the part was parsed, drop its subtree before yielding
+                    elem.clear()
+                    parts_elem.remove(elem)
+                    if element is not None:
+                        yield element
+                elif tag == "Parts":
+                    parts_elem = None
+                elif tag == "Rawpart":
+                    elem.clear()
+
+        if not found_project:
+            raise ValueError("No Project element found in BTLx file")
+        if not found_parts:
+            warn("No Parts element found in BTLx file")
+
+    def _iter_elements_parallel(self, file_path):
+        with open_btlx(file_path) as stream:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                pending = deque()
+                for chunk in _iter_part_chunks(stream, self.chunk_size):
+                    pending.append(executor.submit(_parse_part_chunk, chunk, self.lazy))
+                    if len(pending) >= self.workers * 2:  # bounds the parsed records waiting for the main process
+                        for element in self._elements_from_chunk_result(pending.popleft().result()):
+                            yield element
+                while pending:
+                    for element in self._elements_from_chunk_result(pending.popleft().result()):
+                        yield element
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_elements_lazy(self, file_path):
+        with open_btlx(file_path) as stream:
+            for chunk in _iter_part_chunks(stream, self.chunk_size):
+                for element in self._elements_from_records(_chunk_records(self, chunk)):
+                    yield element
+
+    def _elements_from_chunk_result(self, result):
+        records, messages = result
+        for message in messages:
+            warn(message, UserWarning, stacklevel=2)
+        return self._elements_from_records(records)
+
+    def _elements_from_records(self, records):
+        for record in records:
+            if isinstance(record, BTLxParsingError):
+                self._errors.append(record)
+            else:
+                yield self._element_from_record(record)
+
+    def read_parts(self, file_path, keys, by=None, index=None):
+        """Reads only the given parts of a BTLx file, without parsing the rest of it.
+
+        The parts are looked up in a :class:`BTLxIndex` of the file, and the reader seeks to each of them and parses
+        only its XML. A compressed file is decompressed once up to the last of the parts, as it cannot be seeked in.
+        Unless an index is given, the index saved next to the file is used, and built and saved first if it is missing
+        or older than the file, see :meth:`BTLxIndex.for_file`.
+
+        Parameters
+        ----------
+        file_path : str | os.PathLike
+            The path to the BTLx file to read. May be compressed, see :meth:`read`.
+        keys : list(str | :class:`uuid.UUID`)
+            The GUIDs, single member numbers, annotations or designations of the parts to read. All parts matching a
+            key are read, e.g. all parts with the same annotation.
+        by : str, optional
+            One of :attr:`BTLxIndex.KEYS`, to match the keys against only this key of the parts. By default, each key
+            is looked up as a GUID, single member number, annotation and designation, in this order, and the first
+            kind of key any part matches is used.
+        index : :class:`BTLxIndex`, optional
+            The index of the file.
+
+        Returns
+        -------
+        :class:`~compas_timber.model.TimberModel`
+            A timber model containing the elements of the parts, in file order.
+
+        Raises
+        ------
+        KeyError
+            If no part matches one of the keys.
+
+        """
+        if isinstance(keys, (str, uuid.UUID)):
+            keys = [keys]
+        index = index or BTLxIndex.for_file(file_path)
+        positions = set()
+        missing = []
+        for key in keys:
+            found = index.find(key, by)
+            if not found:
+                missing.append(key)
+            positions.update(found)
+        if missing:
+            raise KeyError("No parts found in the BTLx file for: {}".format(", ".join(str(key) for key in missing)))
+
+        model = TimberModel(tolerance=Tolerance(unit="MM"))
+        with open_btlx(file_path) as stream:
+            # a decompressing stream can only seek by decompressing up to the offset, and seeking back restarts at the
+            # start of the file, so it is read forward once, skipping the parts in between
+            seekable = isinstance(stream, io.BufferedReader)
+            current = 0
+            for position in sorted(positions):
+                offset, length = index.parts[position][:2]
+                if seekable:
+                    stream.seek(offset)
+                else:
+                    _skip(stream, offset - current)
+                chunk = index.prefix + stream.read(length) + b"</Parts>"
+                current = offset + length
+                for element in self._elements_from_records(_chunk_records(self, chunk)):
+                    model.add_element(element)
+        self._warn_errors()
+        return model
 
     def xml_to_model(self, xml_string):
         """Parse an XML string and return a TimberModel.
@@ -102,7 +344,6 @@ class BTLxReader(object):
             The timber model containing the elements and features from the BTLx file.
 
         """
-
         # Parse XML
         root = ET.fromstring(xml_string)
         # Create model with default tolerance (BTLx files are always in mm)
@@ -124,6 +365,10 @@ class BTLxReader(object):
             except BTLxParsingError as e:
                 self._errors.append(e)
 
+        self._warn_errors()
+        return model
+
+    def _warn_errors(self):
         if self._errors:
             warn(
                 "{} error(s) occurred during BTLx parsing. Call reader.print_errors() for details.".format(len(self._errors)),
@@ -131,16 +376,24 @@ class BTLxReader(object):
                 stacklevel=3,
             )
 
-        return model
-
     def _parse_part(self, part_element):
-        """Parses a part element and adds it to the model.
+        """Parses a part element into an element with its features.
 
         Parameters
         ----------
         part_element : :class:`~xml.etree.ElementTree.Element`
             The part element to parse.
 
+        Raises
+        ------
+        :class:`~compas_timber.errors.BTLxParsingError`
+            If a critical attribute (dimensions, transformation, element type) cannot be parsed.
+        """
+        return self._element_from_record(self._part_record(part_element))
+
+    def _part_record(self, part_element):
+        """Parses a part element into a :class:`_PartRecord`, without creating the element or its processings.
+
         Raises
         ------
         :class:`~compas_timber.errors.BTLxParsingError`
@@ -173,43 +426,65 @@ class BTLxReader(object):
         else:
             element_type = self._infer_element_type(width, height, length)
 
-        # create element
         if element_type == "Beam":
             frame = self._ref_frame_to_beam_frame(ref_frame, width, height)
-            element = Beam(frame=frame, length=length, width=width, height=height)
         elif element_type == "Plate":
             frame = self._ref_frame_to_plate_frame(ref_frame, width, height)
-            element = Plate(frame=frame, length=length, width=width, thickness=height)
+
+        # Parse Processings, errors are kept in place so that they are reported in order
+        processings = []
+        processings_elem = _find(part_element, _namespace(part_element), "Processings")
+        if self.lazy:
+            # replaced by the raw XML of the processings in _chunk_records, parsed when the features are first accessed
+            processings = processings_elem
+        elif processings_elem is not None:
+            for processing_elem in processings_elem:
+                try:
+                    processings.append(self._processing_record(processing_elem))
+                except BTLxParsingError as e:
+                    processings.append(BTLxParsingError(e.message, part_id=single_member_number, processing_type=e.processing_type))
+
+        return _PartRecord(element_type, guid, annotation, single_member_number, frame, length, width, height, processings)
+
+    def _element_from_record(self, record):
+        """Creates the element of a part and its processings from a :class:`_PartRecord`."""
+        # create element
+        if record.element_type == "Beam":
+            element = Beam(frame=record.frame, length=record.length, width=record.width, height=record.height)
+        elif record.element_type == "Plate":
+            element = Plate(frame=record.frame, length=record.length, width=record.width, thickness=record.height)
 
         # Set GUID - non-fatal: element remains valid with a new auto-generated GUID if this fails
         try:
-            element._guid = uuid.UUID(guid)
+            element._guid = uuid.UUID(record.guid)
         except ValueError as e:
-            self._errors.append(BTLxParsingError("Invalid GUID '{}': {}".format(guid, e), part_id=single_member_number))
+            self._errors.append(BTLxParsingError("Invalid GUID '{}': {}".format(record.guid, e), part_id=record.single_member_number))
 
         # Set name and custom attribute for error context
-        element.name = annotation
-        element.attributes["single_member_number"] = single_member_number
-
-        # Parse Processings
-        self._parse_processings(part_element, element)
-        return element
-
-    def _parse_processings(self, part_elem, element):
-        """Parse the Processings XML element and add features to the element."""
-        processings_elem = part_elem.find("{*}Processings")
-        if processings_elem is None:
-            return
-
-        for processing_elem in processings_elem:
+        element.name = record.name
+        element.attributes["single_member_number"] = record.single_member_number
+
+        if not isinstance(record.processings, list):
+            if record.processings is not None:
+                element.defer_features(_DeferredProcessings(self, record.processings, record.single_member_number))
+            return element
+
+        for processing in record.processings:
+            if isinstance(processing, BTLxParsingError):
+                self._errors.append(processing)
+                continue
             try:
-                feature = self._parse_processing(processing_elem)
-                element.add_feature(feature)
+                element.add_feature(self._create_processing(*processing))
             except BTLxParsingError as e:
-                self._errors.append(BTLxParsingError(e.message, part_id=element.attributes.get("single_member_number"), processing_type=e.processing_type))
+                self._errors.append(BTLxParsingError(e.message, part_id=record.single_member_number, processing_type=e.processing_type))
+        return element
 
     def _parse_processing(self, processing_elem):
         """Parse a single Processing XML element into a BTLxProcessing object."""
+        return self._create_processing(*self._processing_record(processing_elem))
+
+    def _processing_record(self, processing_elem):
+        """Parse a single Processing XML element into the name of the processing and the arguments to create it with."""
         processing_name = processing_elem.tag.split("}")[-1]  # Remove namespace
         processing_class = self._processing_types.get(processing_name)
 
@@ -262,9 +537,12 @@ class BTLxReader(object):
                         raise BTLxParsingError("No deserializer found for type: {}".format(child_name), processing_type=processing_name)
                     kwargs[python_name] = deserializer(child)
 
+        return processing_name, kwargs
+
+    def _create_processing(self, processing_name, kwargs):
         # Create processing instance
         try:
-            return processing_class(**kwargs)
+            return self._processing_types[processing_name](**kwargs)
         except Exception as e:
             raise BTLxParsingError("Failed to instantiate {}: {}".format(processing_name, e), processing_type=processing_name)
 
@@ -297,9 +575,13 @@ class BTLxReader(object):
         return type_info(value)
 
     def _parse_transformation(self, part_elem):
-        """Extract GUID and Frame from a Part's Transformation element."""
-        # Find Transformation element (wildcard namespace)
-        trans_elem = part_elem.find("{*}Transformations/{*}Transformation")
+        """Extract GUID and the BTLx reference frame from a Part's Transformation element.
+
+        The frame is returned as a tuple ``(point, xaxis, yaxis)`` of coordinate lists, with orthonormal axes.
+        """
+        # Find Transformation element, in the namespace of the part
+        namespace = _namespace(part_elem)
+        trans_elem = _find(_find(part_elem, namespace, "Transformations"), namespace, "Transformation")
         if trans_elem is None:
             raise ValueError("No Transformation element found in Part")
 
@@ -308,39 +590,25 @@ class BTLxReader(object):
         guid = guid_str.strip("{}")
 
         # Find Position element
-        position = trans_elem.find("{*}Position")
+        position = _find(trans_elem, namespace, "Position")
         if position is None:
             raise ValueError("No Position element found in Transformation")
 
         # Extract point and vectors
-        ref_point = position.find("{*}ReferencePoint")
-        x_vector = position.find("{*}XVector")
-        y_vector = position.find("{*}YVector")
-
-        # Parse point (apply scale factor to coordinates)
-        point = Point(
-            float(ref_point.get("X")),
-            float(ref_point.get("Y")),
-            float(ref_point.get("Z")),
-        )
-
-        # Parse vectors (no scale factor - they're directional)
-        xaxis = Vector(
-            float(x_vector.get("X")),
-            float(x_vector.get("Y")),
-            float(x_vector.get("Z")),
-        )
-
-        yaxis = Vector(
-            float(y_vector.get("X")),
-            float(y_vector.get("Y")),
-            float(y_vector.get("Z")),
-        )
-
-        # Create Frame (ZVector will be computed automatically)
-        frame = Frame(point, xaxis, yaxis)
-
-        return guid, frame
+        ref_point = _find(position, namespace, "ReferencePoint")
+        x_vector = _find(position, namespace, "XVector")
+        y_vector = _find(position, namespace, "YVector")
+
+        point = [float(ref_point.get("X")), float(ref_point.get("Y")), float(ref_point.get("Z"))]
+        xaxis = [float(x_vector.get("X")), float(x_vector.get("Y")), float(x_vector.get("Z"))]
+        yaxis = [float(y_vector.get("X")), float(y_vector.get("Y")), float(y_vector.get("Z"))]
+
+        # orthonormalize like compas.geometry.Frame, without creating a Frame for the intermediate reference frame
+        xaxis = _unitized(xaxis)
+        zaxis = _unitized(_cross(xaxis, _unitized(yaxis)))
+        yaxis = _cross(zaxis, xaxis)
+
+        return guid, (point, xaxis, yaxis)
 
     def _ref_frame_to_beam_frame(self, ref_frame, width, height):
         """Convert BTLx reference frame to element centerline frame."""
@@ -351,11 +619,12 @@ class BTLxReader(object):
         # The element centerline frame has its origin at the centerline start,
         # with axes: X=length, Y=width, Z=height.
 
-        centerline_origin = ref_frame.point + width / 2.0 * ref_frame.zaxis + height / 2.0 * ref_frame.yaxis
-        centerline_xaxis = ref_frame.xaxis
-        centerline_yaxis = -ref_frame.zaxis
+        point, xaxis, yaxis = ref_frame
+        zaxis = _cross(xaxis, yaxis)
+        centerline_origin = [p + width / 2.0 * z + height / 2.0 * y for p, y, z in zip(point, yaxis, zaxis)]
+        centerline_yaxis = [-z for z in zaxis]
 
-        return Frame(centerline_origin, centerline_xaxis, centerline_yaxis)
+        return Frame(centerline_origin, xaxis, centerline_yaxis)
 
     def _ref_frame_to_plate_frame(self, btlx_ref_frame, width, thickness):
         """Convert BTLx reference frame to Plate frame."""
@@ -366,11 +635,12 @@ class BTLxReader(object):
         # The Plate frame has its origin at a corner of the blank,
         # with axes: X=length, Y=width, Z=thickness.
 
-        plate_origin = btlx_ref_frame.point + btlx_ref_frame.zaxis * width
-        plate_xaxis = btlx_ref_frame.xaxis
-        plate_yaxis = -btlx_ref_frame.zaxis
+        point, xaxis, yaxis = btlx_ref_frame
+        zaxis = _cross(xaxis, yaxis)
+        plate_origin = [p + z * width for p, z in zip(point, zaxis)]
+        plate_yaxis = [-z for z in zaxis]
 
-        return Frame(plate_origin, plate_xaxis, plate_yaxis)
+        return Frame(plate_origin, xaxis, plate_yaxis)
 
     def _infer_element_type(self, width, height, length, ratio_threshold=5.0):
         """Infers the element type (Beam or Plate) based on dimensional proportions.
@@ -407,6 +677,520 @@ class BTLxReader(object):
             return "Beam"
 
 
+class BTLxIndex(object):
+    """Index of the parts of a BTLx file, for reading single parts without parsing the whole file.
+
+    The file is scanned once with an expat parser, without building its elements, see :meth:`build`. For every part, the
+    offset and length of its XML in the (uncompressed) file, as reported by the parser, are recorded, with the GUID of its transformation, its ``SingleMemberNumber``,
+    ``Annotation`` and ``Designation`` as keys. The index can be saved as a small JSON file next to the BTLx file, see
+    :meth:`for_file`, and is used by :meth:`BTLxReader.read_parts`.
+
+    Parameters
+    ----------
+    prefix : bytes
+        The XML declaration and a ``<Parts>`` start tag with the namespace declarations of the file, with which the XML
+        of a part can be parsed on its own.
+    parts : list(tuple)
+        Per part, in file order: ``(offset, length, guid, single_member_number, annotation, designation)``.
+    size : int, optional
+        The size in bytes of the indexed file.
+    mtime : int, optional
+        The modification time in nanoseconds of the indexed file.
+
+    Attributes
+    ----------
+    KEYS : tuple(str)
+        The keys of the parts, in the order in which :meth:`find` tries them.
+
+    """
+
+    VERSION = 2
+    KEYS = ("guid", "single_member_number", "annotation", "designation")
+    SUFFIX = ".idx"
+
+    def __init__(self, prefix, parts, size=None, mtime=None):
+        self.prefix = prefix
+        self.parts = [tuple(part) for part in parts]
+        self.size = size
+        self.mtime = mtime
+        self._lookup = {key: {} for key in self.KEYS}
+        for position, part in enumerate(self.parts):
+            for key, value in zip(self.KEYS, part[2:]):
+                if value:
+                    self._lookup[key].setdefault(value, []).append(position)
+
+    def __len__(self):
+        return len(self.parts)
+
+    @classmethod
+    def build(cls, file_path):
+        """Scans a BTLx file and indexes its parts.
+
+        Parameters
+        ----------
+        file_path : str | os.PathLike
+            The path to the BTLx file. May be compressed, the offsets are then those in the uncompressed XML.
+
+        Returns
+        -------
+        :class:`BTLxIndex`
+
+        """
+        prefix = b""
+        parts = []
+        with open_btlx(file_path) as stream:
+            for prefix, offset, segment, keys in _iter_raw_parts(stream):
+                parts.append((offset, len(segment)) + keys)
+        stat = os.stat(file_path)
+        return cls(prefix, parts, size=stat.st_size, mtime=stat.st_mtime_ns)
+
+    @classmethod
+    def for_file(cls, file_path, index_path=None):
+        """Returns the index of a BTLx file, loaded from its sidecar file, or built and saved there first.
+
+        The index is rebuilt if the sidecar file is missing, was written by another version or the size or modification
+        time of the BTLx file changed since it was built.
+
+        Parameters
+        ----------
+        file_path : str | os.PathLike
+            The path to the BTLx file.
+        index_path : str, optional
+            The path to the sidecar file. Defaults to the path of the BTLx file with :attr:`SUFFIX` appended.
+
+        Returns
+        -------
+        :class:`BTLxIndex`
+
+        """
+        index_path = index_path or os.fspath(file_path) + cls.SUFFIX
+        if os.path.exists(index_path):
+            index = cls.load(index_path)
+            if index is not None and index.is_current(file_path):
+                return index
+        index = cls.build(file_path)
+        index.save(index_path)
+        return index
+
+    def is_current(self, file_path):
+        """True if the size and modification time of the file are the same as when it was indexed."""
+        stat = os.stat(file_path)
+        return self.size == stat.st_size and self.mtime == stat.st_mtime_ns
+
+    def find(self, key, by=None):
+        """Returns the positions in :attr:`parts` of the parts with the given key.
+
+        Parameters
+        ----------
+        key : str | :class:`uuid.UUID`
+            The GUID, single member number, annotation or designation to look up.
+        by : str, optional
+            One of :attr:`KEYS`. By default, the key is looked up in the order of :attr:`KEYS` until a part matches.
+
+        Returns
+        -------
+        list(int)
+
+        """
+        if by is not None and by not in self.KEYS:
+            raise ValueError("Unknown key {!r}, expected one of: {}".format(by, ", ".join(self.KEYS)))
+        for name in (by,) if by else self.KEYS:
+            value = str(key).strip("{}").lower() if name == "guid" else str(key)
+            positions = self._lookup[name].get(value)
+            if positions:
+                return list(positions)
+        return []
+
+    def save(self, index_path):
+        """Saves the index to a JSON file."""
+        data = {
+            "version": self.VERSION,
+            "size": self.size,
+            "mtime": self.mtime,
+            "prefix": self.prefix.decode("latin-1"),
+            "parts": self.parts,
+        }
+        with open(index_path, "w") as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, index_path):
+        """Loads an index saved with :meth:`save`. Returns None if it was saved by a different version."""
+        with open(index_path, "r") as file:
+            data = json.load(file)
+        if data.get("version") != cls.VERSION:
+            return None
+        return cls(data["prefix"].encode("latin-1"), data["parts"], size=data["size"], mtime=data["mtime"])
+
+
+def _namespace(element):
+    # the "{uri}" prefix of the tag of an element, empty if it has no namespace
+    tag = element.tag
+    return tag[: tag.index("}") + 1] if tag[:1] == "{" else ""
+
+
+def _find(element, namespace, tag):
+    # finds a child in the namespace of its parent first, which is much faster than the "{*}" wildcard
+    if element is None:
+        return None
+    child = element.find(namespace + tag)
+    if child is None:
+        child = element.find("{*}" + tag)
+    return child
+
+
+def _cross(u, v):
+    return [u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0]]
+
+
+def _unitized(vector):
+    length = math.sqrt(vector[0] ** 2 + vector[1] ** 2 + vector[2] ** 2)
+    if not length:
+        raise ValueError("Zero length vector in Transformation")
+    return [vector[0] / length, vector[1] / length, vector[2] / length]
+
+
+@dataclass
+class _PartRecord(object):
+    """The parsed contents of a BTLx part, from which the element and its processings are created.
+
+    Processings are ``(processing_name, kwargs)`` tuples, or the :class:`~compas_timber.errors.BTLxParsingError` of a
+    processing which could not be parsed. When reading lazily, processings is the raw XML of the Processings element
+    of the part instead, as a ``<Parts>`` document of its own, or None. Records can be pickled, so that parts can be parsed in worker processes.
+
+    """
+
+    element_type: str
+    guid: str
+    name: str
+    single_member_number: str
+    frame: Frame
+    length: float
+    width: float
+    height: float
+    processings: list
+
+
+class _DeferredProcessings(object):
+    """Parses the processings of a part into features, when the features of its element are first accessed."""
+
+    __slots__ = ("reader", "processings_elem", "part_id")
+
+    def __init__(self, reader, processings_elem, part_id):
+        self.reader = reader
+        self.processings_elem = processings_elem
+        self.part_id = part_id
+
+    def __call__(self):
+        processings_elem = self.processings_elem
+        if isinstance(processings_elem, bytes):
+            processings_elem = ET.fromstring(processings_elem)[0]
+        features = []
+        for processing_elem in processings_elem:
+            try:
+                features.append(self.reader._parse_processing(processing_elem))
+            except BTLxParsingError as e:
+                self.reader._errors.append(BTLxParsingError(e.message, part_id=self.part_id, processing_type=e.processing_type))
+        return features
+
+
+_DECLARATION = re.compile(rb"\s*<\?xml[^>]*\?>")  # its pseudo-attributes cannot contain ">"
+
+
+def _element_end(buffer, position, name):
+    """The offset of the end of an element in ``buffer``, from the position of its expat end event.
+
+    The end event of an element is at the start of its end tag, or at the end of its empty-element tag. The two are told
+    apart by whether an end tag with the name of the element follows, which is ambiguous only for an empty element
+    directly in an element of the same name, e.g. ``<Part><Part/></Part>``.
+
+    """
+    tag = b"</" + name.encode("utf-8")
+    following = buffer[position + len(tag) : position + len(tag) + 1]
+    if buffer.startswith(tag, position) and (following == b">" or following.isspace()):
+        return buffer.index(b">", position) + 1  # an end tag has no attributes which could contain ">"
+    return position
+
+
+class _PartScanner(object):
+    """Finds the parts of a BTLx file with an expat parser, without building their elements.
+
+    The offsets of the parts are taken from the positions the parser reports, so ``>`` in attribute values, comments
+    and CDATA sections are handled like any XML parser does. Each block fed to :attr:`parser` must first be appended to
+    :attr:`buffer`, which holds the file from the offset :attr:`base` on. The parts found are collected in :attr:`parts`
+    as ``(start, end, keys)``, see :func:`_iter_raw_parts`, until :meth:`trim` is called.
+
+    """
+
+    def __init__(self):
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.buffer = b""
+        self.base = 0
+        self.prefix = None
+        self.parts = []
+        self.found_project = False
+        self.done = False
+        self._depth = 0
+        self._parts_depth = None
+        self._namespaces = []  # the namespace declarations of the open elements, until the Parts element is found
+        self._part = None
+        self._keep = 0  # the offset from which the buffer is still needed
+
+    def _start(self, name, attributes):
+        if self.done:
+            return
+        self._depth += 1
+        local = name.rpartition(":")[2]
+        if self._parts_depth is None:
+            self._namespaces.append({key: value for key, value in attributes.items() if key == "xmlns" or key.startswith("xmlns:")})
+            if local == "Project":
+                self.found_project = True
+            elif local == "Parts":
+                if not self.found_project:
+                    raise ValueError("No Project element found in BTLx file")
+                self._parts_depth = self._depth
+                self.prefix = self._parts_prefix()
+                self._keep = self.parser.CurrentByteIndex
+        elif self._depth == self._parts_depth + 1:
+            if local == "Part":
+                self._part = [self.parser.CurrentByteIndex, None, attributes.get("SingleMemberNumber", ""), attributes.get("Annotation", ""), attributes.get("Designation", "")]
+                self._keep = self._part[0]
+        elif self._part is not None and self._part[1] is None and local == "Transformation":
+            self._part[1] = attributes.get("GUID", "")
+
+    def _end(self, name):
+        if self.done:
+            return
+        depth = self._depth
+        self._depth -= 1
+        if self._parts_depth is None:
+            self._namespaces.pop()
+        elif depth == self._parts_depth + 1 and self._part is not None:
+            start, guid, single_member_number, annotation, designation = self._part
+            end = _element_end(self.buffer, self.parser.CurrentByteIndex - self.base, name) + self.base
+            self.parts.append((start, end, ((guid or "").strip("{}").lower(), single_member_number, annotation, designation)))
+            self._part = None
+            self._keep = end
+        elif depth == self._parts_depth:
+            self.done = True
+
+    def _parts_prefix(self):
+        # the XML declaration and a Parts start tag with the namespace declarations of the Parts element and its ancestors
+        namespaces = {}
+        for declarations in self._namespaces:
+            namespaces.update(declarations)
+        declaration = _DECLARATION.match(self.buffer)  # the buffer still starts at the start of the file
+        attributes = "".join(" {}={}".format(key, quoteattr(value)) for key, value in namespaces.items())
+        return (declaration.group(0) if declaration else b"") + b"<Parts" + attributes.encode("utf-8") + b">"
+
+    def trim(self):
+        """Forgets the parts found so far and drops the part of the buffer which is no longer needed."""
+        self.parts = []
+        self.buffer = self.buffer[self._keep - self.base :]
+        self.base = self._keep
+
+
+def _iter_raw_parts(stream, block_size=1 << 20):
+    """Splits the Parts of a BTLx file into the raw XML of each part, without building its elements.
+
+    Yields a tuple ``(prefix, offset, segment, keys)`` per part: the XML declaration of the file and a ``<Parts>`` start
+    tag with its namespace declarations, the offset of the segment in the (uncompressed) file, the XML of the Part
+    element, and its GUID, ``SingleMemberNumber``, ``Annotation`` and ``Designation``. The GUID is the one of its first
+    Transformation, in lower case and without braces. ``prefix + segment + b"</Parts>"`` can be parsed on its own.
+
+    Raises
+    ------
+    ValueError
+        If the file has no Project element.
+    :class:`xml.etree.ElementTree.ParseError`
+        If the file is not well-formed, e.g. it ends within the Parts element. The parts before the error are yielded
+        first.
+
+    """
+    scanner = _PartScanner()
+    error = None
+    while not scanner.done:
+        block = stream.read(block_size)
+        scanner.buffer += block
+        try:
+            scanner.parser.Parse(block, not block)
+        except expat.ExpatError as e:
+            error = e
+        for start, end, keys in scanner.parts:
+            yield scanner.prefix, start, scanner.buffer[start - scanner.base : end - scanner.base], keys
+        scanner.trim()
+        if error is not None:
+            raise ET.ParseError("{} in the BTLx file".format(error)) from error
+        if not block:
+            break
+
+    if scanner.prefix is None:
+        if not scanner.found_project:
+            raise ValueError("No Project element found in BTLx file")
+        warn("No Parts element found in BTLx file")
+
+
+def _iter_part_chunks(stream, chunk_size, block_size=1 << 20):
+    """Splits the Parts of a BTLx file into XML documents of up to ``chunk_size`` parts each, without parsing them.
+
+    Each chunk is a ``<Parts>`` element with the namespace declarations of the file, so it can be parsed on its own.
+    Raises like :func:`_iter_raw_parts`, after the chunk of the parts before the end of a truncated file was yielded.
+
+    """
+    prefix = None
+    segments = []
+    try:
+        for prefix, _, segment, _ in _iter_raw_parts(stream, block_size):
+            segments.append(segment)
+            if len(segments) == chunk_size:
+                yield prefix + b"".join(segments) + b"</Parts>"
+                segments = []
+    except ET.ParseError:
+        if segments:
+            yield prefix + b"".join(segments) + b"</Parts>"
+        raise
+    if segments:
+        yield prefix + b"".join(segments) + b"</Parts>"
+
+
+def _cut_processings(chunk):
+    """Cuts the Processings elements of the parts out of a chunk of parts, finding them with an expat parser.
+
+    Returns the chunk with an empty Processings element in place of each of them, and the raw XML of each of them in
+    order, as a ``<Parts>`` element which can be parsed on its own.
+
+    """
+    prefix = chunk[: chunk.index(b">", chunk.index(b"<Parts")) + 1]  # written by _PartScanner, with escaped values
+    spans = []
+    starts = []
+    depth = [0]
+    parser = expat.ParserCreate()
+
+    def start(name, attributes):
+        depth[0] += 1
+        if depth[0] == 3 and name.rpartition(":")[2] == "Processings":  # Parts/Part/Processings
+            starts.append(parser.CurrentByteIndex)
+
+    def end(name):
+        if depth[0] == 3 and name.rpartition(":")[2] == "Processings":
+            spans.append((starts.pop(), _element_end(chunk, parser.CurrentByteIndex, name), name))
+        depth[0] -= 1
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(chunk, True)
+
+    pieces = []
+    processings = []
+    position = 0
+    for start, end, name in spans:
+        pieces.append(chunk[position:start])
+        pieces.append(b"<" + name.encode("utf-8") + b"/>")
+        processings.append(prefix + chunk[start:end] + b"</Parts>")
+        position = end
+    pieces.append(chunk[position:])
+    return b"".join(pieces), processings
+
+
+def _chunk_records(reader, chunk):
+    """Parses a chunk of parts from :func:`_iter_part_chunks` into records, or the errors of parts which failed.
+
+    When reading lazily, the processings are cut out of the chunk before it is parsed and added to the records as raw XML.
+
+    """
+    processings = []
+    if reader.lazy:
+        chunk, processings = _cut_processings(chunk)
+        processings.reverse()
+
+    records = []
+    for part_elem in ET.fromstring(chunk):
+        if part_elem.tag.rpartition("}")[2] != "Part":
+            continue
+        part_processings = None
+        if processings and _find(part_elem, _namespace(part_elem), "Processings") is not None:
+            part_processings = processings.pop()
+        try:
+            record = reader._part_record(part_elem)
+        except BTLxParsingError as e:
+            records.append(e)
+            continue
+        if part_processings is not None:
+            record.processings = part_processings
+        records.append(record)
+    return records
+
+
+_chunk_readers = {}
+
+
+def _parse_part_chunk(chunk, lazy=False):
+    """Parses a chunk of parts into records, in a worker process. Returns the records and the messages of any warnings."""
+    if lazy not in _chunk_readers:
+        _chunk_readers[lazy] = BTLxReader(lazy=lazy)
+    reader = _chunk_readers[lazy]
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        records = _chunk_records(reader, chunk)
+    return records, [str(warning.message) for warning in caught]
+
+
+def _skip(stream, count, block_size=1 << 20):
+    # reads past the next count bytes of a stream
+    while count > 0:
+        skipped = len(stream.read(min(count, block_size)))
+        if not skipped:
+            return
+        count -= skipped
+
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+@contextmanager
+def open_btlx(file_or_path):
+    """Opens a BTLx file for reading, decompressing it on the fly if it is compressed.
+
+    The compression is detected from the first bytes of the file: BTLZ archives (zip) and gzip compressed files are
+    supported. Of a zip archive, the first entry with the extension ``.btlx`` is read, or the first entry if none has it.
+
+    Parameters
+    ----------
+    file_or_path : str | os.PathLike | file-like
+        The path to the file, or a binary stream positioned at the start of the file.
+
+    Yields
+    ------
+    file-like
+        A binary stream of the uncompressed BTLx XML.
+
+    """
+    if isinstance(file_or_path, (str, os.PathLike)):
+        with open(file_or_path, "rb") as file:
+            with open_btlx(file) as stream:
+                yield stream
+        return
+
+    stream = file_or_path if hasattr(file_or_path, "peek") else io.BufferedReader(file_or_path)
+    magic = stream.peek(4)[:4]
+    if magic.startswith(_GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=stream, mode="rb") as decompressed:
+            yield decompressed
+    elif magic == _ZIP_MAGIC:
+        with zipfile.ZipFile(stream) as archive:
+            names = archive.namelist()
+            if not names:
+                raise ValueError("The BTLZ archive is empty.")
+            btlx_names = [name for name in names if name.lower().endswith(".btlx")]
+            with archive.open(btlx_names[0] if btlx_names else names[0]) as decompressed:
+                yield decompressed
+    else:
+        yield stream
+
+
 def xml_to_contour(element):
     """Converts a Contour XML element to a Contour object.
 
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import numpy as np
+from compas.data import Data
+from compas.datastructures import Mesh
+from compas.geometry import Point
+from compas.geometry import Vector
+
+from compas_timber.csg import mesh_boolean_intersection
+
+if TYPE_CHECKING:
+    from compas_model.elements import Element
+
+    from compas_timber.model import TimberModel
+
+
+class Clash(Data):
+    """The physical interference between two elements of a model.
+
+    Parameters
+    ----------
+    element_a : :class:`~compas_model.elements.Element`
+        The first element involved in the clash.
+    element_b : :class:`~compas_model.elements.Element`
+        The second element involved in the clash.
+    depth : float
+        The penetration depth of the two elements' oriented bounding boxes, i.e. the minimum distance
+        one of them has to be moved for the boxes to stop overlapping.
+    axis : :class:`~compas.geometry.Vector`
+        The unit direction along which ``depth`` was measured.
+    location : :class:`~compas.geometry.Point`
+        The center of the overlap of the two elements' axis aligned bounding boxes.
+    volume : float, optional
+        The volume of the intersection of the two elements' geometries. Only set if the clashes were computed with
+        ``check_geometry=True``, and None if the intersection could not be computed, e.g. because a Brep boolean failed.
+    element_guids : tuple(str, str), optional
+        The guids of the two elements. Only given when deserializing, in which case the elements are None until
+        :meth:`restore_elements_from_keys` is called.
+
+    """
+
+    @property
+    def __data__(self):
+        return {
+            "element_a": self.element_guids[0],
+            "element_b": self.element_guids[1],
+            "depth": self.depth,
+            "axis": self.axis,
+            "location": self.location,
+            "volume": self.volume,
+        }
+
+    @classmethod
+    def __from_data__(cls, data):
+        element_guids = (data["element_a"], data["element_b"])
+        return cls(None, None, data["depth"], data["axis"], data["location"], volume=data.get("volume"), element_guids=element_guids)
+
+    def __init__(
+        self,
+        element_a: Optional[Element],
+        element_b: Optional[Element],
+        depth: float,
+        axis: Vector,
+        location: Point,
+        volume: Optional[float] = None,
+        element_guids: Optional[tuple[str, str]] = None,
+    ):
+        super(Clash, self).__init__()
+        self.element_a = element_a
+        self.element_b = element_b
+        self.depth = depth
+        self.axis = axis
+        self.location = location
+        self.volume = volume
+        if element_guids is None:
+            element_guids = (str(element_a.guid), str(element_b.guid))
+        self.element_guids = tuple(element_guids)
+
+    def __repr__(self):
+        names = [element.name if element is not None else guid for element, guid in zip((self.element_a, self.element_b), self.element_guids)]
+        return "Clash({}, {}, depth={:.3f})".format(names[0], names[1], self.depth)
+
+    def restore_elements_from_keys(self, model: TimberModel) -> None:
+        """Restores the references to the two elements of a deserialized clash from their guids.
+
+        Parameters
+        ----------
+        model : :class:`~compas_timber.model.TimberModel`
+            The model containing the elements.
+
+        """
+        self.element_a, self.element_b = (model[guid] for guid in self.element_guids)
+
+
+class ClashDetector(object):
+    """Finds physical interference between the elements of a model.
+
+    Detection runs in two phases:
+
+    * broad phase: sweep and prune over the elements' axis aligned bounding boxes (``element.aabb``) yields the pairs whose boxes overlap.
+    * narrow phase: separating axis test (SAT) on the oriented bounding boxes (``element.obb``) of these pairs, vectorized over all pairs.
+
+    Pairs which are connected by a joint in the model's interaction graph are excluded, as are elements and their
+    ancestors in the model tree (e.g. a panel and its plates). Optionally, the geometry of the remaining pairs
+    is intersected to measure the actual overlap after features were applied.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to check.
+    min_depth : float, optional
+        Pairs whose bounding boxes overlap by less than this are not considered clashing, so that touching elements are
+        not reported. Defaults to the model's absolute tolerance.
+    exclude_joined : bool, optional
+        If True (default), pairs of elements connected by a joint are not reported.
+    workers : int, optional
+        If larger than 1, the narrow phase is split into chunks which are processed by this many threads.
+    chunk_size : int, optional
+        The number of pairs processed at once in the narrow phase.
+
+    """
+
+    def __init__(self, model: TimberModel, min_depth: Optional[float] = None, exclude_joined: bool = True, workers: Optional[int] = None, chunk_size: int = 10000):
+        self.model = model
+        self.min_depth = model.tolerance.absolute if min_depth is None else min_depth
+        self.exclude_joined = exclude_joined
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def default_elements(self) -> List[Element]:
+        """The elements checked when none are given: all beams, plates and panels of the model."""
+        return list(self.model.beams) + list(self.model.plates) + list(self.model.panels)
+
+    def find_clashes(self, elements: Optional[Iterable[Element]] = None, check_geometry: bool = False) -> List[Clash]:
+        """Find all clashing pairs among the given elements.
+
+        Parameters
+        ----------
+        elements : list(:class:`~compas_model.elements.Element`), optional
+            The elements to check. Defaults to :meth:`default_elements`.
+        check_geometry : bool, optional
+            If True, the geometries of pairs whose oriented bounding boxes overlap are intersected and only pairs with
+            a non-empty intersection are reported. This is considerably slower. Pairs whose intersection cannot be
+            computed are reported with a ``volume`` of None.
+
+        Returns
+        -------
+        list(:class:`Clash`)
+            The clashes, ordered by the order of the elements.
+
+        """
+        elements = list(elements) if elements is not None else self.default_elements()
+        if len(elements) < 2:
+            return []
+
+        pairs = self.broad_phase(elements)
+        pairs = self._exclude_related(elements, pairs)
+        if not len(pairs):
+            return []
+
+        centers, axes, extents = _obb_arrays(elements)
+        depths, directions = self.narrow_phase(centers, axes, extents, pairs)
+        clashing = depths > self.min_depth
+
+        mins, maxs = _aabb_arrays(elements)
+        clashes = []
+        for (i, j), depth, direction in zip(pairs[clashing], depths[clashing], directions[clashing]):
+            location = (np.maximum(mins[i], mins[j]) + np.minimum(maxs[i], maxs[j])) * 0.5
+            clash = Clash(elements[i], elements[j], float(depth), Vector(*direction.tolist()), Point(*location.tolist()))
+            if check_geometry:
+                clash.volume = _intersection_volume(elements[i].geometry, elements[j].geometry)
+                if clash.volume is not None and clash.volume <= self.min_depth**3:
+                    continue
+            clashes.append(clash)
+        return clashes
+
+    # ==========================================================================
+    # phases
+    # ==========================================================================
+
+    def broad_phase(self, elements: List[Element]) -> np.ndarray:
+        """Returns the index pairs of the elements whose axis aligned bounding boxes overlap.
+
+        Parameters
+        ----------
+        elements : list(:class:`~compas_model.elements.Element`)
+            The elements to check.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (n, 2) with ``i < j`` in every row.
+
+        """
+        mins, maxs = _aabb_arrays(elements)
+        return _sweep_and_prune(mins, maxs, self.min_depth)
+
+    def narrow_phase(self, centers: np.ndarray, axes: np.ndarray, extents: np.ndarray, pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Separating axis test on the oriented bounding boxes of the given pairs.
+
+        Parameters
+        ----------
+        centers : numpy.ndarray
+            Box centers, shape (m, 3).
+        axes : numpy.ndarray
+            Box axes as rows, shape (m, 3, 3).
+        extents : numpy.ndarray
+            Box half sizes, shape (m, 3).
+        pairs : numpy.ndarray
+            Index pairs to test, shape (n, 2).
+
+        Returns
+        -------
+        tuple(numpy.ndarray, numpy.ndarray)
+            The penetration depth per pair, negative if the boxes are separated, and the axis it was measured along.
+
+        """
+        chunks = [pairs[start : start + self.chunk_size] for start in range(0, len(pairs), self.chunk_size)]
+
+        def run(chunk):
+            return _sat_obb(centers[chunk[:, 0]], axes[chunk[:, 0]], extents[chunk[:, 0]], centers[chunk[:, 1]], axes[chunk[:, 1]], extents[chunk[:, 1]])
+
+        if self.workers and self.workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(run, chunks))  # numpy releases the GIL for the heavy lifting
+        else:
+            results = [run(chunk) for chunk in chunks]
+        return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+    def _exclude_related(self, elements: List[Element], pairs: np.ndarray) -> np.ndarray:
+        # removes pairs connected by a joint or by a parent-child relation in the model tree
+        excluded = set()
+        if self.exclude_joined:
+            graph = self.model.graph
+            for edge in graph.edges():
+                if graph.edge_attribute(edge, "joints"):
+                    excluded.add(frozenset(edge))
+
+        ancestors = [_ancestor_nodes(element) for element in elements]
+        nodes = [element.graphnode for element in elements]
+        keep = []
+        for index, (i, j) in enumerate(pairs):
+            if frozenset((nodes[i], nodes[j])) in excluded:
+                continue
+            if nodes[i] in ancestors[j] or nodes[j] in ancestors[i]:
+                continue
+            keep.append(index)
+        return pairs[keep]
+
+
+# ==========================================================================
+# helpers
+# ==========================================================================
+
+
+def _aabb_arrays(elements):
+    boxes = [element.aabb for element in elements]
+    mins = np.array([[box.xmin, box.ymin, box.zmin] for box in boxes], dtype=float)
+    maxs = np.array([[box.xmax, box.ymax, box.zmax] for box in boxes], dtype=float)
+    return mins, maxs
+
+
+def _obb_arrays(elements):
+    boxes = [element.obb for element in elements]
+    centers = np.array([box.frame.point for box in boxes], dtype=float)
+    axes = np.array([[box.frame.xaxis, box.frame.yaxis, box.frame.zaxis] for box in boxes], dtype=float)
+    extents = np.array([[box.xsize, box.ysize, box.zsize] for box in boxes], dtype=float) * 0.5
+    return centers, axes, extents
+
+
+def _ancestor_nodes(element):
+    nodes = set()
+    parent = element.parent
+    while parent is not None:
+        nodes.add(parent.graphnode)
+        parent = parent.parent
+    return nodes
+
+
+def _sweep_and_prune(mins, maxs, min_overlap=0.0):
+    """Index pairs (i < j) of boxes overlapping by more than ``min_overlap`` on all three axes."""
+    order = np.argsort(mins[:, 0], kind="stable")
+    sorted_mins = mins[order, 0]
+    # for every box, the boxes that start before it ends on x are the only x-overlap candidates
+    ends = np.searchsorted(sorted_mins, maxs[order, 0] - min_overlap, side="left")
+    found = []
+    for position in range(len(order)):
+        end = ends[position]
+        if end <= position + 1:
+            continue
+        i = order[position]
+        candidates = order[position + 1 : end]
+        overlap = np.minimum(maxs[i], maxs[candidates]) - np.maximum(mins[i], mins[candidates])
+        hits = candidates[np.all(overlap > min_overlap, axis=1)]
+        if len(hits):
+            found.append(np.column_stack((np.minimum(hits, i), np.maximum(hits, i))))
+    if not found:
+        return np.empty((0, 2), dtype=int)
+    pairs = np.concatenate(found)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def _sat_obb(center_a, axes_a, extents_a, center_b, axes_b, extents_b):
+    """Vectorized separating axis test between n pairs of oriented boxes.
+
+    Returns the overlap along the axis of least penetration (negative if separated) and that axis, per pair.
+
+    """
+    count = len(center_a)
+    crosses = np.cross(axes_a[:, :, None, :], axes_b[:, None, :, :]).reshape(count, 9, 3)
+    candidates = np.concatenate((axes_a, axes_b, crosses), axis=1)  # (n, 15, 3)
+    lengths = np.linalg.norm(candidates, axis=2)
+    valid = lengths > 1e-9  # cross products of parallel edges do not define an axis
+    candidates = candidates / np.where(valid, lengths, 1.0)[:, :, None]
+
+    radius_a = np.abs(np.einsum("nkd,nid->nki", candidates, axes_a)) @ extents_a[:, :, None]
+    radius_b = np.abs(np.einsum("nkd,nid->nki", candidates, axes_b)) @ extents_b[:, :, None]
+    distance = np.abs(np.einsum("nkd,nd->nk", candidates, center_b - center_a))
+    overlaps = radius_a[:, :, 0] + radius_b[:, :, 0] - distance
+    overlaps = np.where(valid, overlaps, np.inf)
+
+    best = np.argmin(overlaps, axis=1)
+    rows = np.arange(count)
+    return overlaps[rows, best], candidates[rows, best]
+
+
+def _closed_mesh(geometry):
+    """The geometry as a closed mesh, a brep is tesselated and its vertices welded."""
+    if isinstance(geometry, Mesh):
+        return geometry
+    tesselation = geometry.to_tesselation()
+    mesh = tesselation[0] if isinstance(tesselation, tuple) else tesselation  # some backends also return the edges
+    mesh.weld()
+    return mesh
+
+
+def _intersection_volume(geometry_a, geometry_b):
+    """The volume of the intersection of two closed geometries, brep or mesh. None if it cannot be computed."""
+    if isinstance(geometry_a, Mesh) or isinstance(geometry_b, Mesh):
+        # mesh geometry backend, on which panels are still breps
+        intersection = mesh_boolean_intersection(_closed_mesh(geometry_a), _closed_mesh(geometry_b))
+        if not intersection.number_of_faces():
+            return 0.0
+        return intersection.volume()  # None if the result is not closed
+    try:
+        intersection = geometry_a & geometry_b
+    except Exception:
+        # a failed boolean says nothing about the overlap, the pair is reported with an unknown volume
+        return None
+    if isinstance(intersection, list):
+        return sum(brep.volume for brep in intersection)
+    return intersection.volume
+
+
+__all__ = [
+    "Clash",
+    "ClashDetector",
+]
@@ -0,0 +1,510 @@
+"""Boolean operations on closed polygonal meshes.
+
+These are used by the mesh geometry backend (see :class:`~compas_timber.geometry.GeometryBackend`) to apply features
+without a Brep kernel, e.g. on headless workers where OCC is not available.
+
+The implementation is a binary space partitioning (BSP) CSG in the spirit of csg.js: every polygon of one solid is
+clipped against a BSP tree built from the other. It relies on nothing but plain python, works on any closed, consistently
+oriented mesh and produces closed meshes, at the cost of a higher polygon count than a Brep kernel would produce.
+The trees are walked iteratively rather than recursively, so large inputs do not run into the recursion limit.
+
+"""
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Polygon
+from compas.geometry import bounding_box
+from compas.geometry import earclip_polygon
+from compas.geometry import is_polygon_convex
+
+EPSILON = 1e-5
+"""float: Distance under which a vertex is considered to lie on a splitting plane."""
+
+_COPLANAR = 0
+_FRONT = 1
+_BACK = 2
+_SPANNING = 3
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _lerp(a, b, t):
+    return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, a[2] + (b[2] - a[2]) * t)
+
+
+class _CSGPlane(object):
+    __slots__ = ("normal", "w")
+
+    def __init__(self, normal, w):
+        self.normal = normal
+        self.w = w
+
+    @classmethod
+    def from_points(cls, a, b, c):
+        n = _cross(_sub(b, a), _sub(c, a))
+        length = _dot(n, n) ** 0.5
+        if length < EPSILON * EPSILON:
+            return None
+        n = (n[0] / length, n[1] / length, n[2] / length)
+        return cls(n, _dot(n, a))
+
+    def flip(self):
+        self.normal = (-self.normal[0], -self.normal[1], -self.normal[2])
+        self.w = -self.w
+
+    def split_polygon(self, polygon, coplanar_front, coplanar_back, front, back):
+        """Sort ``polygon`` into one of the four lists, splitting it if it spans this plane."""
+        normal = self.normal
+        w = self.w
+        polygon_type = 0
+        types = []
+        for vertex in polygon.vertices:
+            t = _dot(normal, vertex) - w
+            vertex_type = _BACK if t < -EPSILON else (_FRONT if t > EPSILON else _COPLANAR)
+            polygon_type |= vertex_type
+            types.append(vertex_type)
+
+        if polygon_type == _COPLANAR:
+            if _dot(normal, polygon.plane.normal) > 0:
+                coplanar_front.append(polygon)
+            else:
+                coplanar_back.append(polygon)
+        elif polygon_type == _FRONT:
+            front.append(polygon)
+        elif polygon_type == _BACK:
+            back.append(polygon)
+        else:
+            f = []
+            b = []
+            vertices = polygon.vertices
+            count = len(vertices)
+            for i in range(count):
+                j = (i + 1) % count
+                ti = types[i]
+                tj = types[j]
+                vi = vertices[i]
+                vj = vertices[j]
+                if ti != _BACK:
+                    f.append(vi)
+                if ti != _FRONT:
+                    b.append(vi)
+                if (ti | tj) == _SPANNING:
+                    t = (w - _dot(normal, vi)) / _dot(normal, _sub(vj, vi))
+                    v = _lerp(vi, vj, t)
+                    f.append(v)
+                    b.append(v)
+            if len(f) >= 3:
+                front.append(_CSGPolygon(f, polygon.plane))
+            if len(b) >= 3:
+                back.append(_CSGPolygon(b, polygon.plane))
+
+
+class _CSGPolygon(object):
+    __slots__ = ("vertices", "plane")
+
+    def __init__(self, vertices, plane):
+        self.vertices = vertices
+        self.plane = plane
+
+    def flipped(self):
+        plane = _CSGPlane(self.plane.normal, self.plane.w)
+        plane.flip()
+        return _CSGPolygon(self.vertices[::-1], plane)
+
+
+class _BSPNode(object):
+    __slots__ = ("plane", "front", "back", "polygons")
+
+    def __init__(self, polygons=None):
+        self.plane = None
+        self.front = None
+        self.back = None
+        self.polygons = []
+        if polygons:
+            self.build(polygons)
+
+    def nodes(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.front:
+                stack.append(node.front)
+            if node.back:
+                stack.append(node.back)
+
+    def invert(self):
+        for node in self.nodes():
+            node.polygons = [polygon.flipped() for polygon in node.polygons]
+            if node.plane:
+                node.plane.flip()
+            node.front, node.back = node.back, node.front
+
+    def clip_polygons(self, polygons):
+        """Remove the parts of ``polygons`` that are inside the solid represented by this tree."""
+        result = []
+        stack = [(self, polygons)]
+        while stack:
+            node, polygons = stack.pop()
+            if node.plane is None:
+                result.extend(polygons)
+                continue
+            front = []
+            back = []
+            for polygon in polygons:
+                node.plane.split_polygon(polygon, front, back, front, back)
+            if node.front:
+                stack.append((node.front, front))
+            else:
+                result.extend(front)
+            if node.back:
+                stack.append((node.back, back))
+        return result
+
+    def clip_to(self, other):
+        for node in self.nodes():
+            node.polygons = other.clip_polygons(node.polygons)
+
+    def all_polygons(self):
+        polygons = []
+        for node in self.nodes():
+            polygons.extend(node.polygons)
+        return polygons
+
+    def contains(self, point):
+        """True if ``point`` is inside the solid represented by this tree."""
+        node = self
+        while True:
+            if node.plane is None:
+                return False
+            if _dot(node.plane.normal, point) - node.plane.w >= 0:
+                if node.front is None:
+                    return False
+                node = node.front
+            else:
+                if node.back is None:
+                    return True
+                node = node.back
+
+    def build(self, polygons):
+        stack = [(self, polygons)]
+        while stack:
+            node, polygons = stack.pop()
+            if not polygons:
+                continue
+            if node.plane is None:
+                node.plane = _CSGPlane(polygons[0].plane.normal, polygons[0].plane.w)
+            front = []
+            back = []
+            for polygon in polygons:
+                node.plane.split_polygon(polygon, node.polygons, node.polygons, front, back)
+            if front:
+                if node.front is None:
+                    node.front = _BSPNode()
+                stack.append((node.front, front))
+            if back:
+                if node.back is None:
+                    node.back = _BSPNode()
+                stack.append((node.back, back))
+
+
+# ==========================================================================
+# conversion
+# ==========================================================================
+
+
+def _polygons_from_mesh(mesh):
+    vertices, faces = mesh.to_vertices_and_faces()
+    vertices = [tuple(vertex) for vertex in vertices]
+    polygons = []
+    for face in faces:
+        points = [vertices[index] for index in face]
+        if len(points) > 3 and not is_polygon_convex(points):
+            loops = [[points[i] for i in triangle] for triangle in earclip_polygon(Polygon(points))]
+        else:
+            loops = [points]
+        for loop in loops:
+            plane = _CSGPlane.from_points(*loop[:3])
+            if plane is None:
+                # degenerate (zero area) face, it bounds nothing
+                continue
+            polygons.append(_CSGPolygon(loop, plane))
+    if _signed_volume(polygons) < 0:
+        # inward facing input, e.g. a cutting volume with reversed faces
+        polygons = [polygon.flipped() for polygon in polygons]
+    return polygons
+
+
+def _signed_volume(polygons):
+    volume = 0.0
+    for polygon in polygons:
+        vertices = polygon.vertices
+        for i in range(1, len(vertices) - 1):
+            volume += _dot(vertices[0], _cross(vertices[i], vertices[i + 1]))
+    return volume / 6.0
+
+
+def _mesh_from_polygons(polygons, precision=None):
+    """Weld the polygon vertices into a mesh, merging vertices closer than ``EPSILON``."""
+    scale = 1.0 / (precision or EPSILON)
+    index = {}
+    vertices = []
+    faces = []
+    for polygon in polygons:
+        face = []
+        for vertex in polygon.vertices:
+            key = (round(vertex[0] * scale), round(vertex[1] * scale), round(vertex[2] * scale))
+            vertex_index = index.get(key)
+            if vertex_index is None:
+                vertex_index = index[key] = len(vertices)
+                vertices.append(list(vertex))
+            if not face or face[-1] != vertex_index:
+                face.append(vertex_index)
+        if len(face) > 1 and face[0] == face[-1]:
+            face.pop()
+        if len(face) >= 3:
+            faces.append(face)
+    _resolve_t_junctions(vertices, faces)
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def _resolve_t_junctions(vertices, faces):
+    """Insert vertices lying on the open edges of ``faces`` into those edges, in place.
+
+    Splitting polygons against the BSP planes leaves T-junctions where a neighbouring polygon was split and this one was not.
+    Such vertices are always on unmatched (boundary) half-edges, so only those need to be searched.
+
+    """
+    halfedges = set()
+    for face in faces:
+        for i in range(len(face)):
+            halfedges.add((face[i], face[(i + 1) % len(face)]))
+    boundary = [(u, v) for u, v in halfedges if (v, u) not in halfedges]
+    if not boundary:
+        return
+    candidates = set()
+    for u, v in boundary:
+        candidates.add(u)
+        candidates.add(v)
+
+    inserts = {}
+    for u, v in boundary:
+        a = vertices[u]
+        ab = _sub(vertices[v], a)
+        length2 = _dot(ab, ab)
+        if length2 < EPSILON * EPSILON:
+            continue
+        on_edge = []
+        for w in candidates:
+            if w == u or w == v:
+                continue
+            aw = _sub(vertices[w], a)
+            t = _dot(aw, ab) / length2
+            if t <= 0.0 or t >= 1.0:
+                continue
+            offset = _sub(aw, (ab[0] * t, ab[1] * t, ab[2] * t))
+            if _dot(offset, offset) < EPSILON * EPSILON:
+                on_edge.append((t, w))
+        if on_edge:
+            inserts[u, v] = [w for _, w in sorted(on_edge)]
+
+    if not inserts:
+        return
+    for index, face in enumerate(faces):
+        loop = []
+        for i in range(len(face)):
+            u = face[i]
+            v = face[(i + 1) % len(face)]
+            loop.append(u)
+            loop.extend(inserts.get((u, v), ()))
+        faces[index] = loop
+
+
+# ==========================================================================
+# boolean operations
+# ==========================================================================
+
+
+def mesh_boolean_difference(mesh_a, mesh_b):
+    """Subtract one closed mesh from another.
+
+    Parameters
+    ----------
+    mesh_a : :class:`~compas.datastructures.Mesh`
+        The mesh to subtract from.
+    mesh_b : :class:`~compas.datastructures.Mesh`
+        The mesh to subtract.
+
+    Returns
+    -------
+    :class:`~compas.datastructures.Mesh`
+        The part of ``mesh_a`` which is outside of ``mesh_b``.
+
+    """
+    a = _BSPNode(_polygons_from_mesh(mesh_a))
+    b = _BSPNode(_polygons_from_mesh(mesh_b))
+    a.invert()
+    a.clip_to(b)
+    b.clip_to(a)
+    b.invert()
+    b.clip_to(a)
+    b.invert()
+    a.build(b.all_polygons())
+    a.invert()
+    return _mesh_from_polygons(a.all_polygons())
+
+
+def mesh_boolean_union(mesh_a, mesh_b):
+    """Join two closed meshes into one.
+
+    Parameters
+    ----------
+    mesh_a : :class:`~compas.datastructures.Mesh`
+        The first mesh.
+    mesh_b : :class:`~compas.datastructures.Mesh`
+        The second mesh.
+
+    Returns
+    -------
+    :class:`~compas.datastructures.Mesh`
+        The volume covered by either of the two meshes.
+
+    """
+    a = _BSPNode(_polygons_from_mesh(mesh_a))
+    b = _BSPNode(_polygons_from_mesh(mesh_b))
+    a.clip_to(b)
+    b.clip_to(a)
+    b.invert()
+    b.clip_to(a)
+    b.invert()
+    a.build(b.all_polygons())
+    return _mesh_from_polygons(a.all_polygons())
+
+
+def mesh_boolean_intersection(mesh_a, mesh_b):
+    """Intersect two closed meshes.
+
+    Parameters
+    ----------
+    mesh_a : :class:`~compas.datastructures.Mesh`
+        The first mesh.
+    mesh_b : :class:`~compas.datastructures.Mesh`
+        The second mesh.
+
+    Returns
+    -------
+    :class:`~compas.datastructures.Mesh`
+        The volume covered by both meshes.
+
+    """
+    a = _BSPNode(_polygons_from_mesh(mesh_a))
+    b = _BSPNode(_polygons_from_mesh(mesh_b))
+    a.invert()
+    b.clip_to(a)
+    b.invert()
+    a.clip_to(b)
+    b.clip_to(a)
+    a.build(b.all_polygons())
+    a.invert()
+    return _mesh_from_polygons(a.all_polygons())
+
+
+def mesh_components(mesh):
+    """Split a mesh into its connected components.
+
+    Boolean operations may produce several disjoint solids, which are returned as a single mesh.
+
+    Parameters
+    ----------
+    mesh : :class:`~compas.datastructures.Mesh`
+        The mesh to split.
+
+    Returns
+    -------
+    list[:class:`~compas.datastructures.Mesh`]
+        One mesh per connected component.
+
+    """
+    components = []
+    for faces in mesh.connected_faces():
+        vertices = {}
+        component_faces = []
+        for face in faces:
+            component_faces.append([vertices.setdefault(vertex, len(vertices)) for vertex in mesh.face_vertices(face)])
+        xyz = [None] * len(vertices)
+        for vertex, index in vertices.items():
+            xyz[index] = mesh.vertex_coordinates(vertex)
+        components.append(Mesh.from_vertices_and_faces(xyz, component_faces))
+    return components
+
+
+def mesh_contains_point(mesh, point):
+    """Check if a point is inside a closed mesh.
+
+    Parameters
+    ----------
+    mesh : :class:`~compas.datastructures.Mesh`
+        The closed mesh.
+    point : :class:`~compas.geometry.Point`
+        The point to test.
+
+    Returns
+    -------
+    bool
+        True if the point is inside the mesh.
+
+    """
+    return _BSPNode(_polygons_from_mesh(mesh)).contains(tuple(point))
+
+
+def mesh_trimmed(mesh, plane):
+    """Trim a closed mesh with a plane, keeping the part behind it.
+
+    Mirrors :meth:`compas_brep.Brep.trimmed`: the side the plane's normal points away from is kept.
+
+    Parameters
+    ----------
+    mesh : :class:`~compas.datastructures.Mesh`
+        The mesh to trim.
+    plane : :class:`~compas.geometry.Plane` | :class:`~compas.geometry.Frame`
+        The trimming plane.
+
+    Returns
+    -------
+    :class:`~compas.datastructures.Mesh`
+        The trimmed mesh.
+
+    """
+    if isinstance(plane, Frame):
+        plane = Plane.from_frame(plane)
+    # a box large enough to contain the whole mesh, with one face on the plane and the rest in front of it
+    box = Box.from_bounding_box(bounding_box(mesh.vertices_attributes("xyz")))
+    size = 2.0 * (box.xsize + box.ysize + box.zsize) + 1.0
+    origin = plane.projected_point(box.frame.point)
+    frame = Frame.from_plane(Plane(origin, plane.normal))
+    frame.point = origin + frame.zaxis * (size * 0.5)
+    cutter = Box(size, size, size, frame=frame)
+    return mesh_boolean_difference(mesh, cutter.to_mesh())
+
+
+__all__ = [
+    "EPSILON",
+    "mesh_boolean_difference",
+    "mesh_boolean_intersection",
+    "mesh_boolean_union",
+    "mesh_components",
+    "mesh_contains_point",
+    "mesh_trimmed",
+]
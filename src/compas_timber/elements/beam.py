@@ -16,7 +16,9 @@ from compas_model.elements import reset_computed
 from compas_timber.base import TimberElement
 from compas_timber.base import reset_timber_attrs
 from compas_timber.errors import FeatureApplicationError
+from compas_timber.geometry import GeometryBackend
 from compas_timber.utils import intersection_line_plane_param
+from compas_timber.utils import parametric_hash
 
 
 class Beam(TimberElement):
@@ -157,7 +159,8 @@ class Beam(TimberElement):
 
         Returns
         -------
-        :class:`compas.geometry.Brep`
+        :class:`compas.geometry.Brep` | :class:`compas.datastructures.Mesh`
+            A mesh if the model uses the mesh geometry backend, a brep otherwise.
 
         Raises
         ------
@@ -165,6 +168,16 @@ class Beam(TimberElement):
             If there is an error applying features to the element.
 
         """
+        if self.geometry_backend == GeometryBackend.MESH:
+            geometry = self.blank.transformed(self.transformation_to_local()).to_mesh()
+            if include_features:
+                for feature in self.features:
+                    try:
+                        geometry = feature.apply_to_mesh(geometry, self)
+                    except FeatureApplicationError as error:
+                        self.debug_info.append(error)
+            return geometry
+
         geometry = Brep.from_box(self.blank.transformed(self.transformation_to_local()))
         if include_features:
             for feature in self.features:
@@ -174,6 +187,19 @@ class Beam(TimberElement):
                     self.debug_info.append(error)
         return geometry
 
+    def compute_instance_key(self):
+        # type: () -> str
+        """Computes a hash of all the data which determines the geometry of this beam in local coordinates.
+
+        Returns
+        -------
+        str
+
+        """
+        start, end = self._resolve_blank_extensions()
+        data = [self.geometry_backend, self.width, self.height, self.length, start, end, self._features_instance_data(self.features)]
+        return "Beam:" + parametric_hash(data)
+
     def compute_aabb(self, inflate=0.0):
         # type: (float) -> compas.geometry.Box
         """Computes the Axis Aligned Bounding Box (AABB) of the element in global coordinates.
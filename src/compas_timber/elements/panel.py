@@ -394,6 +394,9 @@ class Panel(Element):
     def compute_elementgeometry(self, include_features: bool = True) -> Brep:
         """Compute the geometry of the element.
 
+        The geometry is always a Brep: panels do not support the mesh geometry backend of the model, see
+        :class:`~compas_timber.geometry.GeometryBackend`.
+
         Parameters
         ----------
         include_features : bool, optional
@@ -402,7 +405,7 @@ class Panel(Element):
 
         Returns
         -------
-        :class:`compas.datastructures.Mesh` | :class:`compas.geometry.Brep`
+        :class:`compas.geometry.Brep`
 
         """
 
@@ -17,8 +17,10 @@ from compas_model.elements import reset_computed
 from compas_timber.base import TimberElement
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.fabrication import FreeContour
+from compas_timber.geometry import GeometryBackend
 from compas_timber.utils import get_plate_geometry_outlines_from_brep
 from compas_timber.utils import get_polyline_normal_vector
+from compas_timber.utils import parametric_hash
 from compas_timber.utils import polylines_from_brep_face
 
 from .plate_geometry import PlateGeometry
@@ -266,10 +268,19 @@ class Plate(TimberElement):
         Returns
         -------
         :class:`compas.datastructures.Mesh` | :class:`compas.geometry.Brep`
+            A mesh if the model uses the mesh geometry backend, a brep otherwise.
 
         """
+        if self.geometry_backend == GeometryBackend.MESH:
+            plate_geo = self.plate_geometry.compute_shape_mesh()
+            if include_features:
+                for feature in self._features:
+                    try:
+                        plate_geo = feature.apply_to_mesh(plate_geo, self)
+                    except FeatureApplicationError as error:
+                        self.debug_info.append(error)
+            return plate_geo
 
-        # TODO: consider if Brep.from_curves(curves) is faster/better
         plate_geo = self.plate_geometry.compute_shape()
         if include_features:
             for feature in self._features:
@@ -279,6 +290,18 @@ class Plate(TimberElement):
                     self.debug_info.append(error)
         return plate_geo
 
+    def compute_instance_key(self) -> str:
+        """Computes a hash of all the data which determines the geometry of this plate in local coordinates.
+
+        Returns
+        -------
+        str
+
+        """
+        self.plate_geometry.apply_edge_extensions()
+        data = [self.geometry_backend, self.plate_geometry.outline_a, self.plate_geometry.outline_b, self._features_instance_data(self._features)]
+        return "Plate:" + parametric_hash(data)
+
     @classmethod
     def from_outlines(cls, outline_a: Polyline, outline_b: Polyline, openings: Optional[list[Polyline]] = None, orientation: Optional[Vector] = None, **kwargs):
         """
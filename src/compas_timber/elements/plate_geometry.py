@@ -1,6 +1,8 @@
 from typing import Optional
 
+import numpy as np
 from compas.data import Data
+from compas.datastructures import Mesh
 from compas.geometry import Box
 from compas.geometry import Frame
 from compas.geometry import Plane
@@ -14,6 +16,7 @@ from compas.tolerance import TOL
 from compas_brep import Brep
 
 from compas_timber.geometry import brep_from_outlines
+from compas_timber.geometry import mesh_from_outlines
 from compas_timber.utils import get_polyline_segment_perpendicular_vector
 from compas_timber.utils import move_polyline_segment_to_plane
 
@@ -83,6 +86,9 @@ class PlateGeometry(Data):
         self._original_edge_planes = {}
         self._set_original_attributes(local_outline_a, local_outline_b)
         self._extension_planes = {}
+        self._extended_state = None
+        self._shape_cache = None
+        self._shape_mesh_cache = None
 
     def __repr__(self):
         # type: () -> str
@@ -136,10 +142,23 @@ class PlateGeometry(Data):
 
     def apply_edge_extensions(self) -> None:
         """adjusts segments of the outlines to lay on the edge planes created by plate joints."""
-        # TODO: Add an optional edge_index argument to only apply a specific edge extension for performance?
-        for edge_index, plane in self.edge_planes.items():
-            for polyline in self._mutable_outlines:
-                move_polyline_segment_to_plane(polyline, edge_index, plane)
+        edge_planes = self.edge_planes
+        if self._outline_state(edge_planes) == self._extended_state:
+            return  # the outlines already lay on these planes
+        for polyline in self._mutable_outlines:
+            points = _outline_points_on_edge_planes(polyline, edge_planes)
+            if points is None:
+                for edge_index, plane in edge_planes.items():
+                    move_polyline_segment_to_plane(polyline, edge_index, plane)
+            else:
+                polyline.points = [Point(*point) for point in points]
+        self._extended_state = self._outline_state(edge_planes)
+
+    def _outline_state(self, edge_planes):
+        # identifies the outlines together with the planes they are extended to
+        planes = np.array([list(plane.point) + list(plane.normal) for plane in edge_planes.values()], dtype=float)
+        outlines = np.array([polyline.points for polyline in self._mutable_outlines], dtype=float)
+        return planes.tobytes() + outlines.tobytes()
 
     def remove_blank_extension(self, edge_index: Optional[int] = None):
         """Reverts any extension plane for the given edge index to the original and adjusts that ."""
@@ -175,9 +194,25 @@ class PlateGeometry(Data):
 
         """
         self.apply_edge_extensions()
-        plate_geo = brep_from_outlines(self.outline_a, self.outline_b)
+        if self._shape_cache is None or self._shape_cache[0] != self._extended_state:
+            self._shape_cache = (self._extended_state, brep_from_outlines(self.outline_a, self.outline_b))
+        return self._shape_cache[1].copy()  # features modify the shape in place
 
-        return plate_geo
+    def compute_shape_mesh(self) -> Mesh:
+        """The shape of the plate before other features area applied, as a closed mesh.
+
+        Used by the mesh geometry backend, see :class:`~compas_timber.geometry.GeometryBackend`.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The shape of the element.
+
+        """
+        self.apply_edge_extensions()
+        if self._shape_mesh_cache is None or self._shape_mesh_cache[0] != self._extended_state:
+            self._shape_mesh_cache = (self._extended_state, mesh_from_outlines(self.outline_a, self.outline_b))
+        return self._shape_mesh_cache[1].copy()
 
     # ==========================================================================
     #  class methods
@@ -297,3 +332,30 @@ class PlateGeometry(Data):
         # check if outline_b is planar and parallel to outline_a
         if not all(TOL.is_close(p[2], outline_b[0][2]) for p in outline_b.points):
             raise ValueError("Outline_b must be planar and parallel to outline_a.")
+
+
+def _outline_points_on_edge_planes(polyline, edge_planes):
+    """The points of a closed, planar outline after moving each of its segments onto the corresponding edge plane.
+
+    Every corner ends up at the intersection of the outline's own plane with the planes of its two adjacent segments,
+    which is where moving one segment at a time with :func:`~compas_timber.utils.move_polyline_segment_to_plane` puts it.
+    Returns None if that intersection is not defined for some corner, e.g. for two adjacent colinear segments.
+
+    """
+    points = np.array(polyline.points[:-1], dtype=float)
+    normal = np.cross(points, np.roll(points, -1, axis=0)).sum(axis=0)
+    length = np.linalg.norm(normal)
+    if length < TOL.absolute:
+        return None
+    normal /= length
+
+    planes = np.array([list(edge_planes[index].point) + list(edge_planes[index].normal) for index in range(len(points))], dtype=float)
+    normals = planes[:, 3:] / np.linalg.norm(planes[:, 3:], axis=1)[:, None]
+    offsets = np.einsum("ij,ij->i", normals, planes[:, :3])
+    # corner i is shared by segments i - 1 and i
+    matrices = np.stack((np.roll(normals, 1, axis=0), normals, np.broadcast_to(normal, normals.shape)), axis=1)
+    if np.any(np.abs(np.linalg.det(matrices)) < TOL.absolute):
+        return None
+    rhs = np.column_stack((np.roll(offsets, 1), offsets, np.full(len(points), np.dot(normal, points.mean(axis=0)))))
+    corners = np.linalg.solve(matrices, rhs[:, :, None])[:, :, 0]
+    return np.vstack((corners, corners[:1])).tolist()
@@ -2,6 +2,7 @@ from .btlx import BTLxWriter
 from .btlx import BTLxProcessing
 from .btlx import BTLxPart
 from .btlx import BTLxRawpart
+from .btlx import BTLxPartCache
 from .btlx import OrientationType
 from .jack_cut import JackRafterCut
 from .jack_cut import JackRafterCutProxy
@@ -73,6 +74,7 @@ __all__ = [
     "DualContour",
     "LongitudinalCut",
     "BTLxRawpart",
+    "BTLxPartCache",
     "SimpleScarf",
     "LongitudinalCutProxy",
     "BirdsMouth",
@@ -1,18 +1,30 @@
+import asyncio
+import gzip
+import io
+import json
 import math
+import multiprocessing
 import os
+import threading
 import uuid
 import xml.dom.minidom as MD
 import xml.etree.ElementTree as ET
+import zipfile
 from abc import ABC
 from abc import abstractmethod
 from collections import OrderedDict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import date
 from datetime import datetime
 from itertools import chain
+from operator import attrgetter
 from warnings import warn
 
 import compas
+import numpy as np
 from compas.data import Data
 from compas.geometry import Frame
 from compas.geometry import Plane
@@ -21,11 +33,14 @@ from compas.geometry import angle_vectors
 from compas.tolerance import TOL
 
 import compas_timber
+from compas_timber.aio import iterate_in_executor
 from compas_timber.errors import BTLxProcessingError
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.geometry import brep_from_outlines
-from compas_timber.utils import correct_polyline_direction
+from compas_timber.geometry import mesh_from_outlines
+from compas_timber.utils import _can_fork
 from compas_timber.utils import move_polyline_segment_to_plane
+from compas_timber.utils import parametric_hash
 
 
 class BTLxWriter(object):
@@ -43,7 +58,12 @@ class BTLxWriter(object):
         The name of the file. Defaults to None.
     comment : str, optional
         A comment to be included in the file. Defaults to None.
-
+    part_cache : :class:`BTLxPartCache`, optional
+        If given, parts whose element did not change since a previous export are not serialized again but copied from the cache.
+    workers : int, optional
+        If larger than 1, the parts are serialized in this many worker processes, see :meth:`BTLxWriter.write_stream`.
+    chunk_size : int, optional
+        The number of parts a worker process serializes at once. Defaults to 64.
 
     """
 
@@ -64,10 +84,13 @@ class BTLxWriter(object):
         ]
     )
 
-    def __init__(self, project_name=None, company_name=None, file_name=None, comment=None):
+    def __init__(self, project_name=None, company_name=None, file_name=None, comment=None, part_cache=None, workers=None, chunk_size=64):
         self.company_name = company_name
         self.file_name = file_name
         self.comment = comment
+        self.part_cache = part_cache
+        self.workers = workers
+        self.chunk_size = chunk_size
         self._project_name = project_name or "COMPAS Timber Project"
         self._tolerance = TOL
         self._errors = []
@@ -76,7 +99,7 @@ class BTLxWriter(object):
     def errors(self):
         return self._errors
 
-    def write(self, model, file_path, nesting_result=None):
+    def write(self, model, file_path, nesting_result=None, compression=None, compression_level=6):
         """Writes the BTLx file to the given file path.
 
         Parameters
@@ -87,21 +110,33 @@ class BTLxWriter(object):
             The file path to write the BTLx file to.
         nesting_result : :class:`~compas_timber.planning.NestingResult`, optional
             The nesting result object. If provided, raw parts will be created for each stock in the nesting result.
+        compression : str, optional
+            ``"zip"`` to write a BTLZ archive (a zip archive containing the BTLx file), ``"gzip"`` to write a gzip
+            compressed BTLx file. If None (default), it is inferred from the extension of ``file_path``: ``.btlz``
+            for zip and ``.gz`` for gzip, otherwise the file is not compressed.
+        compression_level : int, optional
+            The compression level, from 0 (no compression, fastest) to 9 (smallest, slowest). Defaults to 6.
 
         Returns
         -------
-        str
-            The XML string of the BTLx file.
+        str | None
+            The XML string of the BTLx file. None if the file was compressed, in which case the XML is streamed into
+            the compressed file and never held in memory as a whole.
 
         See Also
         --------
         :meth:`BTLxWriter.model_to_xml`
 
         """
+        compression = _btlx_compression(file_path, compression)
+        if compression:
+            self.write_stream(model, file_path, nesting_result, compression, compression_level)
+            return None
+
         if not file_path.endswith(".btlx"):
             file_path += ".btlx"
         btlx_string = self.model_to_xml(model, nesting_result)
-        with open(file_path, "w") as file:
+        with open(file_path, "w", encoding="utf-8") as file:
             file.write(btlx_string)
         return btlx_string
 
@@ -125,10 +160,13 @@ class BTLxWriter(object):
         :meth:`BTLxWriter.write`
 
         """
-        self._errors = []
-        self._tolerance = model.tolerance
-        if self._tolerance.unit == "M":
-            warn("Model units are set to {} and will auto-scale to mm for BTLx. Please design in mm if you intend to use BTLx.".format(self._tolerance.unit))
+        if self.part_cache is not None:
+            # cached parts are stored as formatted text, which only the streaming writer can splice in
+            stream = io.StringIO()
+            self.write_stream(model, stream, nesting_result)
+            return stream.getvalue()
+
+        self._begin(model)
 
         root_element = ET.Element("BTLx", self.FILE_ATTRIBUTES)
         # first child -> file_history
@@ -138,6 +176,168 @@ class BTLxWriter(object):
         root_element.extend([file_history_element, project_element])
         return MD.parseString(ET.tostring(root_element)).toprettyxml(indent="   ")
 
+    def write_stream(self, model, file_or_path, nesting_result=None, compression=None, compression_level=6):
+        """Writes the BTLx file part by part, without holding the whole document in memory.
+
+        The header, the raw parts and every part are serialized and written one after the other, so memory use does
+        not grow with the number of parts. The output is identical to the one of :meth:`BTLxWriter.write`.
+
+        Parameters
+        ----------
+        model : :class:`~compas_timber.model.TimberModel`
+            The model object.
+        file_or_path : str | os.PathLike | file-like
+            The file path to write the BTLx file to, or an open text stream to write it into.
+        nesting_result : :class:`~compas_timber.planning.NestingResult`, optional
+            The nesting result object. If provided, raw parts will be created for each stock in the nesting result.
+        compression : str, optional
+            ``"zip"`` or ``"gzip"`` to compress the file while it is written, see :meth:`BTLxWriter.write`.
+            Only used if ``file_or_path`` is a path.
+        compression_level : int, optional
+            The compression level, from 0 (fastest) to 9 (smallest). Defaults to 6.
+
+        See Also
+        --------
+        :meth:`BTLxWriter.write`
+
+        Notes
+        -----
+        If :attr:`workers` is larger than 1, the parts are split into chunks of :attr:`chunk_size` parts, which are
+        serialized in a pool of worker processes and written in order-number order. The errors of the parts are added to
+        :attr:`errors` in the same order, with their part and processing, as when the parts are serialized one after the
+        other. The worker processes are forked, so they start from a copy of the model instead of receiving it pickled.
+        Where ``fork`` is not available (Windows), when there is just one chunk to serialize, or when other threads are
+        running in this process, e.g. in :meth:`BTLxWriter.write_async`, the parts are serialized in this process.
+
+        """
+        for _ in self._iter_write_stream(model, file_or_path, nesting_result, compression, compression_level):
+            pass
+
+    async def write_async(self, model, file_path, nesting_result=None, compression=None, compression_level=6, executor=None, batch_size=64):
+        """Writes the BTLx file without blocking the event loop.
+
+        The file is written as by :meth:`BTLxWriter.write_stream`, a batch of parts at a time on an executor. If the
+        task is cancelled, or writing fails, the file is closed once the current batch is written and then removed.
+
+        Parameters
+        ----------
+        model : :class:`~compas_timber.model.TimberModel`
+            The model object. It must not be changed until writing is done.
+        file_path : str | os.PathLike
+            The file path to write the BTLx file to.
+        nesting_result : :class:`~compas_timber.planning.NestingResult`, optional
+            The nesting result object. If provided, raw parts will be created for each stock in the nesting result.
+        compression : str, optional
+            ``"zip"`` or ``"gzip"`` to compress the file while it is written, see :meth:`BTLxWriter.write`.
+        compression_level : int, optional
+            The compression level, from 0 (fastest) to 9 (smallest). Defaults to 6.
+        executor : :class:`concurrent.futures.Executor`, optional
+            The executor to write on. Defaults to the default executor of the running loop, a thread pool.
+        batch_size : int, optional
+            The number of parts written per call on the executor. Defaults to 64.
+
+        See Also
+        --------
+        :meth:`BTLxWriter.write_stream`
+
+        """
+        file_path, compression = _btlx_output_path(os.fspath(file_path), compression)
+        steps = self._iter_write_stream(model, file_path, nesting_result, compression, compression_level)
+        try:
+            async for _ in iterate_in_executor(steps, batch_size, executor):
+                pass
+        except (Exception, asyncio.CancelledError):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+
+    def _iter_write_stream(self, model, file_or_path, nesting_result=None, compression=None, compression_level=6):
+        # does the work of write_stream, yielding after every part so that it can be done in steps
+        if isinstance(file_or_path, (str, os.PathLike)):
+            with _open_btlx_for_writing(os.fspath(file_or_path), compression, compression_level) as file:
+                for step in self._iter_write_stream(model, file, nesting_result):
+                    yield step
+            return
+
+        self._begin(model)
+        writer = _PrettyXMLWriter(file_or_path)
+        writer.start("BTLx", self.FILE_ATTRIBUTES)
+        writer.element(self._create_file_history())
+        writer.start("Project", {"Name": self._project_name})
+        if nesting_result:
+            writer.start("Rawparts")
+            for raw_part_element in self._create_rawparts(nesting_result):
+                writer.element(raw_part_element)
+            writer.end()
+        writer.start("Parts")
+        depth = writer.depth
+
+        def create_fragment(element, order_num, errors):
+            return writer.format(self._create_part(element, order_num, errors), depth)
+
+        parts = list(enumerate(chain(model.beams, model.plates)))
+        if self.part_cache is None:
+            keys = cached = [None] * len(parts)
+        else:
+            keys = [self._part_state_key(element, order_num) for order_num, element in parts]
+            cached = [self.part_cache.get(key) for key in keys]
+        created = self._map_parts([part for part, fragment in zip(parts, cached) if fragment is None], create_fragment)
+        for key, fragment in zip(keys, cached):
+            if fragment is None:
+                fragment, errors = next(created)
+                if errors:
+                    self._errors.extend(errors)  # not cached, so that the errors are reported on every export
+                elif key is not None:
+                    self.part_cache.add(key, fragment)
+            writer.write(fragment)
+            yield
+        writer.end()
+        writer.end()
+        writer.end()
+
+        if self.part_cache is not None:
+            self.part_cache.prune()
+            if self.part_cache.path:
+                self.part_cache.save()
+
+    def _part_state_key(self, element, order_num):
+        """A hash of everything the part of the given element is serialized from."""
+        state = [
+            type(element).__name__,
+            str(element.guid),
+            element.name,
+            order_num,
+            self._tolerance.unit,
+            self.POINT_PRECISION,
+            self.ANGLE_PRECISION,
+            element.blank_length,
+            element.width,
+            element.height,
+            element.ref_frame,
+            element._geometry is not None,
+            [self._processing_state(feature) for feature in element.features],
+        ]
+        return parametric_hash(state, precision=9)
+
+    def _processing_state(self, processing):
+        # everything _create_processing writes: the header attributes, the parameters and the subprocessings
+        try:
+            params = processing.params
+            parameters = ET.Element("Parameters")
+            params.append_to(parameters)
+            state = [params.header_attributes, ET.tostring(parameters, encoding="unicode")]
+        except ValueError as error:
+            return ["error", str(error)]  # the part is not cached, see _iter_write_stream
+        state.append([self._processing_state(subprocessing) for subprocessing in processing.subprocessings or ()])
+        return state
+
+    def _begin(self, model):
+        # resets the state of the writer for writing the given model
+        self._errors = []
+        self._tolerance = model.tolerance
+        if self._tolerance.unit == "M":
+            warn("Model units are set to {} and will auto-scale to mm for BTLx. Please design in mm if you intend to use BTLx.".format(self._tolerance.unit))
+
     def _create_file_history(self):
         """Creates the file history element. This method creates the initial export program element and appends it to the file history element.
 
@@ -191,21 +391,66 @@ class BTLxWriter(object):
         project_element = ET.Element("Project", Name=self._project_name)
         # create raw parts element if nesting result is provided
         if nesting_result:
-            # create raw parts elements for each beam
             raw_parts_element = ET.SubElement(project_element, "Rawparts")
-            for i, stock in enumerate(nesting_result.stocks):
-                raw_part = self._create_rawpart(stock, order_number=i)
-                raw_parts_element.append(raw_part)
+            raw_parts_element.extend(self._create_rawparts(nesting_result))
 
         # create parts element
         parts_element = ET.SubElement(project_element, "Parts")
-        # create part elements for each beam
-        elements = chain(model.beams, model.plates)
-        for i, element in enumerate(elements):
-            part_element = self._create_part(element, order_num=i)
-            parts_element.append(part_element)
+        parts_element.extend(self._create_parts(model))
         return project_element
 
+    def _create_rawparts(self, nesting_result):
+        """Yields a raw part element for each stock in the nesting result."""
+        for i, stock in enumerate(nesting_result.stocks):
+            yield self._create_rawpart(stock, order_number=i)
+
+    def _create_parts(self, model):
+        """Yields a part element for each beam and plate of the model."""
+        for part_element, errors in self._map_parts(list(enumerate(chain(model.beams, model.plates))), self._create_part):
+            self._errors.extend(errors)
+            yield part_element
+
+    def _map_parts(self, parts, create):
+        """Yields ``(create(element, order_num, errors), errors)`` for each ``(order_num, element)`` of ``parts``, in order.
+
+        With :attr:`workers`, the calls are made in forked worker processes, see :meth:`BTLxWriter.write_stream`.
+
+        """
+        chunks = [(start, start + self.chunk_size) for start in range(0, len(parts), self.chunk_size)]
+        if not self.workers or self.workers < 2 or len(chunks) < 2 or not _can_fork():
+            for order_num, element in parts:
+                errors = []
+                yield create(element, order_num, errors), errors
+            return
+
+        global _FORKED
+        with _FORK_LOCK:
+            _FORKED = (create, parts)
+            executor = ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), mp_context=multiprocessing.get_context("fork"))
+            try:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(_create_part_chunk, *chunk)))
+                    if len(pending) >= self.workers * 2:  # bounds the parts waiting to be written
+                        for result in self._part_chunk_results(parts, *pending.popleft()):
+                            yield result
+                while pending:
+                    for result in self._part_chunk_results(parts, *pending.popleft()):
+                        yield result
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+                _FORKED = None
+
+    def _part_chunk_results(self, parts, chunk, future):
+        # the errors of a worker come back as (feature index, message), they are raised again here with their part
+        scale_factor = 1000.0 if self._tolerance.unit == "M" else 1.0
+        for (order_num, element), (result, messages) in zip(parts[slice(*chunk)], future.result()):
+            errors = []
+            for index, message in messages:
+                part = BTLxPart(element, order_num=order_num, scale_factor=scale_factor)
+                errors.append(BTLxProcessingError(message, part, element.features[index]))
+            yield result, errors
+
     def _create_rawpart(self, stock, order_number):
         """Creates a raw part element from a stock object.
 
@@ -241,7 +486,7 @@ class BTLxWriter(object):
         raw_part_element.append(raw_part.et_part_refs)
         return raw_part_element
 
-    def _create_part(self, element, order_num):
+    def _create_part(self, element, order_num, errors=None):
         """Creates a part element. This method creates the processing elements and appends them to the part element.
 
         Parameters
@@ -250,6 +495,8 @@ class BTLxWriter(object):
             The element object.
         order_num : int
             The order number of the part.
+        errors : list, optional
+            The list to add errors to. Defaults to :attr:`BTLxWriter.errors`.
 
         Returns
         -------
@@ -258,6 +505,7 @@ class BTLxWriter(object):
 
         """
         assert self._tolerance
+        errors = self._errors if errors is None else errors
         # create part element
         scale_factor = 1000.0 if self._tolerance.unit == "M" else 1.0
         part = BTLxPart(element, order_num=order_num, scale_factor=scale_factor)
@@ -271,7 +519,7 @@ class BTLxWriter(object):
                 try:
                     processing_element = self._create_processing(feature)
                 except ValueError as ex:
-                    self._errors.append(BTLxProcessingError("Failed to create processing: {}".format(ex), part, feature))
+                    errors.append(BTLxProcessingError("Failed to create processing: {}".format(ex), part, feature))
                 else:
                     processings_element.append(processing_element)
             part_element.append(processings_element)
@@ -299,44 +547,15 @@ class BTLxWriter(object):
             processing = processing.scaled(1000.0)
 
         processing_params = processing.params
-        params_dict = processing_params.as_dict()
-
-        processing_element = ET.Element(
-            processing_params.header_attributes["Name"],
-            processing_params.header_attributes,
-        )
-
-        for key, value in params_dict.items():
-            if isinstance(value, dict):
-                # childless element:
-                # <Element key1="value1" key2="value2" />
-                param = ET.Element(key)
-                for sub_key, sub_value in value.items():
-                    param.set(sub_key, sub_value)
-
-            elif isinstance(value, str):
-                # single value element:
-                # <Element>value</Element>
-                param = ET.Element(key)
-                param.text = value
-
-            else:
-                # complex parameter:
-                # <Element><SubElement1 /><SubElement2 /></Element>
-                param = self._element_from_complex_param(value)
-            processing_element.append(param)
+        header_attributes = processing_params.header_attributes
+        processing_element = ET.Element(header_attributes["Name"], header_attributes)
+        processing_params.append_to(processing_element)
 
         if processing.subprocessings:  # TODO: expose this in Params as well so this logic only interacts with it
             for subprocessing in processing.subprocessings:
                 processing_element.append(self._create_processing(subprocessing))
         return processing_element
 
-    def _element_from_complex_param(self, param):
-        serializer = self.SERIALIZERS.get(type(param).__name__, None)
-        if not serializer:
-            raise ValueError("No serializer found for type: {}".format(type(param)))
-        return serializer(param)
-
     @classmethod
     def register_type_serializer(cls, type_, serializer):
         """Register a type and its serializer.
@@ -352,6 +571,246 @@ class BTLxWriter(object):
         cls.SERIALIZERS[type_] = serializer
 
 
+# what the worker processes serialize parts with: set before they are forked, so they inherit the elements rather than
+# receive them pickled. One export at a time.
+_FORKED = None
+_FORK_LOCK = threading.Lock()
+
+
+def _create_part_chunk(start, stop):
+    create, parts = _FORKED
+    results = []
+    for order_num, element in parts[start:stop]:
+        errors = []
+        result = create(element, order_num, errors)
+        features = element.features
+        messages = [(next(i for i, feature in enumerate(features) if feature is error.failed_processing), error.message) for error in errors]
+        results.append((result, messages))
+    return results
+
+
+class BTLxPartCache(object):
+    """Cache of the serialized parts of a BTLx file, for exporting a model again after small changes.
+
+    Each part is stored under a hash of the parametric state of its element: its dimensions and blank extensions, its
+    reference frame, and the header attributes, parameters and subprocessings its processings are written with.
+    A :class:`BTLxWriter` with a cache only serializes parts whose state changed and copies the others from the cache.
+    Parts which were not part of the latest export are dropped from the cache, as are parts which could not be
+    serialized without errors.
+
+    Parameters
+    ----------
+    path : str, optional
+        A JSON file to persist the cache in between sessions. It is loaded if it exists, and saved after every export.
+
+    Attributes
+    ----------
+    path : str
+        The file the cache is persisted in, if any.
+    hits : int
+        The number of parts copied from the cache.
+    misses : int
+        The number of parts which had to be serialized.
+
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._fragments = {}
+        self._used = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    @property
+    def _version_tag(self):
+        # fragments written by another version of compas_timber may differ
+        return "{}/{}".format(self.VERSION, compas_timber.__version__)
+
+    def get(self, key):
+        """Returns the fragment stored under the given key, or None."""
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._used.add(key)
+            return fragment
+
+    def add(self, key, fragment):
+        """Stores a fragment under the given key."""
+        with self._lock:
+            self._fragments[key] = fragment
+            self._used.add(key)
+
+    def prune(self):
+        """Drops the fragments which were not used since the last call."""
+        with self._lock:
+            self._fragments = {key: fragment for key, fragment in self._fragments.items() if key in self._used}
+            self._used = set()
+
+    def clear(self):
+        """Drops all fragments."""
+        with self._lock:
+            self._fragments = {}
+            self._used = set()
+
+    def load(self):
+        """Loads the fragments from :attr:`path`. Fragments written by a different version are ignored."""
+        with open(self.path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") == self._version_tag:
+            with self._lock:
+                self._fragments = dict(data["fragments"])
+
+    def save(self):
+        """Saves the fragments to :attr:`path`."""
+        with self._lock:
+            data = {"version": self._version_tag, "fragments": self._fragments}
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+
+
+class _PrettyXMLWriter(object):
+    """Writes an XML document element by element into a text stream.
+
+    The output is formatted like :meth:`xml.dom.minidom.Node.toprettyxml`, without building a DOM.
+
+    Parameters
+    ----------
+    stream : file-like
+        The text stream to write to.
+    indent : str, optional
+        The indentation added per nesting level.
+
+    """
+
+    def __init__(self, stream, indent="   "):
+        self._stream = stream
+        self._indent = indent
+        self._open_tags = []
+        self._pending = None  # start tag of the innermost open element, completed once it is known whether it has children
+        stream.write('<?xml version="1.0" ?>\n')
+
+    def start(self, tag, attrib=None):
+        """Opens an element, the following elements become its children until :meth:`end` is called."""
+        self._write_pending(">\n")
+        self._pending = self._start_tag(tag, attrib or {}, len(self._open_tags))
+        self._open_tags.append(tag)
+
+    def end(self):
+        """Closes the innermost open element."""
+        tag = self._open_tags.pop()
+        if self._pending is not None:
+            self._write_pending("/>\n")
+        else:
+            self._stream.write("{}</{}>\n".format(self._indent * len(self._open_tags), tag))
+
+    @property
+    def depth(self):
+        """The number of open elements."""
+        return len(self._open_tags)
+
+    def element(self, element):
+        """Writes a complete element, with all its children, into the innermost open element."""
+        self.write(self.format(element, self.depth))
+
+    def write(self, fragment):
+        """Writes a fragment returned by :meth:`format` into the innermost open element."""
+        self._write_pending(">\n")
+        self._stream.write(fragment)
+
+    def format(self, element, depth):
+        """Returns the formatted element, indented to the given depth. Does not write anything, so the result can be kept, e.g. by a part cache."""
+        lines = []
+        self._format(element, depth, lines)
+        return "".join(lines)
+
+    def _write_pending(self, ending):
+        if self._pending is not None:
+            self._stream.write(self._pending + ending)
+            self._pending = None
+
+    def _start_tag(self, tag, attrib, depth):
+        # like minidom, namespace declarations go first
+        names = sorted(attrib, key=lambda name: not (name == "xmlns" or name.startswith("xmlns:")))
+        attributes = "".join(' {}="{}"'.format(name, _escape_xml(attrib[name])) for name in names)
+        return "{}<{}{}".format(self._indent * depth, tag, attributes)
+
+    def _format(self, element, depth, lines):
+        start_tag = self._start_tag(element.tag, element.attrib, depth)
+        if len(element):
+            lines.append(start_tag + ">\n")
+            for child in element:
+                self._format(child, depth + 1, lines)
+            lines.append("{}</{}>\n".format(self._indent * depth, element.tag))
+        elif element.text:
+            lines.append("{}>{}</{}>\n".format(start_tag, _escape_xml(element.text), element.tag))
+        else:
+            lines.append(start_tag + "/>\n")
+
+
+def _escape_xml(value):
+    # the characters escaped by xml.dom.minidom, in text and attribute values alike
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+
+_BTLX_COMPRESSIONS = {"zip": ".btlz", "gzip": ".btlx.gz"}  # supported compressions and their file extensions
+
+
+def _btlx_compression(file_path, compression):
+    # the compression to write the given path with, inferred from its extension if not given
+    if compression is None:
+        file_path = os.fspath(file_path).lower()
+        if file_path.endswith(".btlz"):
+            return "zip"
+        if file_path.endswith(".gz"):
+            return "gzip"
+        return None
+    if compression not in _BTLX_COMPRESSIONS:
+        raise ValueError("Unsupported BTLx compression: {}. Use one of: {}".format(compression, ", ".join(_BTLX_COMPRESSIONS)))
+    return compression
+
+
+def _btlx_output_path(file_path, compression):
+    # the path a BTLx file is written to, with the extension of its compression added if missing, and the compression
+    compression = _btlx_compression(file_path, compression)
+    extension = _BTLX_COMPRESSIONS[compression] if compression else ".btlx"
+    if compression == "gzip" and file_path.endswith(".gz"):
+        extension = ".gz"
+    if not file_path.endswith(extension):
+        file_path += extension
+    return file_path, compression
+
+
+@contextmanager
+def _open_btlx_for_writing(file_path, compression=None, compression_level=6):
+    """Opens a BTLx file for writing text, which is compressed on the fly if a compression is given or implied by the extension."""
+    file_path, compression = _btlx_output_path(file_path, compression)
+    if not compression:
+        with open(file_path, "w", encoding="utf-8") as file:
+            yield file
+    elif compression == "gzip":
+        # mtime=0 so that the same model always compresses to the same bytes
+        with gzip.GzipFile(file_path, "wb", compresslevel=compression_level, mtime=0) as binary:
+            with io.TextIOWrapper(binary, encoding="utf-8") as file:
+                yield file
+    else:
+        entry_name = os.path.splitext(os.path.basename(file_path))[0] + ".btlx"
+        with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compression_level) as archive:
+            with archive.open(entry_name, "w", force_zip64=True) as binary:  # the size of the entry is not known in advance
+                with io.TextIOWrapper(binary, encoding="utf-8") as file:
+                    yield file
+
+
 class BTLxGenericPart(object):
     """Base class for BTLx parts (both raw parts and fabricated parts).
 
@@ -647,53 +1106,72 @@ class BTLxPart(BTLxGenericPart):
         """
 
         if not self._shape_strings:
-            brep_vertex_points = []
+            vertex_indices = {}  # quantized coordinates -> index of the vertex
+            vertices = []
             brep_indices = []
             scaled_geometry = self.element.geometry.scaled(self._scale_factor)
             for face in scaled_geometry.faces:
-                pts = []
-                frame = face.surface.frame_at(0.5, 0.5)
-                edges = face.boundary.edges[1:]
-                pts = [face.boundary.edges[0].start_vertex.point, face.boundary.edges[0].end_vertex.point]
-                overflow = len(edges)
-                while edges and overflow > 0:
-                    for i, edge in enumerate(edges):
-                        if (not edge.is_line) or ((edge.start_vertex.point in pts) and (edge.end_vertex.point in pts)):  # edge endpoints already in pts
-                            edges.pop(i)
-                        elif TOL.is_allclose(edge.start_vertex.point, pts[-1]) and (edge.end_vertex.point not in pts):  # edge.start_vertex is the last point in pts
-                            pts.append(edges.pop(i).end_vertex.point)
-                        elif TOL.is_allclose(edge.end_vertex.point, pts[-1]) and (edge.start_vertex.point not in pts):  # edge.end_vertex is the last point in pts
-                            pts.append(edges.pop(i).start_vertex.point)
-                    overflow -= 1
-                pts = correct_polyline_direction(pts, frame.normal)
-
+                normal = face.frame_at(0.5, 0.5).normal  # faces of the brep api have no surface.frame_at, and are normal towards outside
+                pts = _face_boundary_points(face)
                 if len(pts) != len(face.edges):
                     print("edge count doesnt match point count, BTLxPart shape will be incorrect")
-
-                if len(pts) > 2:
-                    for pt in pts:
-                        if pt in brep_vertex_points:
-                            brep_indices.append(brep_vertex_points.index(pt))
-                        else:
-                            brep_indices.append(len(brep_vertex_points))
-                            brep_vertex_points.append(pt)
-                    brep_indices.append(-1)
-
-            brep_indices_string = ""
-            for index in brep_indices:
-                brep_indices_string += str(index) + " "
-
-            brep_vertices_string = ""
-            for point in brep_vertex_points:
-                xform = Transformation.from_frame_to_frame(self.frame, Frame((0, 0, 0), (1, 0, 0), (0, 1, 0)))
-                point.transform(xform)
-                brep_vertices_string += "{:.{prec}f} {:.{prec}f} {:.{prec}f} ".format(point.x, point.y, point.z, prec=3)
-                brep_vertices_string = brep_vertices_string.replace("-", "")
+                if len(pts) < 3:
+                    continue
+
+                coordinates = np.array(pts, dtype=float)
+                # Newell's normal, the face loop has to run counter-clockwise around the surface normal
+                area = np.cross(coordinates, np.roll(coordinates, -1, axis=0)).sum(axis=0)
+                if np.dot(area, list(normal)) < 0:
+                    coordinates = coordinates[::-1]
+
+                for coordinate in coordinates.tolist():
+                    key = _vertex_key(coordinate)
+                    index = vertex_indices.get(key)
+                    if index is None:
+                        index = vertex_indices[key] = len(vertices)
+                        vertices.append(coordinate)
+                    brep_indices.append(index)
+                brep_indices.append(-1)
+
+            brep_indices_string = "".join("{} ".format(index) for index in brep_indices)
+
+            matrix = np.array(Transformation.from_frame_to_frame(self.frame, Frame.worldXY()).matrix, dtype=float)
+            vertices = np.array(vertices, dtype=float).reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+            vertex_format = "{{:.{prec}f}} {{:.{prec}f}} {{:.{prec}f}} ".format(prec=BTLxWriter.POINT_PRECISION)
+            brep_vertices_string = "".join(vertex_format.format(*vertex) for vertex in vertices.tolist()).replace("-", "")
 
             self._shape_strings = [brep_indices_string, brep_vertices_string]
         return self._shape_strings
 
 
+def _vertex_key(point):
+    # vertices closer than the precision they are written with are the same vertex
+    return tuple(round(coordinate, BTLxWriter.POINT_PRECISION + 1) for coordinate in point)
+
+
+def _face_boundary_points(face):
+    """The corners of a face's outer loop, in loop order. Curved edges are skipped."""
+    edges = face.boundary.edges
+    points = [edges[0].start_vertex.point, edges[0].end_vertex.point]
+    visited = {_vertex_key(point) for point in points}
+    neighbours = {}  # vertex key -> the other ends of the straight edges at that vertex
+    for edge in edges[1:]:
+        if edge.is_line:
+            start, end = edge.start_vertex.point, edge.end_vertex.point
+            neighbours.setdefault(_vertex_key(start), []).append(end)
+            neighbours.setdefault(_vertex_key(end), []).append(start)
+
+    while True:
+        for point in neighbours.get(_vertex_key(points[-1]), ()):
+            key = _vertex_key(point)
+            if key not in visited:
+                break
+        else:
+            return points
+        visited.add(key)
+        points.append(point)
+
+
 def contour_to_xml(contour):
     """Converts a contour to an XML element.
 
@@ -871,6 +1349,7 @@ class BTLxProcessing(Data, ABC):
             missing = [spec.python_name for spec in attribute_map.values() if not hasattr(cls, spec.python_name)]
             if missing:
                 raise AttributeError("ATTRIBUTE_MAP in '{}' references attributes not found on the class: {}".format(cls.__name__, missing))
+            cls._param_fields = compile_param_fields(attribute_map)
 
     @property
     def ref_side_index(self):
@@ -956,6 +1435,36 @@ class BTLxProcessing(Data, ABC):
         new_instance.scale(factor)
         return new_instance
 
+    def apply_to_mesh(self, geometry, element):
+        """Apply the feature to the mesh geometry of an element.
+
+        Counterpart of ``apply`` used by the mesh geometry backend, see :class:`~compas_timber.geometry.GeometryBackend`.
+        Subclasses which support the mesh backend override this method.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The closed element mesh, in the element's local coordinates.
+        element : :class:`~compas_timber.base.TimberElement`
+            The element this processing is applied to.
+
+        Raises
+        ------
+        :class:`~compas_timber.errors.FeatureApplicationError`
+            If the processing does not support the mesh backend or cannot be applied.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing.
+
+        """
+        raise FeatureApplicationError(
+            None,
+            geometry.transformed(element.modeltransformation),
+            "{} does not support the mesh geometry backend.".format(self.__class__.__name__),
+        )
+
 
 class BTLxProcessingParams(object):
     """Base class for BTLx processing parameters. This creates the dictionary of key-value pairs for the processing as expected by the BTLx file format.
@@ -1001,10 +1510,40 @@ class BTLxProcessingParams(object):
     def attribute_map(self):
         return self._instance.ATTRIBUTE_MAP
 
+    @property
+    def fields(self):
+        """The serializer of the processing type: one ``(tag, getter, formatter, emitter)`` tuple per entry of its ATTRIBUTE_MAP, in order.
+
+        Compiled once per processing class, see :func:`compile_param_fields`.
+        Can be overridden in subclasses to select the serialized parameters at runtime.
+
+        """
+        return self._instance._param_fields
+
+    def append_to(self, processing_element):
+        """Appends the XML element of each processing parameter to the given processing element.
+
+        Uses the emitters of the compiled :attr:`fields`, which write the values straight into the element.
+        If a subclass overrides :meth:`as_dict`, the elements are created from its dictionary instead.
+
+        Parameters
+        ----------
+        processing_element : :class:`~xml.etree.ElementTree.Element`
+            The processing element to append the parameters to.
+
+        """
+        if type(self).as_dict is not BTLxProcessingParams.as_dict:
+            for tag, value in self.as_dict().items():
+                _emit_formatted(processing_element, tag, value)
+            return
+        instance = self._instance
+        for tag, getter, _, emit in self.fields:
+            emit(processing_element, tag, getter(instance))
+
     def as_dict(self):
         """Returns the processing parameters as a dictionary for BTLx serialization.
 
-        Uses ATTRIBUTE_MAP to convert Python attributes to BTLx XML format.
+        Uses the compiled :attr:`fields` to convert Python attributes to BTLx XML format.
         Can be overridden in subclasses for custom serialization logic.
 
         Returns
@@ -1012,11 +1551,8 @@ class BTLxProcessingParams(object):
         OrderedDict
             The processing parameters as a dictionary.
         """
-        result = OrderedDict()
-        for btlx_name, attr_spec in self.attribute_map.items():
-            value = getattr(self._instance, attr_spec.python_name)
-            result[btlx_name] = self._format_value(value)
-        return result
+        instance = self._instance
+        return OrderedDict([(tag, formatter(getter(instance))) for tag, getter, formatter, _ in self.fields])
 
     @staticmethod
     def _format_value(value):
@@ -1047,6 +1583,100 @@ class BTLxProcessingParams(object):
             raise ValueError("Unsupported value type for BTLx serialization: {}".format(type(value)))
 
 
+def compile_param_fields(attribute_map):
+    """Compiles the serializer of a processing type from its ATTRIBUTE_MAP.
+
+    The formatter and the emitter of every parameter are chosen from the type in its :class:`AttributeSpec`, so that
+    serializing a processing does not dispatch on the type of each value anymore. Values of another type than the
+    declared one are formatted with :meth:`BTLxProcessingParams._format_value`, so the output is the same either way.
+
+    Parameters
+    ----------
+    attribute_map : dict(str, :class:`AttributeSpec`)
+        Mapping of BTLx XML tag names to the specs of the Python attributes.
+
+    Returns
+    -------
+    tuple(tuple(str, callable, callable, callable))
+        One ``(tag, getter, formatter, emitter)`` tuple per parameter. ``getter`` takes the processing and returns the
+        value, ``formatter`` takes the value and returns what :meth:`BTLxProcessingParams.as_dict` returns for it.
+        ``emitter`` takes the processing element, the tag and the value, and appends the parameter's element to it.
+
+    """
+    formatters = {
+        float: (_format_number, _emit_number),
+        int: (_format_number, _emit_number),
+        bool: (_format_bool, _emit_bool),
+        str: (_format_str, _emit_str),
+    }
+    fields = []
+    for tag, spec in attribute_map.items():
+        formatter, emitter = formatters.get(spec.type, (BTLxProcessingParams._format_value, _emit_value))
+        fields.append((tag, attrgetter(spec.python_name), formatter, emitter))
+    return tuple(fields)
+
+
+def _format_number(value):
+    if value.__class__ is float or value.__class__ is int:
+        return "%.3f" % value
+    return BTLxProcessingParams._format_value(value)
+
+
+def _format_bool(value):
+    if value is True:
+        return "yes"
+    if value is False:
+        return "no"
+    return BTLxProcessingParams._format_value(value)
+
+
+def _format_str(value):
+    if value.__class__ is str:
+        return value
+    return BTLxProcessingParams._format_value(value)
+
+
+def _emit_number(parent, tag, value):
+    if value.__class__ is float or value.__class__ is int:
+        ET.SubElement(parent, tag).text = "%.3f" % value
+    else:
+        _emit_value(parent, tag, value)
+
+
+def _emit_bool(parent, tag, value):
+    if value is True or value is False:
+        ET.SubElement(parent, tag).text = "yes" if value else "no"
+    else:
+        _emit_value(parent, tag, value)
+
+
+def _emit_str(parent, tag, value):
+    if value.__class__ is str:
+        ET.SubElement(parent, tag).text = value
+    else:
+        _emit_value(parent, tag, value)
+
+
+def _emit_value(parent, tag, value):
+    _emit_formatted(parent, tag, BTLxProcessingParams._format_value(value))
+
+
+def _emit_formatted(parent, tag, value):
+    """Appends the element of a parameter formatted by :meth:`BTLxProcessingParams._format_value` to ``parent``."""
+    if isinstance(value, str):
+        # single value element: <Element>value</Element>
+        ET.SubElement(parent, tag).text = value
+    elif isinstance(value, dict):
+        # childless element: <Element key1="value1" key2="value2" />
+        ET.SubElement(parent, tag, value)
+    else:
+        # complex parameter: <Element><SubElement1 /><SubElement2 /></Element>
+        serializer = BTLxWriter.SERIALIZERS.get(type(value).__name__, None)
+        if not serializer:
+            raise ValueError("No serializer found for type: {}".format(type(value)))
+        parent.append(serializer(value))
+
+
 class OrientationType(object):
     """Enum for the orientation of the cut.
 
@@ -1325,6 +1955,18 @@ class Contour(Data):
         :class:`~compas.geometry.Brep`
             The brep representation of the contour.
         """
+        return brep_from_outlines(*self._outlines())
+
+    def to_mesh(self):
+        """Convert the contour to a closed COMPAS Mesh object.
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The mesh representation of the contour.
+        """
+        return mesh_from_outlines(*self._outlines())
+
+    def _outlines(self):
         pline_a = self.polyline.copy()
         pline_b = pline_a.translated([0, 0, -self.depth])
         if any([i != 0 for i in self.inclination]):
@@ -1338,8 +1980,7 @@ class Contour(Data):
                 move_polyline_segment_to_plane(pline_b, i, plane)
         pline_a.translate([0, 0, 0.001])
         pline_b.translate([0, 0, -0.001])
-
-        return brep_from_outlines(pline_a, pline_b)
+        return pline_a, pline_b
 
 
 BTLxWriter.register_type_serializer(Contour.__name__, contour_to_xml)
@@ -1404,10 +2045,15 @@ class DualContour(Data):
         return new_instance
 
     def to_brep(self):
+        return brep_from_outlines(*self._outlines())
+
+    def to_mesh(self):
+        return mesh_from_outlines(*self._outlines())
+
+    def _outlines(self):
         pline_a = self.principal_contour.translated([0, 0, 0.001])
         pline_b = self.associated_contour.translated([0, 0, -0.001])
-
-        return brep_from_outlines(pline_a, pline_b)
+        return pline_a, pline_b
 
 
 BTLxWriter.register_type_serializer(DualContour.__name__, dual_contour_to_xml)
@@ -12,6 +12,8 @@ from compas.geometry import dot_vectors
 from compas.geometry import intersection_line_plane
 from compas.geometry import intersection_plane_plane
 
+from compas_timber.csg import mesh_boolean_difference
+from compas_timber.csg import mesh_trimmed
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import intersection_line_beam_param
 from compas_timber.utils import planar_surface_point_at
@@ -356,6 +358,49 @@ class DoubleCut(BTLxProcessing):
             return geometry
 
 
+    def apply_to_mesh(self, geometry, beam):
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The mesh is trimmed with both cutting planes, or,
+        if the double cut is concave, the volume between them is subtracted with a mesh boolean.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The beam mesh to be cut.
+        beam : :class:`compas_timber.elements.Beam`
+            The beam that is cut by this instance.
+
+        Raises
+        ------
+        :class:`~compas_timber.errors.FeatureApplicationError`
+            If the cutting planes cannot be generated from the parameters and the beam.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        # type: (Mesh, Beam) -> Mesh
+        try:
+            cutting_planes = self.planes_from_params_and_beam(beam)
+        except ValueError as e:
+            raise FeatureApplicationError(
+                None, geometry.transformed(beam.modeltransformation), "Failed to generate cutting planes from parameters and beam: {}".format(str(e))
+            )
+        cutting_planes = [plane.transformed(beam.transformation_to_local()) for plane in cutting_planes]
+        if self.is_concave:
+            trim_volume = geometry
+            for cutting_plane in cutting_planes:
+                trim_volume = mesh_trimmed(trim_volume, cutting_plane)
+            if not trim_volume.number_of_faces():
+                return geometry
+            return mesh_boolean_difference(geometry, trim_volume)
+        for cutting_plane in cutting_planes:
+            geometry = mesh_trimmed(geometry, Plane(cutting_plane.point, -cutting_plane.normal))
+        return geometry
+
     def planes_from_params_and_beam(self, beam):
         """Calculates the cutting planeS from the machining parameters in this instance and the given beam
 
@@ -16,6 +16,7 @@ from compas.geometry import is_point_in_polyhedron
 from compas.geometry import project_point_plane
 from compas_brep import Brep
 
+from compas_timber.csg import mesh_boolean_difference
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -339,6 +340,23 @@ class Drilling(BTLxProcessing):
                 "The drill geometry does not intersect with element geometry.",
             )
 
+    def apply_to_mesh(self, geometry, element):
+        """Apply the feature to the element mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The drill cylinder is meshed and subtracted with a
+        mesh boolean, which leaves the geometry unchanged if the two do not overlap.
+
+        Returns
+        -------
+        :class:`compas.datastructures.Mesh`
+            The resulting geometry after processing.
+
+        """
+        # type: (Mesh, TimberElement) -> Mesh
+        drill_geometry = self.cylinder_from_params_and_element(element).to_mesh()
+        drill_geometry.transform(element.transformation_to_local())
+        return mesh_boolean_difference(geometry, drill_geometry)
+
     def cylinder_from_params_and_element(self, element):
         """Construct the geometry of the drilling using the parameters in this instance and the element object.
 
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import math
-from collections import OrderedDict
 from typing import Optional
 
 from compas.geometry import Frame
@@ -15,6 +14,8 @@ from compas.geometry import distance_point_plane
 from compas.tolerance import TOL
 
 from compas_timber.base import TimberElement
+from compas_timber.csg import mesh_boolean_difference
+from compas_timber.csg import mesh_boolean_intersection
 from compas_timber.utils import is_polyline_clockwise
 
 from .btlx import AlignmentType
@@ -313,6 +314,25 @@ class FreeContour(BTLxProcessing):
         else:
             return geometry & vol
 
+    def apply_to_mesh(self, geometry, element):
+        """Apply the feature to the element mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The contour volume is meshed and, depending on
+        ``counter_sink``, subtracted from or intersected with the element mesh.
+
+        Returns
+        -------
+        :class:`compas.datastructures.Mesh`
+            The resulting geometry after processing.
+        """
+        # type: (Mesh, TimberElement) -> Mesh
+        vol = self.contour_param_object.to_mesh()
+        transformation_ref_side_to_local = element.modeltransformation.inverse() * Transformation.from_frame(element.ref_sides[self.ref_side_index])
+        vol.transform(transformation_ref_side_to_local)
+        if self.counter_sink:
+            return mesh_boolean_difference(geometry, vol)
+        return mesh_boolean_intersection(geometry, vol)
+
     def scale(self, factor):
         """Scale the parameters of this processing by a given factor.
 
@@ -336,36 +356,21 @@ class FreeContourParams(BTLxProcessingParams):
     based on the runtime type of the contour_param_object attribute.
     """
 
-    def as_dict(self):
-        """Returns the processing parameters as a dictionary for BTLx serialization.
+    @property
+    def fields(self):
+        """The compiled parameter serializer, with only the contour entry that matches the runtime type.
 
         Overrides the base implementation to only include the appropriate contour type
         (Contour or DualContour) based on the actual instance type.
 
         Returns
         -------
-        OrderedDict
-            The processing parameters with only the correct contour entry.
+        tuple(tuple(str, callable, callable, callable))
+            The ``(tag, getter, formatter, emitter)`` tuples with only the correct contour entry.
         """
-        result = OrderedDict()
-
         # Determine which contour type to serialize based on runtime type
-        contour_obj = self._instance.contour_param_object
-        if isinstance(contour_obj, DualContour):
-            xml_tag_name = "DualContour"
+        if isinstance(self._instance.contour_param_object, DualContour):
+            skipped_tag = "Contour"
         else:  # Contour or any other type defaults to Contour
-            xml_tag_name = "Contour"
-
-        # Iterate over attribute_map but only include the matching contour type
-        for btlx_name, spec in self.attribute_map.items():
-            value = getattr(self._instance, spec.python_name)
-
-            # Only serialize the entry that matches the runtime type
-            if btlx_name in ["Contour", "DualContour"]:
-                if btlx_name == xml_tag_name:
-                    result[btlx_name] = self._format_value(value)
-            else:
-                # Include all other (non-contour) attributes
-                result[btlx_name] = self._format_value(value)
-
-        return result
+            skipped_tag = "DualContour"
+        return tuple(field for field in self._instance._param_fields if field[0] != skipped_tag)
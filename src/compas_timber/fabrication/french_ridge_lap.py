@@ -15,6 +15,8 @@ from compas.tolerance import TOL
 from compas_brep import Brep
 from compas_brep import BrepTrimmingError
 
+from compas_timber.csg import mesh_boolean_difference
+from compas_timber.csg import mesh_trimmed
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -315,6 +317,37 @@ class FrenchRidgeLap(BTLxProcessing):
                 "Could not subtract the cutting volume from the beam geometry.",
             )
 
+    def apply_to_mesh(self, geometry, beam):
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The beam mesh is trimmed with the cutting frame,
+        then the lap volume, and the drill hole if there is one, are subtracted with mesh booleans.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The beam mesh to be cut.
+        beam : :class:`compas_timber.elements.Beam`
+            The beam that is cut by this instance.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        # type: (Mesh, Beam) -> Mesh
+        trimming_frame = self.frame_from_params_and_beam(beam)
+        trimming_frame.transform(beam.transformation_to_local())
+        if not TOL.is_zero(self.angle - 90):
+            geometry = mesh_trimmed(geometry, trimming_frame)
+        subtracting_volume, drill_cylinder = self._lap_volume_mesh_and_drill_cylinder(beam)
+        subtracting_volume.transform(beam.transformation_to_local())
+        geometry = mesh_boolean_difference(geometry, subtracting_volume)
+        if drill_cylinder:
+            geometry = mesh_boolean_difference(geometry, drill_cylinder.transformed(beam.transformation_to_local()).to_mesh())
+        return geometry
+
     def frame_from_params_and_beam(self, beam):
         """Calculates the frame that cuts the exceeding part of the blank of the beam from the machining parameters and the given beam.
 
@@ -369,6 +402,15 @@ class FrenchRidgeLap(BTLxProcessing):
             The trimming volume of the lap.
         """
         # type: (Beam) -> Brep
+        subtraction_volume_mesh, drill_cylinder = self._lap_volume_mesh_and_drill_cylinder(beam)
+        subtraction_volume = Brep.from_mesh(subtraction_volume_mesh)
+        if drill_cylinder:
+            subtraction_volume += Brep.from_cylinder(drill_cylinder)
+        return subtraction_volume
+
+    def _lap_volume_mesh_and_drill_cylinder(self, beam):
+        # type: (Beam) -> tuple[Mesh, Cylinder | None]
+        # the geometry of the lap volume, shared by the brep and mesh geometry backends
         assert self.orientation is not None
         assert self.angle is not None
         assert self.ref_position is not None
@@ -423,17 +465,15 @@ class FrenchRidgeLap(BTLxProcessing):
         if self.orientation == OrientationType.END:
             faces = [face[::-1] for face in faces]
 
-        # generate the subtraction volume and convert it to a Brep
         subtraction_volume_mesh = Mesh.from_vertices_and_faces(vertices, faces)
-        subtraction_volume = Brep.from_mesh(subtraction_volume_mesh)
 
-        # add drilling cylinder to the subtraction_volume
+        # drilling cylinder to be added to the subtraction volume
+        drill_cylinder = None
         if self.drillhole:
             diagonal = Line(bottom_vertices[0], bottom_vertices[2])
             drill_frame = Frame(diagonal.midpoint, -ref_side.xaxis, ref_side.yaxis)
             drill_cylinder = Cylinder(self.drillhole_diam / 2, height * 2, drill_frame)
-            subtraction_volume += Brep.from_cylinder(drill_cylinder)
-        return subtraction_volume
+        return subtraction_volume_mesh, drill_cylinder
 
     def scale(self, factor):
         """Scale the parameters of this processing by a given factor.
@@ -11,6 +11,7 @@ from compas.geometry import intersection_line_plane
 from compas.tolerance import TOL
 from compas_brep import BrepTrimmingError
 
+from compas_timber.csg import mesh_trimmed
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -265,6 +266,40 @@ class JackRafterCut(BTLxProcessing):
                 "The cutting plane does not intersect with beam geometry.",
             )
 
+    def apply_to_mesh(self, geometry, beam):
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend, trimming the beam mesh with the cutting plane.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The beam mesh to be cut.
+        beam : :class:`compas_timber.elements.Beam`
+            The beam that is cut by this instance.
+
+        Raises
+        ------
+        :class:`~compas_timber.errors.FeatureApplicationError`
+            If the cutting plane trims away the whole beam mesh.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        # type: (Mesh, Beam) -> Mesh
+        cutting_plane = self.plane_from_params_and_beam(beam).transformed(beam.transformation_to_local())
+        result = mesh_trimmed(geometry, cutting_plane)
+        if not result.number_of_faces():
+            raise FeatureApplicationError(
+                cutting_plane.transformed(beam.modeltransformation),
+                geometry.transformed(beam.modeltransformation),
+                "The cutting plane does not intersect with beam geometry.",
+            )
+        return result
+
     def plane_from_params_and_beam(self, beam):
         """Calculates the cutting plane from the machining parameters in this instance and the given beam
 
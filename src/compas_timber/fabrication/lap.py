@@ -20,6 +20,7 @@ from compas.geometry import is_point_behind_plane
 from compas.tolerance import TOL
 from compas_brep import Brep
 
+from compas_timber.csg import mesh_boolean_difference
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -694,6 +695,30 @@ class Lap(BTLxProcessing):
                 "The lap volume does not intersect with the beam geometry.",
             )
 
+    def apply_to_mesh(self, geometry, beam):
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The lap volume is subtracted as a mesh, so unlike
+        :meth:`apply` there is no conversion to a Brep which could fail.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The beam mesh to be cut.
+        beam : :class:`compas_timber.elements.Beam`
+            The beam that is cut by this instance.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        # type: (Mesh, Beam) -> Mesh
+        lap_volume = self.volume_from_params_and_beam(beam)
+        lap_volume.transform(beam.transformation_to_local())
+        return mesh_boolean_difference(geometry, lap_volume.to_mesh())
+
     def _start_frame_from_params_and_beam(self, beam):
         """Calculates the start frame of the lap from the machining parameters in this instance and the given beam.
 
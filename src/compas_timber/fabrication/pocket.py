@@ -22,6 +22,7 @@ from compas.tolerance import TOL
 from compas_brep import Brep
 
 from compas_timber.base import TimberElement
+from compas_timber.csg import mesh_boolean_difference
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -568,6 +569,29 @@ class Pocket(BTLxProcessing):
                 "The pocket volume does not intersect with the element geometry." + str(e),
             )
 
+    def apply_to_mesh(self, geometry: Mesh, element: TimberElement) -> Mesh:
+        """Apply the feature to the element mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The pocket polyhedron is subtracted as a mesh,
+        without the conversion to a Brep done by :meth:`apply`.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The mesh of the element to be processed.
+        element : :class:`compas_timber.base.TimberElement`
+            The element that is processed by this instance.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        polyhedron_volume = self.volume_from_params_and_element(element)
+        polyhedron_volume.transform(element.transformation_to_local())
+        return mesh_boolean_difference(geometry, polyhedron_volume.to_mesh())
+
     def _bottom_frame_from_params_and_element(self, element: TimberElement) -> Frame:
         """Calculates the bottom frame of the pocket from the machining parameters in this instance and the given element.
 
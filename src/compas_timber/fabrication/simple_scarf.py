@@ -4,6 +4,7 @@ import math
 from typing import TYPE_CHECKING
 from typing import List
 
+from compas.datastructures import Mesh
 from compas.geometry import Cylinder
 from compas.geometry import Frame
 from compas.geometry import Plane
@@ -12,6 +13,9 @@ from compas.geometry import Polyhedron
 from compas.geometry import intersection_plane_plane_plane
 from compas_brep import Brep
 
+from compas_timber.csg import mesh_boolean_difference
+from compas_timber.csg import mesh_components
+from compas_timber.csg import mesh_contains_point
 from compas_timber.errors import FeatureApplicationError
 
 from .btlx import AttributeSpec
@@ -283,6 +287,46 @@ class SimpleScarf(BTLxProcessing):
             "No valid result solid found after boolean difference: the beam midpoint is not contained in any result Brep.",
         )
 
+    def apply_to_mesh(self, geometry: Mesh, beam: Beam) -> Mesh:
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend. The scarf volume and the drill holes are subtracted
+        with mesh booleans and, as in :meth:`apply`, the part of the result containing the beam's midpoint is kept.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The mesh to be processed.
+
+        beam : :class:`~compas_timber.elements.Beam`
+            The beam that is milled by this instance.
+
+        Raises
+        ------
+        :class:`~compas_timber.errors.FeatureApplicationError`
+            If no part of the result contains the midpoint of the beam.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing.
+
+        """
+        scarf_volume = self.volume_from_params_and_beam(beam)
+        scarf_volume.transform(beam.transformation_to_local())
+        result = mesh_boolean_difference(geometry, scarf_volume.to_mesh())
+        for drill_volume in self.drill_hole_volumes_from_params_and_beam(beam):
+            result = mesh_boolean_difference(result, drill_volume.transformed(beam.transformation_to_local()).to_mesh())
+        midpoint = beam.centerline.midpoint.transformed(beam.transformation_to_local())
+        for component in mesh_components(result):
+            if mesh_contains_point(component, midpoint):
+                return component
+        raise FeatureApplicationError(
+            scarf_volume.transformed(beam.modeltransformation),
+            geometry.transformed(beam.modeltransformation),
+            "No valid result solid found after boolean difference: the beam midpoint is not contained in any result mesh.",
+        )
+
     def _planes_from_params_and_beam(self, beam: Beam) -> List[Plane]:
         """Generates the planes needed to define the scarf volume from the feature parameters and the beam.
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 import math
 import typing
 
+from compas.datastructures import Mesh
 from compas.geometry import Frame
 from compas.geometry import Line
 from compas.geometry import Plane
@@ -17,6 +18,7 @@ from compas.geometry import intersection_plane_plane_plane
 from compas.geometry import intersection_segment_plane
 from compas_brep import Brep
 
+from compas_timber.csg import mesh_boolean_difference
 from compas_timber.errors import FeatureApplicationError
 from compas_timber.utils import planar_surface_point_at
 
@@ -397,6 +399,30 @@ class Slot(BTLxProcessing):
                 "The slot subtracting volume does not intersect with the beam geometry."
                 )
 
+    def apply_to_mesh(self, geometry: Mesh, beam: Beam) -> Mesh:
+        """Apply the feature to the beam mesh geometry.
+
+        Counterpart of :meth:`apply` for the mesh geometry backend, subtracting the slot volume with a mesh boolean.
+        The volume is not flipped for an ``END`` orientation as in :meth:`apply`, since the mesh booleans do not depend
+        on the orientation of its faces.
+
+        Parameters
+        ----------
+        geometry : :class:`~compas.datastructures.Mesh`
+            The beam mesh to be cut.
+        beam : :class:`compas_timber.elements.Beam`
+            The beam that is cut by this instance.
+
+        Returns
+        -------
+        :class:`~compas.datastructures.Mesh`
+            The resulting geometry after processing
+
+        """
+        subtraction_volume = self.volume_from_params_and_beam(beam)
+        subtraction_volume.transform(beam.transformation_to_local())
+        return mesh_boolean_difference(geometry, subtraction_volume.to_mesh())
+
     def volume_from_params_and_beam(self, beam: Beam) -> Polyhedron:
         """
         Computes the cutting volume of the slot based on the machining limits and parameters.
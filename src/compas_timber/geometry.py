@@ -1,6 +1,9 @@
 import math
+import warnings
 from typing import Optional
 
+import numpy as np
+from compas.datastructures import Mesh
 from compas.geometry import Point
 from compas.geometry import Polygon
 from compas.geometry import Polyhedron
@@ -13,10 +16,59 @@ from compas.tolerance import TOL
 from compas_brep import Brep
 from scipy.spatial import KDTree as _ScipyKDTree
 
-from compas_timber.utils import correct_polyline_direction
 from compas_timber.utils import is_polyline_clockwise
 
 
+class GeometryBackend(object):
+    """Enumeration of the geometry backends an element's geometry can be computed with.
+
+    Attributes
+    ----------
+    BREP : literal("brep")
+        Element geometry is a :class:`~compas_brep.Brep`, features are applied using the Brep kernel (e.g. OCC).
+    MESH : literal("mesh")
+        Element geometry is a closed :class:`~compas.datastructures.Mesh`, features are applied using the mesh booleans
+        in :mod:`compas_timber.csg`. Use when no Brep kernel is available. Not supported by
+        :class:`~compas_timber.elements.Panel`, whose geometry is always a Brep.
+
+    """
+
+    BREP = "brep"
+    MESH = "mesh"
+
+
+class GeometryInstance(object):
+    """A geometry shared by several elements, each placing it with its own transformation.
+
+    Parameters
+    ----------
+    key : str | None
+        The instance key of the elements sharing the geometry, see :meth:`~compas_timber.base.TimberElement.compute_instance_key`.
+    geometry : :class:`~compas_brep.Brep` | :class:`~compas.datastructures.Mesh`
+        The shared geometry, in the elements' local coordinates.
+    elements : list[:class:`~compas_timber.base.TimberElement`]
+        The elements sharing the geometry.
+
+    Attributes
+    ----------
+    transformations : list[:class:`~compas.geometry.Transformation`]
+        The transformation from local to model coordinates of each element, in the order of `elements`.
+
+    """
+
+    def __init__(self, key, geometry, elements=None):
+        self.key = key
+        self.geometry = geometry
+        self.elements = elements or []
+
+    def __repr__(self):
+        return "GeometryInstance(key={!r}, count={})".format(self.key, len(self.elements))
+
+    @property
+    def transformations(self):
+        return [element.modeltransformation for element in self.elements]
+
+
 # TODO: perhaps this should be the canonical implementation of KDTree in core, scipy is already a dependency anyways.
 class KDTree:
     """Wrapper around :class:`scipy.spatial.KDTree` that mimics the :class:`compas.geometry.KDTree` interface.
@@ -188,6 +240,61 @@ def brep_from_outlines(outline_a: Polyline, outline_b: Polyline, normal: Optiona
         If either outline is not closed, if the outlines don't have the same
         number of vertices, or if the outlines are not parallel to each other.
     """
+    bottom, top = _prism_arrays(outline_a, outline_b, normal)
+    offset = top - bottom
+    if np.allclose(offset, offset[0], rtol=0.0, atol=TOL.absolute):
+        # outline_b is a translated copy of outline_a, extruding is a lot cheaper than sewing the faces
+        with warnings.catch_warnings():
+            # the OCC backend warns about an unsupported `cap_ends`, its prisms are always capped
+            warnings.filterwarnings("ignore", message="cap_ends parameter is not implemented", category=UserWarning)
+            return Brep.from_extrusion(Polygon(bottom.tolist()), Vector(*offset[0].tolist()))
+    return Brep.from_polygons(_polygons_from_prism_arrays(bottom, top))
+
+
+def mesh_from_outlines(outline_a: Polyline, outline_b: Polyline, normal: Optional[Vector] = None) -> Mesh:
+    """Create a closed mesh from two closed outlines.
+
+    The mesh counterpart of :func:`brep_from_outlines`, used by the mesh geometry backend.
+    Same assumptions apply.
+
+    Parameters
+    ----------
+    outline_a :
+        The first closed outline.
+    outline_b :
+        The second closed outline.
+    normal :
+        The normal vector around which the outlines are oriented.
+
+    Returns
+    -------
+        A closed Mesh with outward facing faces representing the solid defined by the two outlines.
+
+    Raises
+    ------
+    ValueError
+        If either outline is not closed, if the outlines don't have the same
+        number of vertices, or if the outlines are not parallel to each other.
+    """
+    bottom, top = _prism_arrays(outline_a, outline_b, normal)
+    count = len(bottom)
+    # vertex `count + i` is above vertex `i`
+    vertices = np.vstack((bottom, top)).tolist()
+    current = np.arange(count)
+    following = np.roll(current, -1)
+    sides = np.column_stack((current, current + count, following + count, following)).tolist()
+    faces = [current.tolist(), (current[::-1] + count).tolist()]
+    return Mesh.from_vertices_and_faces(vertices, faces + sides)
+
+
+def _prism_polygons(outline_a: Polyline, outline_b: Polyline, normal: Optional[Vector] = None) -> list[Polygon]:
+    # validates the outlines and returns the bottom, top and side polygons of the prism between them
+    return _polygons_from_prism_arrays(*_prism_arrays(outline_a, outline_b, normal))
+
+
+def _prism_arrays(outline_a: Polyline, outline_b: Polyline, normal: Optional[Vector] = None) -> tuple[np.ndarray, np.ndarray]:
+    # validates the outlines and returns the (count, 3) arrays of the prism's bottom and top vertices,
+    # both running clockwise around the normal, with top vertex `i` above bottom vertex `i`
     if not TOL.is_allclose(outline_a[0], outline_a[-1]):
         raise ValueError("outline_a is not closed: its first and last points must coincide.")
     if not TOL.is_allclose(outline_b[0], outline_b[-1]):
@@ -195,22 +302,34 @@ def brep_from_outlines(outline_a: Polyline, outline_b: Polyline, normal: Optiona
     if len(outline_a) != len(outline_b):
         raise ValueError("outline_a and outline_b must have the same number of vertices.")
 
-    normal_a = Polygon(outline_a.points[:-1]).normal
-    normal_b = Polygon(outline_b.points[:-1]).normal
-    angle = angle_vectors(normal_a, normal_b)
+    points_a = np.array(outline_a.points[:-1], dtype=float)
+    points_b = np.array(outline_b.points[:-1], dtype=float)
+    # Newell's method, the length of these is twice the enclosed area
+    area_a = np.cross(points_a, np.roll(points_a, -1, axis=0)).sum(axis=0)
+    area_b = np.cross(points_b, np.roll(points_b, -1, axis=0)).sum(axis=0)
+    angle = angle_vectors(area_a.tolist(), area_b.tolist())
     if not (TOL.is_zero(angle, tol=TOL.angular) or TOL.is_zero(angle - math.pi, tol=TOL.angular)):
         raise ValueError("outline_a and outline_b are not parallel to each other.")
 
-    normal = normal or Vector(0, 0, 1)
-    outline_a = correct_polyline_direction(outline_a, normal, clockwise=True)
-    outline_b = correct_polyline_direction(outline_b, normal, clockwise=True)
+    normal = np.array(normal or [0.0, 0.0, 1.0], dtype=float)
+    if np.dot(area_a, normal) > 0:
+        points_a = _reversed_loop(points_a)
+    if np.dot(area_b, normal) > 0:
+        points_b = _reversed_loop(points_b)
 
-    vector_a = Vector.from_start_end(outline_a[0], outline_b[0])
-    if vector_a.dot(normal) < 0:
+    if np.dot(points_b[0] - points_a[0], normal) < 0:
         # make sure that outline_b is above (Z+) outline_a
-        outline_a, outline_b = outline_b, outline_a
+        points_a, points_b = points_b, points_a
+    return points_a, points_b
+
+
+def _reversed_loop(points):
+    # reverses the direction of a closed loop of points, keeping its first point
+    return np.roll(points[::-1], 1, axis=0)
+
 
-    polygons = [Polygon(outline_a.points[0:-1]), Polygon(outline_b.points[-2::-1])]
-    for i in range(len(outline_a) - 1):
-        polygons.append(Polygon([outline_a[i], outline_b[i], outline_b[i + 1], outline_a[i + 1]]))
-    return Brep.from_polygons(polygons)
+def _polygons_from_prism_arrays(bottom: np.ndarray, top: np.ndarray) -> list[Polygon]:
+    polygons = [Polygon(bottom.tolist()), Polygon(top[::-1].tolist())]
+    sides = np.stack((bottom, top, np.roll(top, -1, axis=0), np.roll(bottom, -1, axis=0)), axis=1)
+    polygons.extend(Polygon(side) for side in sides.tolist())
+    return polygons
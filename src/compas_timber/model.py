@@ -11,6 +11,7 @@ from compas.tolerance import TOL
 from compas_model.elements import Element
 from compas_model.models import Model
 
+from compas_timber.clash import ClashDetector
 from compas_timber.connections import ConnectionSolver
 from compas_timber.connections import Joint
 from compas_timber.connections import JointCandidate
@@ -21,6 +22,9 @@ from compas_timber.elements import Layer
 from compas_timber.elements import Panel
 from compas_timber.elements import Plate
 from compas_timber.errors import BeamJoiningError
+from compas_timber.errors import FeatureApplicationError
+from compas_timber.geometry import GeometryBackend
+from compas_timber.geometry import GeometryInstance
 from compas_timber.structural import BeamStructuralElementSolver
 from compas_timber.structural import StructuralSegment
 
@@ -56,6 +60,13 @@ class TimberModel(Model):
         See :class:`~compas_timber.connections.JointTopology`.
     tolerance : :class:`~compas.tolerance.Tolerance`
         The tolerance configuration used for this model. TOL if none provided.
+    geometry_backend : str
+        The geometry backend used to compute the geometry of the elements in this model, one of
+        :class:`~compas_timber.geometry.GeometryBackend`. Defaults to ``GeometryBackend.BREP``.
+        Panels are always computed as Breps, regardless of the backend.
+    instancing : bool
+        If True (default), elements with identical local parametric data share a single element geometry,
+        see :meth:`geometry_instances`.
     volume : float
         The calculated total volume of the model.
 
@@ -68,11 +79,15 @@ class TimberModel(Model):
     def __data__(self):
         data = super().__data__
         data["joints"] = self._joints
+        data["geometry_backend"] = self._geometry_backend
+        data["instancing"] = self.instancing
         return data
 
     @classmethod
     def __from_data__(cls, data):
         model = super().__from_data__(data)
+        model.geometry_backend = data.get("geometry_backend", GeometryBackend.BREP)
+        model.instancing = data.get("instancing", True)
         joints_data = data["joints"]
         for guid_str, joint in joints_data.items():
             model._joints[guid_str] = joint
@@ -85,11 +100,18 @@ class TimberModel(Model):
 
         return model
 
-    def __init__(self, tolerance=None, **kwargs):
+    def __init__(self, tolerance=None, geometry_backend=None, instancing=True, **kwargs):
         super(TimberModel, self).__init__()
         self._joints = {}
         self._topologies = []  # added to avoid calculating multiple times
         self._tolerance = tolerance or TOL
+        self._geometry_backend = GeometryBackend.BREP
+        self.instancing = instancing
+        self._shared_geometries = {}  # instance key -> (element geometry, feature errors), both in local coordinates
+        self._instance_keys = {}  # element guid -> instance key
+        self._instance_users = {}  # instance key -> number of elements using it
+        if geometry_backend is not None:
+            self.geometry_backend = geometry_backend
         self._graph.update_default_edge_attributes(**self._TIMBER_GRAPH_EDGE_ATTRIBUTES)
         self._graph.update_default_node_attributes(**self._TIMBER_GRAPH_NODE_ATTRIBUTES)
 
@@ -106,6 +128,25 @@ class TimberModel(Model):
         # type: () -> Tolerance
         return self._tolerance
 
+    @property
+    def geometry_backend(self):
+        # type: () -> str
+        return self._geometry_backend
+
+    @geometry_backend.setter
+    def geometry_backend(self, value):
+        # type: (str) -> None
+        if value not in (GeometryBackend.BREP, GeometryBackend.MESH):
+            raise ValueError("Unknown geometry backend: {}. Expected one of {}.".format(value, [GeometryBackend.BREP, GeometryBackend.MESH]))
+        if value == self._geometry_backend:
+            return
+        self._geometry_backend = value
+        self.clear_geometry_instances()
+        for element in self.elements():
+            if isinstance(element, Panel):
+                continue  # always computed as a Brep
+            element.reset_computed_properties()
+
     @property
     def beams(self):
         # type: () -> List[Beam]
@@ -770,6 +811,115 @@ class TimberModel(Model):
             if candidate is not None:
                 self.add_joint_candidate(candidate)
 
+    def shared_elementgeometry(self, element):
+        """Returns the element geometry of an element, computing it only once for all elements with the same instance key.
+
+        This is called by :attr:`~compas_timber.base.TimberElement.elementgeometry`, there is usually no need to call it directly.
+
+        Parameters
+        ----------
+        element : :class:`~compas_timber.base.TimberElement`
+            The element.
+
+        Returns
+        -------
+        :class:`~compas_brep.Brep` | :class:`~compas.datastructures.Mesh`
+            The element geometry in local coordinates. Shared, must not be modified in place.
+
+        Notes
+        -----
+        The features which could not be applied when the shared geometry was computed are added to the
+        ``debug_info`` of every element using it, placed at that element.
+
+        """
+        key = element.compute_instance_key() if self.instancing else None
+        old_key = self._instance_keys.pop(element.guid, None)
+        if old_key is not None:
+            self._instance_users[old_key] -= 1
+            if not self._instance_users[old_key] and old_key != key:
+                # the element changed and was the last user of its previous geometry
+                del self._instance_users[old_key]
+                del self._shared_geometries[old_key]
+        if key is None:
+            return element.compute_elementgeometry()
+        self._instance_keys[element.guid] = key
+        self._instance_users[key] = self._instance_users.get(key, 0) + 1
+        shared = self._shared_geometries.get(key)
+        if shared is None:
+            errors_before = len(element.debug_info)
+            geometry = element.compute_elementgeometry()
+            to_local = element.modeltransformation.inverse()
+            errors = [_transformed_error(error, to_local) for error in element.debug_info[errors_before:]]
+            self._shared_geometries[key] = (geometry, errors)
+            return geometry
+        geometry, errors = shared
+        element.debug_info.extend(_transformed_error(error, element.modeltransformation) for error in errors)
+        return geometry
+
+    def geometry_instances(self, elements=None):
+        """Groups elements with identical local geometry.
+
+        Each group holds a single geometry in local coordinates and the elements sharing it.
+        Viewers and exporters can use these to draw or write each unique part once and place it with the elements' transformations.
+
+        Parameters
+        ----------
+        elements : list[:class:`~compas_timber.base.TimberElement`], optional
+            The elements to group. Defaults to all beams and plates in the model.
+
+        Returns
+        -------
+        list[:class:`~compas_timber.geometry.GeometryInstance`]
+            One instance per unique geometry, in order of first occurrence.
+
+        """
+        elements = list(elements) if elements is not None else list(self.beams) + list(self.plates)
+        instances = {}
+        result = []
+        for element in elements:
+            geometry = element.elementgeometry
+            key = self._instance_keys.get(element.guid)
+            instance = instances.get(key) if key is not None else None
+            if instance is None:
+                instance = GeometryInstance(key, geometry)
+                result.append(instance)
+                if key is not None:
+                    instances[key] = instance
+            instance.elements.append(element)
+        return result
+
+    def clear_geometry_instances(self):
+        """Removes all shared element geometries, they are recomputed on next access."""
+        self._shared_geometries = {}
+        self._instance_keys = {}
+        self._instance_users = {}
+
+    def find_clashes(self, elements=None, min_depth=None, exclude_joined=True, check_geometry=False, workers=None):
+        """Finds elements which physically interfere with each other.
+
+        See :class:`~compas_timber.clash.ClashDetector` for details.
+
+        Parameters
+        ----------
+        elements : list[:class:`~compas_model.elements.Element`], optional
+            The elements to check. If not provided, defaults to all beams, plates, and panels in the model.
+        min_depth : float, optional
+            The minimum penetration depth for a pair to be reported. Defaults to the model's absolute tolerance.
+        exclude_joined : bool, optional
+            If True (default), pairs connected by a joint are not reported.
+        check_geometry : bool, optional
+            If True, only pairs whose geometries actually intersect are reported.
+        workers : int, optional
+            The number of threads used for the narrow phase.
+
+        Returns
+        -------
+        list[:class:`~compas_timber.clash.Clash`]
+
+        """
+        detector = ClashDetector(self, min_depth=min_depth, exclude_joined=exclude_joined, workers=workers)
+        return detector.find_clashes(elements, check_geometry=check_geometry)
+
     def connect_adjacent_beams(self, max_distance=None):
         """Connects adjacent beams in the model."""
         self.compute_topologies(self.beams, max_distance)
@@ -944,3 +1094,11 @@ class TimberModel(Model):
         """
         tuples, joints = model._detach_subtree()
         self._attach_subtree(tuples, joints=joints, parent=parent)
+
+
+def _transformed_error(error, transformation):
+    # a copy of a feature application error with its geometries transformed, to share it between instances
+    if not isinstance(error, FeatureApplicationError):
+        return error
+    geometries = [geometry.transformed(transformation) if geometry is not None else None for geometry in (error.feature_geometry, error.element_geometry)]
+    return FeatureApplicationError(geometries[0], geometries[1], error.message)
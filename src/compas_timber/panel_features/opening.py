@@ -1,5 +1,7 @@
+from collections import OrderedDict
 from enum import auto
 
+import numpy as np
 from compas.geometry import Box
 from compas.geometry import Frame
 from compas.geometry import Line
@@ -9,17 +11,48 @@ from compas.geometry import Polyline
 from compas.geometry import Transformation
 from compas.geometry import Vector
 from compas.geometry import intersection_line_plane
+from compas.tolerance import TOL
 from compas_brep import Brep
 from compas_brep import NurbsCurve
 
 from compas_timber.errors import FeatureApplicationError
+from compas_timber.geometry import brep_from_outlines
 from compas_timber.utils import StrEnum
 from compas_timber.utils import correct_polyline_direction
+from compas_timber.utils import parametric_hash
 
 from .panel_features import PanelFeature
 
 
 class Opening(PanelFeature):
+    """An opening, e.g. a window or door, cut through a panel.
+
+    Parameters
+    ----------
+    frame : :class:`~compas.geometry.Frame`
+        The frame of the opening relative to the panel.
+    outline_a : :class:`~compas.geometry.Polyline`
+        The outline of the opening on the panel's outline_a side, relative to ``frame``.
+    outline_b : :class:`~compas.geometry.Polyline`
+        The outline of the opening on the panel's outline_b side, relative to ``frame``.
+    opening_type : :class:`OpeningType`, optional
+        The type of the opening. Defaults to ``OpeningType.WINDOW``.
+    name : str, optional
+        The name of the opening.
+
+    Attributes
+    ----------
+    shape : :class:`~compas_brep.Brep`
+        The volume cut out of the panel, relative to ``frame``. Openings with equal outlines share the same shape,
+        it must not be modified in place.
+    SHAPE_CACHE_SIZE : int
+        The number of shapes kept in the cache shared by all openings.
+
+    """
+
+    SHAPE_CACHE_SIZE = 1024
+    _shape_cache = OrderedDict()
+
     def __init__(self, frame, outline_a, outline_b, opening_type=None, name="Opening", **kwargs):
         super(Opening, self).__init__(frame=frame, name=name, **kwargs)
         self._outline_a = outline_a
@@ -50,13 +83,37 @@ class Opening(PanelFeature):
     @property
     def shape(self):
         if not self._shape:
-            positive_vector = Vector.from_start_end(self._outline_a[0], self._outline_b[0])
-            outline_a = correct_polyline_direction(self._outline_a, positive_vector, clockwise=True)
-            outline_b = correct_polyline_direction(self._outline_b, positive_vector, clockwise=True)
-            self._shape = Brep.from_loft([NurbsCurve.from_points(pts, degree=1) for pts in (outline_a, outline_b)])
-            self._shape.cap_planar_holes()
+            key = parametric_hash([self._outline_a, self._outline_b])
+            shape = Opening._shape_cache.pop(key, None)
+            if shape is None:
+                shape = self._compute_shape()
+            Opening._shape_cache[key] = shape  # (re)inserted as the most recently used
+            while len(Opening._shape_cache) > Opening.SHAPE_CACHE_SIZE:
+                Opening._shape_cache.popitem(last=False)
+            self._shape = shape
         return self._shape
 
+    @classmethod
+    def clear_shape_cache(cls):
+        """Clears the shapes shared by all openings, e.g. to free memory."""
+        cls._shape_cache.clear()
+
+    def _compute_shape(self):
+        points_a = np.array(self._outline_a.points, dtype=float)
+        points_b = np.array(self._outline_b.points, dtype=float)
+        if points_a.shape == points_b.shape and np.allclose(points_a[0], points_a[-1], rtol=0.0, atol=TOL.absolute):
+            offset = points_b - points_a
+            if np.allclose(offset, offset[0], rtol=0.0, atol=TOL.absolute):
+                # outline_b is a translated copy of outline_a, which is the common case and a lot cheaper than a loft
+                return brep_from_outlines(self._outline_a, self._outline_b, normal=Vector(*offset[0].tolist()))
+
+        positive_vector = Vector.from_start_end(self._outline_a[0], self._outline_b[0])
+        outline_a = correct_polyline_direction(self._outline_a, positive_vector, clockwise=True)
+        outline_b = correct_polyline_direction(self._outline_b, positive_vector, clockwise=True)
+        shape = Brep.from_loft([NurbsCurve.from_points(pts, degree=1) for pts in (outline_a, outline_b)])
+        shape.cap_planar_holes()
+        return shape
+
     def apply(self, panel_geometry, panel):
         """Applies the opening to the given panel geometry.
 
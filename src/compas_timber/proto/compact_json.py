@@ -0,0 +1,439 @@
+"""Compact JSON for a TimberModel.
+
+``compas.data.json_dump(model)`` writes the model's nested ``__data__``: every
+guid spelled out wherever it is referenced, the tree as a dict per node, the
+graph as dicts of dicts, and every float at full ``repr`` precision. The format
+here is the JSON form of the model's ``TimberModelData`` message instead, so it
+has what the protobuf codec has: a guid table that the rest of the model
+references by index, the tree and graph flattened into parallel arrays, and the
+element frames, transformations and outlines packed into columns of numbers.
+
+The JSON is not protobuf's own JSON mapping, which spells out every GuidRef as
+an object and every column as base64. A message is an object keyed by proto
+field names, a GuidRef is its table index (or the uuid, or null if unset) and a
+column is a flat array of numbers. Reading it back needs no generic parser
+either: the few values JSON cannot carry as they are (guids, bytes and packed
+``Any`` messages) are converted in place, and the rest is handed as it is to the
+message constructor, which builds the whole message in one call.
+
+Floats can be rounded to the precision of the model's tolerance on the way out,
+which shortens most numbers a model holds to a few digits.
+
+A document is marked with :data:`FORMAT` and :data:`VERSION`. :func:`read_model_json`
+reads these as well as the JSON of ``compas.data.json_dump``.
+"""
+
+import base64 as _base64
+import json as _json
+import uuid as _uuid
+
+import numpy as np
+from compas.data import json_loads
+from google.protobuf import any_pb2
+from google.protobuf import descriptor_pool
+from google.protobuf import json_format
+from google.protobuf import message_factory
+from google.protobuf.descriptor import FieldDescriptor
+
+from compas_timber.proto import model_pb2
+from compas_timber.proto.container import _open
+from compas_timber.proto.conversions import _GUID
+from compas_timber.proto.conversions import _is_map
+from compas_timber.proto.conversions import _model_from_pb
+from compas_timber.proto.conversions import _model_to_pb
+from compas_timber.proto.conversions import _unpack_guid_table
+
+FORMAT = "compas_timber.compact_json"
+VERSION = 1
+
+_ANY = "google.protobuf.Any"
+_COLUMNS = "compas_timber.proto.GeometryColumns"
+_COLUMN_FIELDS = ("frames", "transformations", "polyline_points")
+# left to protobuf's JSON mapping, which maps them to plain JSON values
+_WELL_KNOWN = ("google.protobuf.Value", "google.protobuf.Struct", "google.protobuf.ListValue")
+_FLOATS = (FieldDescriptor.TYPE_DOUBLE, FieldDescriptor.TYPE_FLOAT)
+_INT_KEYS = (
+    FieldDescriptor.TYPE_INT32,
+    FieldDescriptor.TYPE_INT64,
+    FieldDescriptor.TYPE_UINT32,
+    FieldDescriptor.TYPE_UINT64,
+    FieldDescriptor.TYPE_SINT32,
+    FieldDescriptor.TYPE_SINT64,
+    FieldDescriptor.TYPE_FIXED32,
+    FieldDescriptor.TYPE_FIXED64,
+    FieldDescriptor.TYPE_SFIXED32,
+    FieldDescriptor.TYPE_SFIXED64,
+)
+
+
+def _message_class(full_name):
+    return message_factory.GetMessageClass(descriptor_pool.Default().FindMessageTypeByName(full_name))
+
+
+# ---------------------------------------------------------------------------
+# message -> JSON
+# ---------------------------------------------------------------------------
+#
+# Like the codecs in conversions.py, the conversion of a message type is
+# compiled once from its descriptor, here per number of digits floats are
+# rounded to (None: not rounded).
+
+_TO_JSON = {}  # (message full_name, digits) -> to_json(msg)
+
+
+def _to_json(descriptor, digits):
+    key = (descriptor.full_name, digits)
+    convert = _TO_JSON.get(key)
+    if convert is None:
+        convert = _TO_JSON[key] = _compile_to_json(descriptor, digits)
+    return convert
+
+
+def _guid_to_json(msg):
+    which = msg.WhichOneof("id")
+    if which == "index":
+        return msg.index
+    if which == "raw":
+        return str(_uuid.UUID(bytes=msg.raw))
+    if which == "text":
+        return {"text": msg.text}
+    return None
+
+
+def _bytes_to_json(value):
+    return _base64.b64encode(value).decode("ascii")
+
+
+def _columns_to_json(digits):
+    def columns_to_json(msg):
+        out = {}
+        for name in _COLUMN_FIELDS:
+            values = np.frombuffer(getattr(msg, name), dtype="<f8")
+            if digits is not None:
+                values = values.round(digits)
+            out[name] = values.tolist()
+        out["polyline_lengths"] = list(msg.polyline_lengths)
+        return out
+
+    return columns_to_json
+
+
+def _any_to_json(digits):
+    def any_to_json(msg):
+        name = msg.TypeName()
+        inner = _message_class(name).FromString(msg.value)
+        out = {"@type": name}
+        out.update(_to_json(inner.DESCRIPTOR, digits)(inner))
+        return out
+
+    return any_to_json
+
+
+def _scalar_to_json(field, digits):
+    """Converts one value of a scalar field, None where JSON takes it as it is."""
+    if field.type == FieldDescriptor.TYPE_BYTES:
+        return _bytes_to_json
+    if field.type in _FLOATS and digits is not None:
+        return lambda value: round(value, digits)
+    return None
+
+
+def _item_to_json(field, digits):
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        return _message_to_json(field.message_type, digits)
+    return _scalar_to_json(field, digits)
+
+
+def _message_to_json(descriptor, digits):
+    # looked up when called, the message types can be recursive
+    return lambda msg: _to_json(descriptor, digits)(msg)
+
+
+def _field_to_json(field, digits):
+    if _is_map(field):
+        key_type = field.message_type.fields_by_name["key"].type
+        convert = _item_to_json(field.message_type.fields_by_name["value"], digits)
+        if convert is None:
+            return lambda value: {str(k): v for k, v in value.items()} if key_type in _INT_KEYS else dict(value)
+        return lambda value: {str(k): convert(v) for k, v in value.items()}
+    convert = _item_to_json(field, digits)
+    if field.is_repeated:
+        if convert is None:
+            return list
+        return lambda value: [convert(item) for item in value]
+    return convert
+
+
+def _compile_to_json(descriptor, digits):
+    if descriptor.full_name == _GUID:
+        return _guid_to_json
+    if descriptor.full_name == _COLUMNS:
+        return _columns_to_json(digits)
+    if descriptor.full_name == _ANY:
+        return _any_to_json(digits)
+    if descriptor.full_name in _WELL_KNOWN:
+        return json_format.MessageToDict
+
+    converters = {field.name: _field_to_json(field, digits) for field in descriptor.fields}
+
+    def to_json(msg):
+        out = {}
+        for field, value in msg.ListFields():
+            convert = converters[field.name]
+            out[field.name] = value if convert is None else convert(value)
+        return out
+
+    return to_json
+
+
+# ---------------------------------------------------------------------------
+# JSON -> message
+# ---------------------------------------------------------------------------
+#
+# A message constructor takes nested dicts and lists for its message fields, so
+# the decoded JSON of a message is, for the most part, already the argument
+# list of its constructor. Only the values JSON does not have a type for are
+# converted, in place, along the fields that can lead to one.
+
+_FROM_JSON = {}  # message full_name -> from_json(value), None where there is nothing to convert
+_SPECIAL = (_GUID, _COLUMNS, _ANY) + _WELL_KNOWN
+
+
+def _guid_from_json(value):
+    if value is None:
+        return {}
+    if isinstance(value, int):
+        return {"index": value}
+    if isinstance(value, str):
+        return {"raw": _uuid.UUID(value).bytes}
+    return value
+
+
+def _columns_from_json(value):
+    for name in _COLUMN_FIELDS:
+        if name in value:
+            value[name] = np.asarray(value[name], dtype="<f8").tobytes()
+    return value
+
+
+def _any_from_json(value):
+    value = dict(value)
+    cls = _message_class(value.pop("@type"))
+    msg = any_pb2.Any()
+    msg.Pack(_build(cls, value))
+    return msg
+
+
+def _well_known_from_json(descriptor):
+    cls = _message_class(descriptor.full_name)
+    return lambda value: json_format.ParseDict(value, cls())
+
+
+def _needs_conversion(descriptor, seen):
+    if descriptor.full_name in _SPECIAL:
+        return True
+    if descriptor.full_name in seen:
+        return False
+    seen.add(descriptor.full_name)
+    for field in descriptor.fields:
+        if field.type == FieldDescriptor.TYPE_BYTES:
+            return True
+        if field.type == FieldDescriptor.TYPE_MESSAGE and _needs_conversion(field.message_type, seen):
+            return True
+    return False
+
+
+def _from_json(descriptor):
+    if descriptor.full_name not in _FROM_JSON:
+        _FROM_JSON[descriptor.full_name] = _compile_from_json(descriptor)
+    return _FROM_JSON[descriptor.full_name]
+
+
+def _item_from_json(field):
+    if field.type == FieldDescriptor.TYPE_BYTES:
+        return _base64.b64decode
+    if field.type != FieldDescriptor.TYPE_MESSAGE or not _needs_conversion(field.message_type, set()):
+        return None
+    descriptor = field.message_type
+    return lambda value: _from_json(descriptor)(value)
+
+
+def _field_from_json(field):
+    if _is_map(field):
+        int_keys = field.message_type.fields_by_name["key"].type in _INT_KEYS
+        convert = _item_from_json(field.message_type.fields_by_name["value"])
+        if convert is None:
+            return (lambda value: {int(k): v for k, v in value.items()}) if int_keys else None
+        if int_keys:
+            return lambda value: {int(k): convert(v) for k, v in value.items()}
+        return lambda value: {k: convert(v) for k, v in value.items()}
+    convert = _item_from_json(field)
+    if convert is None or not field.is_repeated:
+        return convert
+    return lambda value: [convert(item) for item in value]
+
+
+def _compile_from_json(descriptor):
+    if descriptor.full_name == _GUID:
+        return _guid_from_json
+    if descriptor.full_name == _COLUMNS:
+        return _columns_from_json
+    if descriptor.full_name == _ANY:
+        return _any_from_json
+    if descriptor.full_name in _WELL_KNOWN:
+        return _well_known_from_json(descriptor)
+
+    plan = []
+    for field in descriptor.fields:
+        convert = _field_from_json(field)
+        if convert is not None:
+            plan.append((field.name, convert))
+    if not plan:
+        return None
+
+    def from_json(value):
+        for name, convert in plan:
+            if name in value:
+                value[name] = convert(value[name])
+        return value
+
+    return from_json
+
+
+def _build(cls, value):
+    """The message of class ``cls`` the JSON object ``value`` stands for. Converts ``value`` in place."""
+    convert = _from_json(cls.DESCRIPTOR)
+    if convert is not None:
+        value = convert(value)
+    return cls(**value)
+
+
+# ---------------------------------------------------------------------------
+# TimberModel
+# ---------------------------------------------------------------------------
+
+
+def model_to_json(model, quantize=False, pretty=False):
+    """Encodes a TimberModel as compact JSON.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to encode.
+    quantize : bool, optional
+        If True, floats are rounded to the precision of the model's tolerance (``model.tolerance.precision``
+        decimals). Defaults to False.
+    pretty : bool, optional
+        If True, the JSON is indented. Defaults to False.
+
+    Returns
+    -------
+    str
+
+    Notes
+    -----
+    Rounding applies to every float, including the axes of the element frames; a frame is made orthonormal again when
+    it is read.
+
+    """
+    digits = model.tolerance.precision if quantize else None
+    msg = _model_to_pb(model)
+    guids = _unpack_guid_table(msg.guid_table)
+    msg.ClearField("guid_table")
+    data = _to_json(msg.DESCRIPTOR, digits)(msg)
+    data["guid_table"] = guids
+    document = {"format": FORMAT, "version": VERSION, "model": data}
+    if pretty:
+        return _json.dumps(document, indent=4)
+    return _json.dumps(document, separators=(",", ":"))
+
+
+def _model_from_document(document):
+    if document["version"] > VERSION:
+        raise ValueError("Compact JSON version {} is not supported, expected {} or lower.".format(document["version"], VERSION))
+    data = document["model"]
+    guids = b"".join(_uuid.UUID(guid).bytes for guid in data.pop("guid_table", ()))
+    msg = _build(model_pb2.TimberModelData, data)
+    msg.guid_table = guids
+    return _model_from_pb(msg)
+
+
+def _is_compact(document):
+    return isinstance(document, dict) and document.get("format") == FORMAT
+
+
+def model_from_json(text):
+    """Decodes a TimberModel from the JSON of :func:`model_to_json` or of ``compas.data.json_dumps``.
+
+    Parameters
+    ----------
+    text : str
+        The JSON.
+
+    Returns
+    -------
+    :class:`~compas_timber.model.TimberModel`
+
+    Raises
+    ------
+    ValueError
+        If the JSON is of a later version of the compact format.
+
+    """
+    document = _json.loads(text)
+    if _is_compact(document):
+        return _model_from_document(document)
+    return json_loads(text)
+
+
+def write_model_json(model, file_or_path, quantize=False, pretty=False):
+    """Writes a TimberModel to a file as compact JSON, see :func:`model_to_json`.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to write.
+    file_or_path : str | os.PathLike | file-like
+        The path of the file, or a text stream to write to.
+    quantize : bool, optional
+        If True, floats are rounded to the precision of the model's tolerance. Defaults to False.
+    pretty : bool, optional
+        If True, the JSON is indented. Defaults to False.
+
+    Returns
+    -------
+    int
+        The number of characters written.
+
+    """
+    text = model_to_json(model, quantize=quantize, pretty=pretty)
+    with _open(file_or_path, "w") as stream:
+        stream.write(text)
+    return len(text)
+
+
+def read_model_json(file_or_path):
+    """Reads a TimberModel from a file written with :func:`write_model_json` or ``compas.data.json_dump``.
+
+    Parameters
+    ----------
+    file_or_path : str | os.PathLike | file-like
+        The path of the file, or a text stream to read from.
+
+    Returns
+    -------
+    :class:`~compas_timber.model.TimberModel`
+
+    """
+    with _open(file_or_path, "r") as stream:
+        return model_from_json(stream.read())
+
+
+__all__ = [
+    "FORMAT",
+    "VERSION",
+    "model_from_json",
+    "model_to_json",
+    "read_model_json",
+    "write_model_json",
+]
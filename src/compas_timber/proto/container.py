@@ -0,0 +1,417 @@
+"""Chunked, streamable protobuf container for a TimberModel.
+
+``pb_dump_bts(model)`` produces one ``TimberModelData`` message, which has to be
+built and parsed as a whole and cannot exceed protobuf's 2 GB message limit. The
+container splits the model into a header (guid, transformation, materials, tree
+and graph) and one length-delimited record per element, per element's features
+and per joint, see ``container.proto``. Records are written and read one at a
+time, so memory is bounded by the largest record, and a reader can load a subset
+of the elements or leave out their features without decoding the rest.
+
+Elements and joints are encoded with the same serializers as in a
+``TimberModelData``; only the scope of the guid table differs.
+"""
+
+import contextlib as _contextlib
+import os as _os
+
+from compas_timber.model import TimberModel
+from compas_timber.proto import connections_pb2
+from compas_timber.proto import container_pb2
+from compas_timber.proto import elements_pb2
+from compas_timber.proto.conversions import _field_from_pb
+from compas_timber.proto.conversions import _field_to_pb
+from compas_timber.proto.conversions import _graph_from_pb
+from compas_timber.proto.conversions import _graph_to_pb
+from compas_timber.proto.conversions import _guid_table
+from compas_timber.proto.conversions import _guid_to_pb
+from compas_timber.proto.conversions import _model_settings_from_pb
+from compas_timber.proto.conversions import _model_settings_to_pb
+from compas_timber.proto.conversions import _pack_guid_table
+from compas_timber.proto.conversions import _raw_guid
+from compas_timber.proto.conversions import _tree_from_pb
+from compas_timber.proto.conversions import _tree_to_pb
+from compas_timber.proto.conversions import _unwrap
+from compas_timber.proto.conversions import _uuid_from_pb
+from compas_timber.proto.conversions import _wrap
+
+MAGIC = b"CTMC"
+VERSION = 1
+
+ELEMENT = container_pb2.MODEL_RECORD_ELEMENT
+FEATURES = container_pb2.MODEL_RECORD_FEATURES
+JOINT = container_pb2.MODEL_RECORD_JOINT
+
+_ELEMENT_DATA = elements_pb2.ElementData.DESCRIPTOR
+_JOINT_DATA = connections_pb2.JointData.DESCRIPTOR
+_HEADER_FIELDS = ("transformation", "materials")
+
+
+# ---------------------------------------------------------------------------
+# framing
+# ---------------------------------------------------------------------------
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(stream):
+    """Reads a varint from a stream. Returns None at the end of the stream."""
+    result = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise EOFError("The model container ends within a record length.")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def _write_frame(stream, msg):
+    payload = msg.SerializeToString()
+    stream.write(_varint(len(payload)))
+    stream.write(payload)
+    return len(payload)
+
+
+def _read_frame(stream):
+    """Reads the bytes of the next length-delimited message, or None at the end of the stream."""
+    length = _read_varint(stream)
+    if length is None:
+        return None
+    payload = stream.read(length)
+    if len(payload) != length:
+        raise EOFError("The model container ends within a record.")
+    return payload
+
+
+@_contextlib.contextmanager
+def _open(file_or_path, mode):
+    if isinstance(file_or_path, (str, _os.PathLike)):
+        with open(file_or_path, mode) as stream:
+            yield stream
+    else:
+        yield file_or_path
+
+
+# ---------------------------------------------------------------------------
+# writing
+# ---------------------------------------------------------------------------
+
+
+def _header_to_pb(model):
+    msg = container_pb2.ModelContainerHeaderData()
+    msg.version = VERSION
+    data = model.__data__
+    with _guid_table() as table:
+        msg.guid.CopyFrom(_guid_to_pb(model.guid))
+        if getattr(model, "_name", None) is not None:
+            msg.name = model._name
+        for name in _HEADER_FIELDS:
+            _field_to_pb(msg, msg.DESCRIPTOR.fields_by_name[name], data.get(name))
+        msg.tree.CopyFrom(_tree_to_pb(data["tree"]))
+        msg.graph.CopyFrom(_graph_to_pb(data["graph"]))
+        msg.guid_table = _pack_guid_table(table)
+    _model_settings_to_pb(model, msg)
+    msg.element_count = len(data["elements"])
+    msg.joint_count = len(data["joints"])
+    return msg
+
+
+def _element_records(element):
+    """The record of an element, and the record of its features if it has any."""
+    with _guid_table() as table:
+        msg = _wrap(_ELEMENT_DATA, element)
+        guid_table = _pack_guid_table(table)
+    arm = msg.WhichOneof("element")
+    inner = getattr(msg, arm)
+
+    features = None
+    if "features" in inner.DESCRIPTOR.fields_by_name and len(inner.features):
+        features = elements_pb2.ElementData()
+        getattr(features, arm).features.extend(inner.features)
+        inner.ClearField("features")
+
+    guid = _raw_guid(element.guid)
+    record = container_pb2.ModelRecordData(kind=ELEMENT, guid=guid, type=type(element).__name__, payload=msg.SerializeToString())
+    record.guid_table = guid_table
+    yield record
+    if features is not None:
+        yield container_pb2.ModelRecordData(kind=FEATURES, guid=guid, type=type(element).__name__, payload=features.SerializeToString())
+
+
+def _joint_record(joint):
+    with _guid_table() as table:
+        msg = _wrap(_JOINT_DATA, joint)
+        guid_table = _pack_guid_table(table)
+    record = container_pb2.ModelRecordData(kind=JOINT, guid=_raw_guid(joint.guid), type=type(joint).__name__, payload=msg.SerializeToString())
+    record.guid_table = guid_table
+    record.elements.extend(_raw_guid(element.guid) for element in joint.elements)
+    return record
+
+
+def write_model_container(model, file_or_path):
+    """Writes a model into a chunked protobuf container.
+
+    The header is written first, then one record per element, the features of each element in a record of their own
+    directly after it, and one record per joint. Only one record is held in memory at a time.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to write.
+    file_or_path : str | os.PathLike | file-like
+        The path of the file to write, or a binary stream to write to.
+
+    Returns
+    -------
+    int
+        The number of records written.
+
+    """
+    count = 0
+    with _open(file_or_path, "wb") as stream:
+        stream.write(MAGIC)
+        _write_frame(stream, _header_to_pb(model))
+        for element in model._elements.values():
+            for record in _element_records(element):
+                _write_frame(stream, record)
+                count += 1
+        for joint in model._joints.values():
+            _write_frame(stream, _joint_record(joint))
+            count += 1
+    return count
+
+
+# ---------------------------------------------------------------------------
+# reading
+# ---------------------------------------------------------------------------
+
+
+def _subclass_names(types):
+    names = set()
+    for cls in types:
+        if isinstance(cls, str):
+            names.add(cls)
+            continue
+        stack = [cls]
+        while stack:
+            current = stack.pop()
+            names.add(current.__name__)
+            stack.extend(current.__subclasses__())
+    return names
+
+
+class ModelContainerReader(object):
+    """Reads a model container written with :func:`write_model_container`, record by record.
+
+    Every read opens the file again and streams it from the start. If a stream is given instead of a path, it can be
+    read once.
+
+    Parameters
+    ----------
+    file_or_path : str | os.PathLike | file-like
+        The path of the container file, or a binary stream positioned at its start.
+
+    """
+
+    def __init__(self, file_or_path):
+        self.file_or_path = file_or_path
+
+    @_contextlib.contextmanager
+    def _records(self):
+        with _open(self.file_or_path, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a compas_timber model container.")
+            payload = _read_frame(stream)
+            if payload is None:
+                raise EOFError("The model container has no header.")
+            header = container_pb2.ModelContainerHeaderData.FromString(payload)
+            if header.version > VERSION:
+                raise ValueError("Model container version {} is not supported, expected {} or lower.".format(header.version, VERSION))
+            yield header, self._iter_frames(stream)
+
+    @staticmethod
+    def _iter_frames(stream):
+        while True:
+            payload = _read_frame(stream)
+            if payload is None:
+                return
+            yield container_pb2.ModelRecordData.FromString(payload)
+
+    def read_header(self):
+        """Reads the header of the container.
+
+        Returns
+        -------
+        :class:`~compas_timber.proto.container_pb2.ModelContainerHeaderData`
+
+        """
+        with self._records() as (header, _):
+            return header
+
+    def iter_records(self):
+        """Yields the records of the container in file order, without decoding their payload.
+
+        Yields
+        ------
+        :class:`~compas_timber.proto.container_pb2.ModelRecordData`
+
+        """
+        with self._records() as (_, records):
+            for record in records:
+                yield record
+
+    def iter_elements(self, guids=None, types=None, features=True):
+        """Yields the elements of the container in file order.
+
+        Records of elements which are not selected, and of features which are not needed, are skipped without decoding.
+
+        Parameters
+        ----------
+        guids : list(str | :class:`uuid.UUID`), optional
+            Only yield the elements with these guids.
+        types : list(type | str), optional
+            Only yield elements of these types or their subclasses, given as classes or class names.
+        features : bool, optional
+            If False, the elements are decoded without their features. Defaults to True.
+
+        Yields
+        ------
+        :class:`~compas_model.elements.Element`
+
+        """
+        with self._records() as (_, records):
+            for element in self._decode_elements(records, guids, types, features):
+                yield element
+
+    def _decode_elements(self, records, guids, types, features, joints=None):
+        wanted = {_raw_guid(guid) for guid in guids} if guids is not None else None
+        names = _subclass_names(types) if types is not None else None
+        pending = None  # the selected element record, until it is known whether features follow it
+        for record in records:
+            if record.kind == FEATURES:
+                if pending is not None and features and record.guid == pending[0].guid:
+                    pending[1] = record
+                continue
+            if pending is not None:
+                yield _decode_element(*pending)
+                pending = None
+            if record.kind == ELEMENT:
+                if (wanted is None or record.guid in wanted) and (names is None or record.type in names):
+                    pending = [record, None]
+            elif record.kind == JOINT and joints is not None:
+                joints.append(record)
+        if pending is not None:
+            yield _decode_element(*pending)
+
+    def read_model(self, guids=None, types=None, features=True, joints=True):
+        """Reads the model, or a part of it, from the container.
+
+        Without ``guids`` or ``types`` the whole model is restored, as by ``pb_load_bts``. Otherwise, the model contains
+        the selected elements, with the parent relations among them, and the joints of which all elements were
+        selected.
+
+        Parameters
+        ----------
+        guids : list(str | :class:`uuid.UUID`), optional
+            Only read the elements with these guids.
+        types : list(type | str), optional
+            Only read elements of these types or their subclasses, given as classes or class names.
+        features : bool, optional
+            If False, the elements are read without their features. Defaults to True.
+        joints : bool, optional
+            If False, no joints are read. Defaults to True.
+
+        Returns
+        -------
+        :class:`~compas_timber.model.TimberModel`
+
+        """
+        joint_records = [] if joints else None
+        with self._records() as (header, records):
+            elements = {}
+            for element in self._decode_elements(records, guids, types, features, joint_records):
+                elements[str(element.guid)] = element
+
+        with _guid_table(packed=header.guid_table):
+            model_guid = _uuid_from_pb(header.guid)
+            transformation, materials = (_field_from_pb(header, header.DESCRIPTOR.fields_by_name[name]) for name in _HEADER_FIELDS)
+            tree = _tree_from_pb(header.tree)
+            graph = _graph_from_pb(header.graph)
+
+        if guids is None and types is None:
+            data = {
+                "transformation": transformation,
+                "elements": elements,
+                "materials": {str(material.guid): material for material in materials},
+                "tree": tree,
+                "graph": graph,
+                "joints": {} if joint_records is None else {str(joint.guid): joint for joint in map(_decode_joint, joint_records)},
+            }
+            model = TimberModel.__from_data__(data)
+        else:
+            model = TimberModel()
+            model._transformation = transformation
+            model._materials = {str(material.guid): material for material in materials}
+            _add_subtree(model, tree["root"], None, elements)
+            loaded = {_raw_guid(guid) for guid in elements}
+            for record in joint_records or []:
+                if all(guid in loaded for guid in record.elements):
+                    joint = _decode_joint(record)
+                    joint.restore_elements_from_keys(model)
+                    model.add_joint(joint)
+
+        model._guid = model_guid
+        if header.HasField("name"):
+            model.name = header.name
+        _model_settings_from_pb(header, model)
+        return model
+
+
+def _decode_element(record, features=None):
+    msg = elements_pb2.ElementData.FromString(record.payload)
+    if features is not None:
+        arm = msg.WhichOneof("element")
+        getattr(msg, arm).features.extend(getattr(elements_pb2.ElementData.FromString(features.payload), arm).features)
+    with _guid_table(packed=record.guid_table):
+        return _unwrap(msg)
+
+
+def _decode_joint(record):
+    with _guid_table(packed=record.guid_table):
+        return _unwrap(connections_pb2.JointData.FromString(record.payload))
+
+
+def _add_subtree(model, nodedata, parent, elements):
+    # adds the loaded elements of a tree node's subtree under their closest loaded ancestor
+    for child in nodedata.get("children") or []:
+        element = elements.get(child.get("element"))
+        if element is not None:
+            model.add_element(element, parent=parent)
+        _add_subtree(model, child, element if element is not None else parent, elements)
+
+
+def read_model_container(file_or_path, guids=None, types=None, features=True, joints=True):
+    """Reads a model, or a part of it, from a container written with :func:`write_model_container`.
+
+    Shortcut for ``ModelContainerReader(file_or_path).read_model(...)``, see :meth:`ModelContainerReader.read_model`.
+
+    """
+    return ModelContainerReader(file_or_path).read_model(guids=guids, types=types, features=features, joints=joints)
+
+
+__all__ = [
+    "ModelContainerReader",
+    "read_model_container",
+    "write_model_container",
+]
@@ -17,12 +17,15 @@ import contextlib as _contextlib
 import threading as _threading
 import uuid as _uuid
 
+import numpy as np
 from compas.geometry import Frame
 from compas.geometry import Line
 from compas.geometry import Point
 from compas.geometry import Polyline
 from compas.geometry import Transformation
 from compas.geometry import Vector
+from compas.geometry import cross_vectors
+from compas.geometry import dot_vectors
 from compas_pb.conversions import frame_from_pb
 from compas_pb.conversions import frame_to_pb
 from compas_pb.conversions import line_from_pb
@@ -78,29 +81,116 @@ _GUID = "compas_timber.proto.GuidRef"
 # ``_CONTEXT`` and every guid goes in once, referenced by index everywhere else.
 # Outside that scope there is no table, and a GuidRef falls back to carrying the
 # 16 raw bytes so a message serialized on its own still round-trips.
+#
+# A TimberModel fills its table up front with the guids that are referenced from
+# elsewhere -- the model, its elements, materials and joints -- and freezes it.
+# Any other guid (a feature's, say) is named exactly once and is written raw,
+# which is no larger than an index plus its table entry. The table then does
+# not depend on the order things are encoded in, so elements can be encoded in
+# any order, or in other processes (see compas_timber.proto.parallel).
+#
+# The table is a single bytes field, the 16 raw bytes of each guid back to back.
+# A guid is interned in whatever form it comes in -- UUID, string or raw bytes --
+# and is only turned into 16 bytes once. On the way back the table is viewed
+# rather than unpacked: an entry is converted the first time it is referenced,
+# to a string where the guid is data (a joint's elements, a tree node) and to a
+# UUID where it is an object's own guid, which is what compas keeps in `_guid`.
+
+
+def _raw_guid(guid):
+    """The 16 bytes of a guid given as a UUID, a string or its 16 bytes. None if it is not a uuid."""
+    if isinstance(guid, _uuid.UUID):
+        return guid.bytes
+    if isinstance(guid, bytes) and len(guid) == 16:
+        return guid
+    try:
+        return _uuid.UUID(str(guid)).bytes
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def _guid_str(raw):
+    """The string of a uuid from its 16 bytes, as ``str(uuid.UUID(bytes=raw))`` but without the UUID."""
+    digits = raw.hex()
+    return "{}-{}-{}-{}-{}".format(digits[:8], digits[8:12], digits[12:16], digits[16:20], digits[20:])
 
 
 class _GuidTable(object):
-    """Interns guid strings for the duration of one model (de)serialization."""
+    """Interns guids for the duration of one model serialization."""
 
-    def __init__(self, entries=None):
-        self._entries = list(entries or [])
-        self._index = {g: i for i, g in enumerate(self._entries)}
+    def __init__(self, entries=None, frozen=False):
+        self._entries = []
+        self._index = {}
+        self._frozen = False
+        for guid in entries or ():
+            self.intern(guid)
+        self._frozen = frozen
 
     @property
     def entries(self):
+        """The 16 raw bytes of each guid, in index order."""
         return self._entries
 
     def intern(self, guid):
+        """The index of ``guid``, added to the table if it is not frozen.
+
+        ``None`` if ``guid`` is not a uuid, or if the table is frozen and lacks it.
+
+        """
+        # keyed by the guid as given as well, so a string is parsed once per table rather than once per reference
         index = self._index.get(guid)
         if index is None:
-            index = len(self._entries)
+            raw = _raw_guid(guid)
+            if raw is None:
+                return None
+            index = self._index.get(raw)
+            if index is None:
+                if self._frozen:
+                    return None
+                index = len(self._entries)
+                self._entries.append(raw)
+                self._index[raw] = index
             self._index[guid] = index
-            self._entries.append(guid)
         return index
 
     def resolve(self, index):
-        return self._entries[index]
+        return _guid_str(self._entries[index])
+
+    def resolve_uuid(self, index):
+        return _uuid.UUID(bytes=self._entries[index])
+
+
+class _PackedGuidTable(object):
+    """Resolves indices into a packed guid table, converting an entry the first time it is referenced."""
+
+    def __init__(self, packed):
+        self._view = memoryview(packed)
+        self._strings = {}
+        self._uuids = {}
+
+    def __len__(self):
+        return len(self._view) // 16
+
+    def intern(self, guid):
+        # read-only: a guid encoded while decoding (a delta re-encodes elements, say) is written raw
+        return None
+
+    def _raw(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("GuidRef index {} is out of range of a guid table of {} entries".format(index, len(self)))
+        return self._view[index * 16 : index * 16 + 16]
+
+    def resolve(self, index):
+        guid = self._strings.get(index)
+        if guid is None:
+            guid = self._strings[index] = _guid_str(self._raw(index))
+        return guid
+
+    def resolve_uuid(self, index):
+        guid = self._uuids.get(index)
+        if guid is None:
+            guid = self._uuids[index] = _uuid.UUID(bytes=self._raw(index).tobytes())
+        return guid
 
 
 _CONTEXT = _threading.local()
@@ -111,9 +201,10 @@ def _table():
 
 
 @_contextlib.contextmanager
-def _guid_table(entries=None):
+def _guid_table(entries=None, frozen=False, packed=None):
+    """Puts a guid table in scope: a new one to encode into, or, with ``packed``, the table to decode from."""
     previous = _table()
-    _CONTEXT.table = _GuidTable(entries)
+    _CONTEXT.table = _PackedGuidTable(packed) if packed is not None else _GuidTable(entries, frozen)
     try:
         yield _CONTEXT.table
     finally:
@@ -122,21 +213,29 @@ def _guid_table(entries=None):
 
 def _guid_to_pb(guid):
     """Encode a guid as a GuidRef, interning it when a table is in scope."""
-    guid = str(guid)
     ref = common_pb2.GuidRef()
-    table = _table()
+    _guid_into(ref, guid)
+    return ref
+
+
+def _guid_into(ref, guid):
+    """Like _guid_to_pb, but fills in an existing GuidRef -- saves a message and a copy per guid."""
+    table = getattr(_CONTEXT, "table", None)
     if table is not None:
-        ref.index = table.intern(guid)
-        return ref
-    try:
-        ref.raw = _uuid.UUID(guid).bytes
-    except (ValueError, AttributeError, TypeError):
+        index = table.intern(guid)
+        if index is not None:
+            ref.index = index
+            return
+    raw = _raw_guid(guid)
+    if raw is None:
         # not a uuid; keep it verbatim rather than lose it
-        ref.text = guid
-    return ref
+        ref.text = str(guid)
+    else:
+        ref.raw = raw
 
 
 def _guid_from_pb(ref):
+    """The guid of a GuidRef as a string, None if it is unset."""
     which = ref.WhichOneof("id")
     if which is None:
         return None
@@ -146,25 +245,31 @@ def _guid_from_pb(ref):
             raise ValueError("GuidRef references a guid table, but none is in scope")
         return table.resolve(ref.index)
     if which == "raw":
-        return str(_uuid.UUID(bytes=ref.raw))
+        return _guid_str(ref.raw)
     return ref.text
 
 
+def _uuid_from_pb(ref):
+    """The guid of a GuidRef as a UUID, to set as an object's ``_guid``. A guid that is not a uuid stays a string."""
+    which = ref.WhichOneof("id")
+    if which == "index":
+        table = _table()
+        if table is None:
+            raise ValueError("GuidRef references a guid table, but none is in scope")
+        return table.resolve_uuid(ref.index)
+    if which == "raw":
+        return _uuid.UUID(bytes=ref.raw)
+    return _guid_from_pb(ref)
+
+
 def _pack_guid_table(table):
-    """The 16 raw bytes of each interned uuid, in index order."""
-    packed = []
-    for guid in table.entries:
-        try:
-            packed.append(_uuid.UUID(guid).bytes)
-        except (ValueError, AttributeError, TypeError):
-            # a non-uuid guid never reaches the table via _guid_to_pb, but keep
-            # the arrays aligned if one ever does
-            packed.append(b"")
-    return packed
+    """The guid table as one bytes value, the 16 raw bytes of each entry back to back."""
+    return b"".join(table.entries)
 
 
 def _unpack_guid_table(packed):
-    return [str(_uuid.UUID(bytes=raw)) if raw else "" for raw in packed]
+    """The guids of a packed guid table as strings, in index order."""
+    return [_guid_str(packed[start : start + 16]) for start in range(0, len(packed), 16)]
 
 
 # ---------------------------------------------------------------------------
@@ -240,6 +345,106 @@ def _nested_from_pb(msg):
     return fn(msg)
 
 
+# ---------------------------------------------------------------------------
+# geometry columns
+# ---------------------------------------------------------------------------
+#
+# The same idea as the guid table, for the frames, transformations and
+# polylines of the elements: while a TimberModel is being (de)serialized, the
+# fields that have a `<field>_ref` companion (see elements.proto) put their
+# value into a packed column of doubles and store only its index. Decoding
+# reads each column with np.frombuffer in one go; the Frame, Transformation or
+# Polyline is built when the element that owns it is.
+
+_COLUMNS = {
+    "compas_pb.data.FrameData": "frame",
+    "compas_pb.data.TransformationData": "transformation",
+    "compas_pb.data.PolylineData": "polyline",
+}
+
+
+class _ColumnWriter(object):
+    """Collects the column values of one model serialization."""
+
+    def __init__(self):
+        self._frames = []
+        self._transformations = []
+        self._points = []
+        self._lengths = []
+
+    def add_frame(self, frame):
+        point, xaxis, yaxis = frame.point, frame.xaxis, frame.yaxis
+        self._frames.extend((point.x, point.y, point.z, xaxis.x, xaxis.y, xaxis.z, yaxis.x, yaxis.y, yaxis.z))
+        return len(self._frames) // 9 - 1
+
+    def add_transformation(self, transformation):
+        for row in transformation.matrix:
+            self._transformations.extend(row)
+        return len(self._transformations) // 16 - 1
+
+    def add_polyline(self, polyline):
+        points = polyline.points
+        for point in points:
+            self._points.extend((point[0], point[1], point[2]))
+        self._lengths.append(len(points))
+        return len(self._lengths) - 1
+
+    def fill(self, msg):
+        """Write the columns into a GeometryColumns message."""
+        msg.frames = np.asarray(self._frames, dtype="<f8").tobytes()
+        msg.transformations = np.asarray(self._transformations, dtype="<f8").tobytes()
+        msg.polyline_points = np.asarray(self._points, dtype="<f8").tobytes()
+        msg.polyline_lengths.extend(self._lengths)
+
+
+class _ColumnReader(object):
+    """Views the columns of a GeometryColumns message, without copying them."""
+
+    def __init__(self, msg):
+        self._frames = np.frombuffer(msg.frames, dtype="<f8").reshape(-1, 3, 3)
+        self._transformations = np.frombuffer(msg.transformations, dtype="<f8").reshape(-1, 4, 4)
+        self._points = np.frombuffer(msg.polyline_points, dtype="<f8").reshape(-1, 3)
+        self._offsets = np.concatenate(([0], np.cumsum(np.asarray(msg.polyline_lengths, dtype=np.int64))))
+
+    def frame(self, index):
+        return Frame(*self._frames[index].tolist())
+
+    def transformation(self, index):
+        return Transformation.from_matrix(self._transformations[index].tolist())
+
+    def polyline(self, index):
+        return Polyline(self._points[self._offsets[index] : self._offsets[index + 1]].tolist())
+
+
+@_contextlib.contextmanager
+def _geometry_columns(columns):
+    previous = getattr(_CONTEXT, "columns", None)
+    _CONTEXT.columns = columns
+    try:
+        yield columns
+    finally:
+        _CONTEXT.columns = previous
+
+
+def _column_ref(field):
+    """The `<field>_ref` companion of a frame, transformation or polyline field, if it has one."""
+    if field.type != FieldDescriptor.TYPE_MESSAGE or field.is_repeated or field.message_type.full_name not in _COLUMNS:
+        return None
+    return field.containing_type.fields_by_name.get(field.name + "_ref")
+
+
+def _is_column_ref(field):
+    """True for the `<field>_ref` fields themselves, which are not ``__data__`` keys."""
+    name = field.name
+    if not name.endswith("_ref"):
+        return False
+    return _column_ref(field.containing_type.fields_by_name.get(name[:-4], field)) is field
+
+
+def _is_scalar(field):
+    return field.type != FieldDescriptor.TYPE_MESSAGE and not field.is_repeated
+
+
 def _is_map(field):
     return field.type == FieldDescriptor.TYPE_MESSAGE and field.message_type.GetOptions().map_entry
 
@@ -247,105 +452,244 @@ def _is_map(field):
 # ---------------------------------------------------------------------------
 # generic field codec
 # ---------------------------------------------------------------------------
+#
+# How a field is converted depends only on its descriptor, yet working that out
+# -- map or not, repeated or not, which message type -- took longer per value
+# than the conversion itself. So every field gets an encoder and a decoder
+# closure specialized for it, compiled on first use and cached per descriptor,
+# and `register` compiles the plan of a message once, when the class is
+# registered. _field_to_pb / _field_from_pb stay as the entry points for the
+# hand-written codecs further down.
+
+_ENCODERS = {}  # FieldDescriptor -> encode(msg, value)
+_DECODERS = {}  # FieldDescriptor -> decode(msg) -> value
 
 
 def _field_to_pb(msg, field, value):
+    _encoder(field)(msg, value)
+
+
+def _field_from_pb(msg, field):
+    return _decoder(field)(msg)
+
+
+def _encoder(field):
+    encode = _ENCODERS.get(field)
+    if encode is None:
+        encode = _ENCODERS[field] = _compile_encoder(field)
+    return encode
+
+
+def _decoder(field):
+    decode = _DECODERS.get(field)
+    if decode is None:
+        decode = _DECODERS[field] = _compile_decoder(field)
+    return decode
+
+
+def _item_to_pb(descriptor):
+    """The converter of one value of a message-typed field, by the field's message type."""
+    tname = descriptor.full_name
+    if tname == _GUID:
+        return _guid_to_pb
+    if tname == _ANY:
+        return any_to_pb
+    if tname in _STRUCTS:
+        return _STRUCTS[tname][0]
+    if tname in _GEOMETRY:
+        cls, to_pb_fn, _ = _GEOMETRY[tname]
+
+        def geometry_to_pb(value):
+            # a few __data__ implementations store `obj.__data__` rather than obj
+            if isinstance(value, dict):
+                value = cls.__from_data__(value)
+            return to_pb_fn(value)
+
+        return geometry_to_pb
+    return lambda value: _wrap(descriptor, value)
+
+
+def _item_from_pb(descriptor):
+    tname = descriptor.full_name
+    if tname == _GUID:
+        return _guid_from_pb
+    if tname == _ANY:
+        return any_from_pb
+    if tname in _STRUCTS:
+        return _STRUCTS[tname][1]
+    if tname in _GEOMETRY:
+        return _GEOMETRY[tname][2]
+    return _unwrap
+
+
+def _compile_encoder(field):
     name = field.name
-    if value is None:
-        return
+
     if _is_map(field):
         vfield = field.message_type.fields_by_name["value"]
-        target = getattr(msg, name)
-        for k, v in dict(value).items():
-            if vfield.type == FieldDescriptor.TYPE_MESSAGE and vfield.message_type.full_name == _ANY:
-                target[k].CopyFrom(any_to_pb(v))
-            else:
+        if vfield.type == FieldDescriptor.TYPE_MESSAGE and vfield.message_type.full_name == _ANY:
+
+            def encode_any_map(msg, value):
+                if value is None:
+                    return
+                target = getattr(msg, name)
+                for k, v in dict(value).items():
+                    target[k].CopyFrom(any_to_pb(v))
+
+            return encode_any_map
+
+        def encode_map(msg, value):
+            if value is None:
+                return
+            target = getattr(msg, name)
+            for k, v in dict(value).items():
                 target[k] = v
-        return
 
-    repeated = field.is_repeated
-    if repeated and isinstance(value, dict):
-        # compas_model keeps elements / materials / joints in guid-keyed dicts
-        value = list(value.values())
+        return encode_map
+
     if field.type != FieldDescriptor.TYPE_MESSAGE:
-        if repeated:
-            getattr(msg, name).extend(list(value))
-        else:
-            setattr(msg, name, value)
-        return
+        if field.is_repeated:
 
-    tname = field.message_type.full_name
-    if repeated:
-        target = getattr(msg, name)
-        for item in value:
-            if tname == _GUID:
-                target.add().CopyFrom(_guid_to_pb(item))
-            elif tname == _ANY:
-                target.add().CopyFrom(any_to_pb(item))
-            elif tname in _STRUCTS:
-                target.add().CopyFrom(_STRUCTS[tname][0](item))
-            elif tname in _GEOMETRY:
-                target.add().CopyFrom(_GEOMETRY[tname][1](item))
-            else:
-                target.add().CopyFrom(_wrap(field.message_type, item))
-        return
+            def encode_scalars(msg, value):
+                if value is None:
+                    return
+                # compas_model keeps elements / materials / joints in guid-keyed dicts
+                getattr(msg, name).extend(list(value.values()) if isinstance(value, dict) else list(value))
+
+            return encode_scalars
+
+        def encode_scalar(msg, value):
+            if value is not None:
+                setattr(msg, name, value)
+
+        return encode_scalar
+
+    ref = _column_ref(field)
+    if ref is not None:
+        return _compile_column_encoder(field, ref)
+
+    descriptor = field.message_type
+    tname = descriptor.full_name
+    # anything that is not a guid, Any, struct or geometry is a registered message,
+    # possibly behind a oneof wrapper; those are serialized in place
+    wrapped = tname not in (_ANY, _GUID) and tname not in _STRUCTS and tname not in _GEOMETRY
+    if field.is_repeated:
+        if tname == _GUID:
+
+            def encode_guids(msg, value):
+                if value is None:
+                    return
+                target = getattr(msg, name)
+                for item in value.values() if isinstance(value, dict) else value:
+                    _guid_into(target.add(), item)
+
+            return encode_guids
+
+        if wrapped:
+
+            def encode_wrapped(msg, value):
+                if value is None:
+                    return
+                target = getattr(msg, name)
+                for item in value.values() if isinstance(value, dict) else value:
+                    _wrap_into(target.add(), descriptor, item)
+
+            return encode_wrapped
+
+        convert = _item_to_pb(descriptor)
+
+        def encode_messages(msg, value):
+            if value is None:
+                return
+            getattr(msg, name).extend([convert(item) for item in (value.values() if isinstance(value, dict) else value)])
+
+        return encode_messages
 
     if tname == _GUID:
-        getattr(msg, name).CopyFrom(_guid_to_pb(value))
-    elif tname == _ANY:
-        getattr(msg, name).CopyFrom(any_to_pb(value))
-    elif tname in _STRUCTS:
-        getattr(msg, name).CopyFrom(_STRUCTS[tname][0](value))
-    elif tname in _GEOMETRY:
-        cls, to_pb_fn, _ = _GEOMETRY[tname]
-        # a few __data__ implementations store `obj.__data__` rather than obj
-        if isinstance(value, dict):
-            value = cls.__from_data__(value)
-        getattr(msg, name).CopyFrom(to_pb_fn(value))
-    else:
-        getattr(msg, name).CopyFrom(_wrap(field.message_type, value))
 
+        def encode_guid(msg, value):
+            if value is not None:
+                _guid_into(getattr(msg, name), value)
 
-def _field_from_pb(msg, field):
+        return encode_guid
+
+    if wrapped:
+
+        def encode_wrapped_message(msg, value):
+            if value is not None:
+                _wrap_into(getattr(msg, name), descriptor, value)
+
+        return encode_wrapped_message
+
+    convert = _item_to_pb(descriptor)
+
+    def encode_message(msg, value):
+        if value is not None:
+            getattr(msg, name).CopyFrom(convert(value))
+
+    return encode_message
+
+
+def _compile_decoder(field):
     name = field.name
+
     if _is_map(field):
         vfield = field.message_type.fields_by_name["value"]
-        raw = getattr(msg, name)
         if vfield.type == FieldDescriptor.TYPE_MESSAGE and vfield.message_type.full_name == _ANY:
-            return {k: any_from_pb(v) for k, v in raw.items()}
-        return dict(raw)
+            return lambda msg: {k: any_from_pb(v) for k, v in getattr(msg, name).items()}
+        return lambda msg: dict(getattr(msg, name))
 
-    repeated = field.is_repeated
     if field.type != FieldDescriptor.TYPE_MESSAGE:
-        if repeated:
-            return list(getattr(msg, name))
-        return getattr(msg, name) if (not field.has_presence or msg.HasField(name)) else None
+        if field.is_repeated:
+            return lambda msg: list(getattr(msg, name))
+        if field.has_presence:
+            return lambda msg: getattr(msg, name) if msg.HasField(name) else None
+        return lambda msg: getattr(msg, name)
+
+    ref = _column_ref(field)
+    if ref is not None:
+        return _compile_column_decoder(field, ref)
+
+    convert = _item_from_pb(field.message_type)
+    if field.is_repeated:
+        return lambda msg: [convert(item) for item in getattr(msg, name)]
+    return lambda msg: convert(getattr(msg, name)) if msg.HasField(name) else None
+
+
+def _compile_column_encoder(field, ref):
+    name, ref_name = field.name, ref.name
+    cls, to_pb_fn, _ = _GEOMETRY[field.message_type.full_name]
+    add = "add_" + _COLUMNS[field.message_type.full_name]
+
+    def encode_column(msg, value):
+        if value is None:
+            return
+        if isinstance(value, dict):
+            value = cls.__from_data__(value)
+        columns = getattr(_CONTEXT, "columns", None)
+        if columns is None or value._name is not None:
+            # a column has no room for the name, and outside a model there are no columns
+            getattr(msg, name).CopyFrom(to_pb_fn(value))
+            return
+        setattr(msg, ref_name, getattr(columns, add)(value))
 
-    tname = field.message_type.full_name
-    if repeated:
-        items = getattr(msg, name)
-        if tname == _GUID:
-            return [_guid_from_pb(i) for i in items]
-        if tname == _ANY:
-            return [any_from_pb(i) for i in items]
-        if tname in _STRUCTS:
-            return [_STRUCTS[tname][1](i) for i in items]
-        if tname in _GEOMETRY:
-            return [_GEOMETRY[tname][2](i) for i in items]
-        return [_unwrap(i) for i in items]
-
-    if not msg.HasField(name):
-        return None
-    sub = getattr(msg, name)
-    if tname == _GUID:
-        return _guid_from_pb(sub)
-    if tname == _ANY:
-        return any_from_pb(sub)
-    if tname in _STRUCTS:
-        return _STRUCTS[tname][1](sub)
-    if tname in _GEOMETRY:
-        return _GEOMETRY[tname][2](sub)
-    return _unwrap(sub)
+    return encode_column
+
+
+def _compile_column_decoder(field, ref):
+    name, ref_name = field.name, ref.name
+    from_pb_fn = _GEOMETRY[field.message_type.full_name][2]
+    kind = _COLUMNS[field.message_type.full_name]
+
+    def decode_column(msg):
+        if msg.HasField(ref_name):
+            columns = getattr(_CONTEXT, "columns", None)
+            if columns is None:
+                raise ValueError("{} references the geometry columns, but none are in scope".format(field.full_name))
+            return getattr(columns, kind)(getattr(msg, ref_name))
+        return from_pb_fn(getattr(msg, name)) if msg.HasField(name) else None
+
+    return decode_column
 
 
 # ---------------------------------------------------------------------------
@@ -354,32 +698,48 @@ def _field_from_pb(msg, field):
 
 _WRAPPERS = {}  # wrapper message full_name -> wrapper message class
 _CLASSES = {}  # concrete message full_name -> the compas class it stands for
+_ARMS = {}  # wrapper message full_name -> {concrete message full_name: field name}
+_ONEOFS = {}  # wrapper message full_name -> name of its oneof
 
 
 def _wrap(descriptor, obj):
     """Put ``obj`` into a wrapper message if the target field is a oneof wrapper."""
     wrapper_cls = _WRAPPERS.get(descriptor.full_name)
+    if wrapper_cls is None:
+        return _nested_to_pb(_from_dict(descriptor, obj))
+    wrapper = wrapper_cls()
+    _wrap_into(wrapper, descriptor, obj)
+    return wrapper
+
+
+def _wrap_into(target, descriptor, obj):
+    """Like _wrap, but serializes into ``target``, a message of type ``descriptor``, copying the serialized object once."""
+    inner = _nested_to_pb(_from_dict(descriptor, obj))
+    arms = _ARMS.get(descriptor.full_name)
+    if arms is None:
+        target.CopyFrom(inner)
+        return
+    arm = arms.get(inner.DESCRIPTOR.full_name)
+    if arm is None:
+        raise TypeError("{} cannot hold a {}".format(descriptor.full_name, inner.DESCRIPTOR.full_name))
+    getattr(target, arm).CopyFrom(inner)
+
+
+def _from_dict(descriptor, obj):
     if isinstance(obj, dict):
         # a few __data__ implementations store `child.__data__` rather than the
         # child itself (PlateFastener does this with its interfaces)
         cls = _CLASSES.get(descriptor.full_name)
         if cls is None:
             raise TypeError("{} was given a dict but no class is registered for it".format(descriptor.full_name))
-        obj = cls.__from_data__(obj)
-    inner = _nested_to_pb(obj)
-    if wrapper_cls is None:
-        return inner
-    wrapper = wrapper_cls()
-    for f in descriptor.fields:
-        if f.message_type is not None and f.message_type.full_name == inner.DESCRIPTOR.full_name:
-            getattr(wrapper, f.name).CopyFrom(inner)
-            return wrapper
-    raise TypeError("{} cannot hold a {}".format(descriptor.full_name, inner.DESCRIPTOR.full_name))
+        return cls.__from_data__(obj)
+    return obj
 
 
 def _unwrap(msg):
-    if msg.DESCRIPTOR.full_name in _WRAPPERS:
-        which = msg.WhichOneof(msg.DESCRIPTOR.oneofs[0].name)
+    oneof = _ONEOFS.get(msg.DESCRIPTOR.full_name)
+    if oneof is not None:
+        which = msg.WhichOneof(oneof)
         if which is None:
             return None
         return _nested_from_pb(getattr(msg, which))
@@ -388,7 +748,14 @@ def _unwrap(msg):
 
 def register_wrapper(msg_cls):
     """Register a message whose only content is a oneof over concrete messages."""
-    _WRAPPERS[msg_cls.DESCRIPTOR.full_name] = msg_cls
+    descriptor = msg_cls.DESCRIPTOR
+    _WRAPPERS[descriptor.full_name] = msg_cls
+    arms = {}
+    for f in descriptor.fields:
+        if f.message_type is not None:
+            arms.setdefault(f.message_type.full_name, f.name)
+    _ARMS[descriptor.full_name] = arms
+    _ONEOFS[descriptor.full_name] = descriptor.oneofs[0].name
     return msg_cls
 
 
@@ -397,7 +764,27 @@ def register_wrapper(msg_cls):
 # ---------------------------------------------------------------------------
 
 
-def register(cls, msg_cls, aliases=None, from_data=None, catchall="attributes", name_in_data=False, raw_dict_fields=(), guid_dict_fields=()):
+def _as_raw_dicts(decode):
+    """__from_data__ expects the child's __data__ dict, not the child."""
+
+    def decode_raw(msg):
+        value = decode(msg)
+        if value is None:
+            return None
+        return [v.__data__ for v in value] if isinstance(value, list) else value.__data__
+
+    return decode_raw
+
+
+def _as_guid_dict(decode):
+    def decode_guid_dict(msg):
+        value = decode(msg)
+        return None if value is None else {str(item.guid): item for item in value}
+
+    return decode_guid_dict
+
+
+def register(cls, msg_cls, aliases=None, from_data=None, catchall="attributes", name_in_data=False, raw_dict_fields=(), guid_dict_fields=(), to_data=None):
     """Register a serializer/deserializer pair for ``cls`` <-> ``msg_cls``.
 
     Parameters
@@ -411,67 +798,67 @@ def register(cls, msg_cls, aliases=None, from_data=None, catchall="attributes",
         few places where the two differ.
     from_data : callable, optional
         Overrides ``cls.__from_data__`` when rebuilding the object.
+    to_data : callable, optional
+        Overrides ``obj.__data__`` when encoding the object. Takes the object and returns its data dict.
     """
     aliases = aliases or {}
-    fields = [f for f in msg_cls.DESCRIPTOR.fields if f.name not in ("guid", "name")]
-    catch = catchall if catchall and any(f.name == catchall for f in fields) else None
+    fields = [f for f in msg_cls.DESCRIPTOR.fields if f.name not in ("guid", "name") and not _is_column_ref(f)]
+    catch = next((f for f in fields if f.name == catchall), None) if catchall else None
     known = {aliases.get(f.name, f.name) for f in fields}
-    known.discard(catch)
+    if catch is not None:
+        known.discard(catch.name)
     if name_in_data:
         # a genuine __data__ key, handled via the envelope rather than the
         # catch-all; otherwise `name` is just another kwarg in `attributes`.
         known.add("name")
 
-    def to_pb(obj, _msg_cls=msg_cls, _fields=fields, _aliases=aliases, _catch=catch, _known=known):
-        msg = _msg_cls()
-        msg.guid.CopyFrom(_guid_to_pb(obj.guid))
+    # the plan: per field, the __data__ key it maps to and its compiled codec
+    # singular scalars go to the message constructor in one call, the rest through their encoders
+    scalars = [(aliases.get(f.name, f.name), f.name) for f in fields if f is not catch and _is_scalar(f)]
+    plan = [(aliases.get(f.name, f.name), _encoder(f)) for f in fields if f is not catch and not _is_scalar(f)]
+    catch_encoder = _encoder(catch) if catch is not None else None
+    decoders = []
+    for f in fields:
+        if f is catch:
+            continue
+        decode = _decoder(f)
+        if f.name in raw_dict_fields:
+            decode = _as_raw_dicts(decode)
+        if f.name in guid_dict_fields:
+            decode = _as_guid_dict(decode)
+        decoders.append((aliases.get(f.name, f.name), decode))
+    catch_decoder = _decoder(catch) if catch is not None else None
+
+    def to_pb(obj):
+        data = obj.__data__ if to_data is None else to_data(obj)
+        values = {name: data.get(key) for key, name in scalars}
+        msg = msg_cls(**{name: value for name, value in values.items() if value is not None})
+        _guid_into(msg.guid, obj.guid)
         # `obj.name` falls back to the class name when unset; `_name` is the
         # raw value, so an unnamed object stays unnamed across a round-trip.
         if getattr(obj, "_name", None) is not None:
             msg.name = obj._name
-        data = obj.__data__
-        for f in _fields:
-            if f.name == _catch:
-                # classes that do `data.update(self.attributes)` merge unknown
-                # keys straight into __data__; everything unaccounted for is one
-                # of those and belongs in the catch-all map.
-                _field_to_pb(msg, f, {k: v for k, v in data.items() if k not in _known})
-            else:
-                _field_to_pb(msg, f, data.get(_aliases.get(f.name, f.name)))
+        for key, encode in plan:
+            encode(msg, data.get(key))
+        if catch_encoder is not None:
+            # classes that do `data.update(self.attributes)` merge unknown
+            # keys straight into __data__; everything unaccounted for is one
+            # of those and belongs in the catch-all map.
+            catch_encoder(msg, {k: v for k, v in data.items() if k not in known})
         return msg
 
-    def from_pb(
-        msg,
-        _cls=cls,
-        _fields=fields,
-        _aliases=aliases,
-        _from_data=from_data,
-        _catch=catch,
-        _name_in_data=name_in_data,
-        _raw_dicts=raw_dict_fields,
-        _guid_dicts=guid_dict_fields,
-    ):
-        data = {}
-        extras = {}
-        for f in _fields:
-            value = _field_from_pb(msg, f)
-            if f.name in _raw_dicts and value is not None:
-                # __from_data__ expects the child's __data__ dict, not the child
-                value = [v.__data__ for v in value] if isinstance(value, list) else value.__data__
-            if f.name in _guid_dicts and value is not None:
-                value = {str(item.guid): item for item in value}
-            if f.name == _catch:
-                extras = value or {}
-            else:
-                data[_aliases.get(f.name, f.name)] = value
-        data.update(extras)
-        if _name_in_data:
+    builder = from_data or cls.__from_data__
+
+    def from_pb(msg):
+        data = {key: decode(msg) for key, decode in decoders}
+        if catch_decoder is not None:
+            data.update(catch_decoder(msg) or {})
+        if name_in_data:
             # pass the name explicitly, None included, so a constructor default
             # cannot substitute a name onto an object that had none
             data["name"] = msg.name if msg.HasField("name") else None
-        builder = _from_data or _cls.__from_data__
         obj = builder(data)
-        obj._guid = _guid_from_pb(msg.guid)
+        obj._guid = _uuid_from_pb(msg.guid)
         if msg.HasField("name"):
             obj.name = msg.name
         return obj
@@ -544,7 +931,7 @@ def _freecontour_from_pb(msg):
     which = msg.WhichOneof("contour_param_object")
     data["contour_param_object"] = _nested_from_pb(getattr(msg, which)) if which else None
     obj = _fab.FreeContour.__from_data__(data)
-    obj._guid = _guid_from_pb(msg.guid)
+    obj._guid = _uuid_from_pb(msg.guid)
     if msg.HasField("name"):
         obj.name = msg.name
     return obj
@@ -571,7 +958,7 @@ def _btlxdef_to_pb(obj):
 
 def _btlxdef_from_pb(msg):
     obj = _fab.BTLxFromGeometryDefinition(getattr(_fab, msg.processing_name), [any_from_pb(g) for g in msg.geometries], [], **{k: any_from_pb(v) for k, v in msg.kwargs.items()})
-    obj._guid = _guid_from_pb(msg.guid)
+    obj._guid = _uuid_from_pb(msg.guid)
     if msg.HasField("name"):
         obj.name = msg.name
     return obj
@@ -601,7 +988,34 @@ from compas_timber import elements as _el  # noqa: E402
 register(_el.PlateGeometry, elements_pb2.PlateGeometryData)
 register(_el.LayerDefinition, elements_pb2.LayerDefinitionData, name_in_data=True)
 register(_el.LayerStructure, elements_pb2.LayerStructureData)
-register(_el.Beam, elements_pb2.BeamData)
+
+
+def _frame_from_transformation(transformation):
+    """``Frame.from_transformation(transformation)``, read straight off the matrix if it only rotates and translates.
+
+    Decomposing the matrix into scale, shear, rotation and translation is what most of the time of encoding a beam
+    went into. If the 3x3 block is orthonormal and does not mirror, its columns are the axes of the frame.
+
+    """
+    m = transformation.matrix
+    x = [m[0][0], m[1][0], m[2][0]]
+    y = [m[0][1], m[1][1], m[2][1]]
+    z = [m[0][2], m[1][2], m[2][2]]
+    gram = (dot_vectors(x, x) - 1.0, dot_vectors(y, y) - 1.0, dot_vectors(z, z) - 1.0, dot_vectors(x, y), dot_vectors(y, z), dot_vectors(z, x))
+    if m[3] == [0.0, 0.0, 0.0, 1.0] and all(abs(value) < 1e-9 for value in gram) and dot_vectors(cross_vectors(x, y), z) > 0:
+        return Frame([m[0][3], m[1][3], m[2][3]], x, y)
+    return Frame.from_transformation(transformation)
+
+
+def _beam_data(beam):
+    # Beam.__data__, except for the frame: compas_model derives `beam.frame` with Frame.from_transformation
+    data = {"frame": _frame_from_transformation(beam.modeltransformation), "length": beam.length, "width": beam.width, "height": beam.height}
+    data["features"] = [f for f in beam.features if not f.is_joinery]
+    data.update(beam.attributes)
+    return data
+
+
+register(_el.Beam, elements_pb2.BeamData, to_data=_beam_data)
 register(_el.Plate, elements_pb2.PlateData)
 register(_el.Panel, elements_pb2.PanelData)
 register(_el.FastenerTimberInterface, elements_pb2.FastenerTimberInterfaceData, aliases={"element_guid": "element"})
@@ -634,7 +1048,7 @@ def _layer_from_pb(msg):
         "name": msg.name if msg.HasField("name") else None,
     }
     obj = _el.Layer.__from_data__(data)
-    obj._guid = _guid_from_pb(msg.guid)
+    obj._guid = _uuid_from_pb(msg.guid)
     return obj
 
 
@@ -708,7 +1122,7 @@ def _segment_from_pb(msg):
     }
     data.update({k: any_from_pb(v) for k, v in msg.attributes.items()})
     obj = StructuralSegment.__from_data__(data)
-    obj._guid = _guid_from_pb(msg.guid)
+    obj._guid = _uuid_from_pb(msg.guid)
     if msg.HasField("name"):
         obj.name = msg.name
     return obj
@@ -750,6 +1164,7 @@ from compas_model.materials import Material as _Material  # noqa: E402
 from compas_model.materials import Steel as _Steel  # noqa: E402
 from compas_model.materials import Timber as _Timber  # noqa: E402
 
+from compas_timber.geometry import GeometryBackend  # noqa: E402
 from compas_timber.model import TimberModel  # noqa: E402
 
 # Subclasses first: SerializerRegistry resolves along the MRO, so a bare
@@ -961,25 +1376,35 @@ def _graph_from_pb(msg):
 _MODEL_FIELDS = ("transformation", "elements", "materials", "joints")
 
 
-def _model_to_pb(obj):
+def _shared_guids(model):
+    """The guids a model's table is filled with before anything is encoded, in table order."""
+    guids = [model.guid]
+    for items in (model._elements, model._materials, model._joints):
+        guids.extend(item.guid for item in items.values())
+    return guids
+
+
+def _model_to_pb(obj, fields=_MODEL_FIELDS):
+    # `fields` lets the parallel encoder leave out the elements and joints, which it adds itself
     msg = model_pb2.TimberModelData()
-    with _guid_table() as table:
+    with _guid_table(_shared_guids(obj), frozen=True) as table, _geometry_columns(_ColumnWriter()) as columns:
         msg.guid.CopyFrom(_guid_to_pb(obj.guid))
         if getattr(obj, "_name", None) is not None:
             msg.name = obj._name
         data = obj.__data__
-        for name in _MODEL_FIELDS:
+        for name in fields:
             field = model_pb2.TimberModelData.DESCRIPTOR.fields_by_name[name]
             _field_to_pb(msg, field, data.get(name))
         msg.tree.CopyFrom(_tree_to_pb(data["tree"]))
         msg.graph.CopyFrom(_graph_to_pb(data["graph"]))
-        # last: the table is only complete once everything above has interned
-        msg.guid_table.extend(_pack_guid_table(table))
+        msg.guid_table = _pack_guid_table(table)
+        columns.fill(msg.columns)
+    _model_settings_to_pb(obj, msg)
     return msg
 
 
 def _model_from_pb(msg):
-    with _guid_table(_unpack_guid_table(msg.guid_table)):
+    with _guid_table(packed=msg.guid_table), _geometry_columns(_ColumnReader(msg.columns)):
         data = {}
         for name in _MODEL_FIELDS:
             field = model_pb2.TimberModelData.DESCRIPTOR.fields_by_name[name]
@@ -990,11 +1415,28 @@ def _model_from_pb(msg):
         data["tree"] = _tree_from_pb(msg.tree)
         data["graph"] = _graph_from_pb(msg.graph)
         obj = TimberModel.__from_data__(data)
-        obj._guid = _guid_from_pb(msg.guid)
+        obj._guid = _uuid_from_pb(msg.guid)
     if msg.HasField("name"):
         obj.name = msg.name
+    _model_settings_from_pb(msg, obj)
     return obj
 
 
+def _model_settings_to_pb(model, msg):
+    # the geometry settings of the model, in a TimberModelData or a model container header, only if not the defaults
+    if model.geometry_backend != GeometryBackend.BREP:
+        msg.geometry_backend = model.geometry_backend
+    if not model.instancing:
+        msg.instancing = False
+
+
+def _model_settings_from_pb(msg, model):
+    # unset for the defaults, and in messages written before the settings were stored
+    if msg.HasField("geometry_backend"):
+        model.geometry_backend = msg.geometry_backend
+    if msg.HasField("instancing"):
+        model.instancing = msg.instancing
+
+
 pb_serializer(TimberModel)(_model_to_pb)
 pb_deserializer(model_pb2.TimberModelData)(_model_from_pb)
@@ -0,0 +1,217 @@
+"""Deltas between two versions of a TimberModel.
+
+Syncing a model between services with ``pb_dump_bts`` sends the whole model for
+every revision, even when a single beam was moved. :func:`diff_models` compares
+two versions of a model and returns a ``ModelDeltaData`` (see ``delta.proto``)
+with the elements and joints that were added or removed and, for each element
+present in both, only the message fields that changed. :func:`patch_model`
+applies such a delta to the first version.
+
+Elements and joints are matched by guid, and compared as the messages their
+serializers produce, so a field differs exactly when it would differ after a
+protobuf round-trip. Like a round-trip, a patch does not carry joinery
+features: call ``process_joinery()`` on the patched model to regenerate them.
+"""
+
+from compas_timber.proto import connections_pb2
+from compas_timber.proto import delta_pb2
+from compas_timber.proto import elements_pb2
+from compas_timber.proto.conversions import _guid_from_pb
+from compas_timber.proto.conversions import _guid_into
+from compas_timber.proto.conversions import _guid_table
+from compas_timber.proto.conversions import _pack_guid_table
+from compas_timber.proto.conversions import _unwrap
+from compas_timber.proto.conversions import _wrap
+
+_ELEMENT_DATA = elements_pb2.ElementData.DESCRIPTOR
+_JOINT_DATA = connections_pb2.JointData.DESCRIPTOR
+
+
+def _parent_guid(element):
+    parent = element.parent
+    return str(parent.guid) if parent is not None else None
+
+
+def _changed_fields(old, new):
+    """Numbers of the fields that differ between two messages of the same type."""
+    old_fields = {field.number: value for field, value in old.ListFields()}
+    new_fields = {field.number: value for field, value in new.ListFields()}
+    return sorted(number for number in set(old_fields) | set(new_fields) if old_fields.get(number) != new_fields.get(number))
+
+
+# ---------------------------------------------------------------------------
+# diff
+# ---------------------------------------------------------------------------
+
+
+def diff_models(base, target):
+    """Computes the delta that turns one version of a model into another.
+
+    Parameters
+    ----------
+    base : :class:`~compas_timber.model.TimberModel`
+        The version the delta is applied to.
+    target : :class:`~compas_timber.model.TimberModel`
+        The version the delta leads to.
+
+    Returns
+    -------
+    :class:`compas_timber.proto.delta_pb2.ModelDeltaData`
+        The delta. Serialize it with ``SerializeToString()``; it is empty when the two versions do not differ.
+
+    Notes
+    -----
+    An element that moved to a different parent is removed and added again, together with its joints. The changed
+    fields of an element carry their guids in full rather than as indices into the guid table, they are copied from
+    the messages the two versions were compared with.
+
+    """
+    base_elements = base._elements
+    target_elements = target._elements
+
+    # parents come before their children, so a child of a moved element is seen after its parent
+    moved = set()
+    for guid, element in target_elements.items():
+        old = base_elements.get(guid)
+        if old is None:
+            continue
+        parent = _parent_guid(element)
+        if type(old) is not type(element) or parent != _parent_guid(old) or parent in moved:
+            moved.add(guid)
+
+    # elements are compared outside of a guid table, so the guids in the two messages are the guids themselves
+    changes = []
+    for guid, element in target_elements.items():
+        old = base_elements.get(guid)
+        if old is None or guid in moved:
+            continue
+        new_msg = _wrap(_ELEMENT_DATA, element)
+        arm = new_msg.WhichOneof("element")
+        inner = getattr(new_msg, arm)
+        fields = _changed_fields(getattr(_wrap(_ELEMENT_DATA, old), arm), inner)
+        if not fields:
+            continue
+        change = delta_pb2.ElementChangeData(fields=fields)
+        partial = getattr(change.element, arm)
+        partial.CopyFrom(inner)
+        for field in inner.DESCRIPTOR.fields:
+            if field.number not in fields and field.name != "guid":
+                partial.ClearField(field.name)
+        changes.append(change)
+
+    removed = [guid for guid in base_elements if guid not in target_elements or guid in moved]
+    added = [guid for guid in target_elements if guid not in base_elements or guid in moved]
+
+    # removing an element removes its joints, so the joints of moved elements are sent again
+    joints = []
+    for guid, joint in target._joints.items():
+        old = base._joints.get(guid)
+        if old is None or any(str(element.guid) in moved for element in joint.elements) or _wrap(_JOINT_DATA, old) != _wrap(_JOINT_DATA, joint):
+            joints.append(joint)
+
+    msg = delta_pb2.ModelDeltaData()
+    with _guid_table() as table:
+        for guid in added:
+            element = target_elements[guid]
+            msg.added_elements.add().CopyFrom(_wrap(_ELEMENT_DATA, element))
+            parent = _parent_guid(element)
+            ref = msg.added_parents.add()
+            if parent is not None:
+                _guid_into(ref, parent)
+        msg.changed_elements.extend(changes)
+        for guid in reversed(removed):
+            _guid_into(msg.removed_elements.add(), guid)
+        for joint in joints:
+            msg.joints.add().CopyFrom(_wrap(_JOINT_DATA, joint))
+        for guid in base._joints:
+            if guid not in target._joints:
+                _guid_into(msg.removed_joints.add(), guid)
+        msg.guid_table = _pack_guid_table(table)
+    return msg
+
+
+# ---------------------------------------------------------------------------
+# patch
+# ---------------------------------------------------------------------------
+
+
+def patch_model(model, delta):
+    """Applies a delta computed with :func:`diff_models` to a model, in place.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The version of the model the delta was computed against.
+    delta : :class:`compas_timber.proto.delta_pb2.ModelDeltaData` | bytes
+        The delta, or its serialized bytes.
+
+    Returns
+    -------
+    :class:`~compas_timber.model.TimberModel`
+        The patched model, ``model`` itself.
+
+    Raises
+    ------
+    KeyError
+        If the delta refers to an element that is not in the model.
+
+    """
+    if isinstance(delta, (bytes, bytearray, memoryview)):
+        delta = delta_pb2.ModelDeltaData.FromString(bytes(delta))
+
+    with _guid_table(packed=delta.guid_table):
+        joints = [_unwrap(msg) for msg in delta.joints]
+        for guid in [str(joint.guid) for joint in joints] + [_guid_from_pb(ref) for ref in delta.removed_joints]:
+            joint = model._joints.get(guid)
+            if joint is not None:
+                model.remove_joint(joint)
+
+        for ref in delta.removed_elements:
+            model.remove_element(model._elements[_guid_from_pb(ref)])
+
+        for msg, ref in zip(delta.added_elements, delta.added_parents):
+            parent = _guid_from_pb(ref)
+            model.add_element(_unwrap(msg), parent=model._elements[parent] if parent is not None else None)
+
+        for change in delta.changed_elements:
+            _replace_element(model, _patched(model, change))
+
+        for joint in joints:
+            joint.restore_elements_from_keys(model)
+            model.add_joint(joint)
+    return model
+
+
+def _patched(model, change):
+    """The element of a change, with the changed fields applied to the element of the model."""
+    arm = change.element.WhichOneof("element")
+    partial = getattr(change.element, arm)
+    msg = _wrap(_ELEMENT_DATA, model._elements[_guid_from_pb(partial.guid)])
+    if msg.WhichOneof("element") != arm:
+        raise TypeError("Cannot patch a {} with the changes of a {}".format(msg.WhichOneof("element"), arm))
+    inner = getattr(msg, arm)
+    fields = inner.DESCRIPTOR.fields_by_number
+    for number in change.fields:
+        inner.ClearField(fields[number].name)
+    inner.MergeFrom(partial)
+    return _unwrap(msg)
+
+
+def _replace_element(model, element):
+    """Puts ``element`` in the place of the model's element with the same guid, in the tree, graph and joints."""
+    guid = str(element.guid)
+    old = model._elements[guid]
+    model._elements[guid] = element
+    model._bvh = None
+    element.model = model
+    element.graphnode = old.graphnode
+    element.treenode = old.treenode
+    old.treenode.element = element
+    for interaction in model.get_interactions_for_element(element):
+        interaction.restore_elements_from_keys(model)
+
+
+__all__ = [
+    "diff_models",
+    "patch_model",
+]
@@ -0,0 +1,239 @@
+"""Encoding a TimberModel to protobuf in several processes.
+
+``pb_dump_bts(model)`` encodes the elements one after the other, on the thread
+that holds the model's guid table. :func:`dump_model_bts` encodes them, and the
+joints, in a pool of worker processes instead: the model's guid table is filled
+before anything is encoded (see ``conversions.py``), so every worker writes the
+same indices the serial encoder would. Each worker encodes a chunk of elements
+or joints into a ``TimberModelData`` of its own, with the geometry columns of
+just that chunk, and sends it back serialized. This process encodes the rest of
+the model meanwhile, then appends the chunks in order, moving their ``<field>_ref``
+indices past the columns of the chunks before them.
+
+Serialization is deterministic (sorted map entries), so the result does not
+depend on the number of workers or the chunk size, and is byte for byte what
+``pb_dump_bts(model)`` returns when serialized deterministically.
+"""
+
+import multiprocessing as _multiprocessing
+import os as _os
+import threading as _threading
+from concurrent.futures import ProcessPoolExecutor
+
+from compas.data import Data
+from compas.geometry import Geometry
+from compas.geometry import Transformation
+from compas_pb.core import _CURRENT_VERSION
+from compas_pb.generated import message_pb2
+from google.protobuf.descriptor import FieldDescriptor
+
+from compas_timber.proto import model_pb2
+from compas_timber.proto.conversions import _ANY
+from compas_timber.proto.conversions import _COLUMNS
+from compas_timber.proto.conversions import _ColumnWriter
+from compas_timber.proto.conversions import _field_to_pb
+from compas_timber.proto.conversions import _geometry_columns
+from compas_timber.proto.conversions import _guid_table
+from compas_timber.proto.conversions import _is_column_ref
+from compas_timber.proto.conversions import _is_map
+from compas_timber.proto.conversions import _model_to_pb
+from compas_timber.proto.conversions import _shared_guids
+from compas_timber.utils import _can_fork
+
+_MODEL_DATA = model_pb2.TimberModelData.DESCRIPTOR
+_CHUNKED = ("elements", "joints")
+
+# what the worker processes encode from: set before they are forked, so they
+# inherit the model rather than receive it pickled. One encoding at a time.
+_FORKED = None
+_FORK_LOCK = _threading.Lock()
+
+
+def _serialize(msg):
+    """The bytes ``pb_dump_bts`` would give for a TimberModelData, serialized deterministically."""
+    envelope = message_pb2.MessageData(version=_CURRENT_VERSION)
+    envelope.data.message.Pack(msg, deterministic=True)
+    return envelope.SerializeToString(deterministic=True)
+
+
+def _settle_guids(model):
+    """Gives every object reachable from the elements and joints its guid, so the workers do not each make one up.
+
+    A compas object draws a random guid the first time it is asked for one, a feature often only when it is encoded.
+    Asked in a worker, that guid would be lost with the worker, and differ from the one a later encoding writes.
+
+    """
+    seen = {id(model), id(model._tree), id(model._graph)}
+    stack = list(model._elements.values()) + list(model._joints.values())
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Data):
+            if id(value) in seen or isinstance(value, (Geometry, Transformation)):
+                continue
+            seen.add(id(value))
+            value.guid
+            stack.extend(vars(value).values())
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+
+def _encode_chunk(name, start, stop):
+    guids, items = _FORKED
+    msg = model_pb2.TimberModelData()
+    with _guid_table(guids, frozen=True), _geometry_columns(_ColumnWriter()) as columns:
+        _field_to_pb(msg, _MODEL_DATA.fields_by_name[name], items[name][start:stop])
+    columns.fill(msg.columns)
+    return msg.SerializeToString(deterministic=True)
+
+
+# ---------------------------------------------------------------------------
+# column refs
+# ---------------------------------------------------------------------------
+
+_PLANS = {}
+
+
+def _has_refs(descriptor, seen):
+    if descriptor.full_name in seen or descriptor.full_name == _ANY:
+        return False
+    seen.add(descriptor.full_name)
+    return any(_is_column_ref(field) or (field.type == FieldDescriptor.TYPE_MESSAGE and _has_refs(field.message_type, seen)) for field in descriptor.fields)
+
+
+def _ref_plan(descriptor):
+    """``(name, column, mode)`` for each column ref of a message type and each message field that can lead to one.
+
+    ``column`` is the column a ref indexes, None for a message field. ``mode`` tells how to get at the messages of a
+    message field: "singular", "repeated" or "map".
+
+    """
+    plan = _PLANS.get(descriptor.full_name)
+    if plan is not None:
+        return plan
+    plan = []
+    for field in descriptor.fields:
+        if _is_column_ref(field):
+            value = field.containing_type.fields_by_name[field.name[:-4]]
+            plan.append((field.name, _COLUMNS[value.message_type.full_name], None))
+        elif field.type != FieldDescriptor.TYPE_MESSAGE:
+            continue
+        elif _is_map(field):
+            if _has_refs(field.message_type.fields_by_name["value"].message_type, set()):
+                plan.append((field.name, None, "map"))
+        elif _has_refs(field.message_type, set()):
+            plan.append((field.name, None, "repeated" if field.is_repeated else "singular"))
+    _PLANS[descriptor.full_name] = plan
+    return plan
+
+
+def _shift_refs(msg, offsets, counts):
+    """Adds ``offsets[column]`` to every column ref in ``msg`` and its descendants, and counts them in ``counts``."""
+    for name, column, mode in _ref_plan(msg.DESCRIPTOR):
+        if column is not None:
+            if msg.HasField(name):
+                setattr(msg, name, getattr(msg, name) + offsets[column])
+                counts[column] += 1
+        elif mode == "singular":
+            if msg.HasField(name):
+                _shift_refs(getattr(msg, name), offsets, counts)
+        else:
+            values = getattr(msg, name)
+            for value in values.values() if mode == "map" else values:
+                _shift_refs(value, offsets, counts)
+
+
+def _column_counts(columns):
+    return {
+        "frame": len(columns.frames) // 72,
+        "transformation": len(columns.transformations) // 128,
+        "polyline": len(columns.polyline_lengths),
+    }
+
+
+# ---------------------------------------------------------------------------
+# encoding
+# ---------------------------------------------------------------------------
+
+
+def dump_model_bts(model, workers=None, chunk_size=256):
+    """Encodes a TimberModel to protobuf bytes, with the elements and joints encoded in worker processes.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to encode.
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs. With 1, the model is encoded in this process.
+    chunk_size : int, optional
+        The number of elements or joints a worker encodes at once. Defaults to 256.
+
+    Returns
+    -------
+    bytes
+        The encoded model. Read it with ``compas_pb.pb_load_bts``.
+
+    Notes
+    -----
+    The worker processes are forked, so they start from a copy of the model instead of receiving it pickled. Where
+    ``fork`` is not available (Windows), when there is just one chunk to encode, or when other threads are running in
+    this process, the model is encoded in this process. Forking a process with several threads can deadlock the workers
+    on locks held by the other threads, so from a thread pool, e.g. :func:`compas_timber.aio.run_in_executor`, the
+    model is always encoded serially.
+    The same happens, after the fact, when a chunk turns out to hold column refs inside an ``AnyData`` payload, which
+    cannot be moved without re-encoding it.
+
+    The bytes are the same whatever ``workers`` and ``chunk_size`` are.
+
+    """
+    if workers is None:
+        workers = _os.cpu_count() or 1
+    items = {"elements": list(model._elements.values()), "joints": list(model._joints.values())}
+    chunks = [(name, start, start + chunk_size) for name in _CHUNKED for start in range(0, len(items[name]), chunk_size)]
+    if workers < 2 or len(chunks) < 2 or not _can_fork():
+        return _serialize(_model_to_pb(model))
+
+    global _FORKED
+    with _FORK_LOCK:
+        _settle_guids(model)
+        _FORKED = (_shared_guids(model), items)
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=_multiprocessing.get_context("fork"))
+        try:
+            msg = _assemble(model, chunks, [executor.submit(_encode_chunk, *chunk) for chunk in chunks])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            _FORKED = None
+    if msg is None:
+        return _serialize(_model_to_pb(model))
+    return _serialize(msg)
+
+
+def _assemble(model, chunks, futures):
+    """The model's TimberModelData, with the chunks the workers encode. None if a chunk's refs could not be moved."""
+    msg = _model_to_pb(model, fields=("transformation", "materials"))
+    columns = {"frame": [], "transformation": [], "polyline": []}
+    offsets = _column_counts(msg.columns)
+    for (name, _, _), future in zip(chunks, futures):
+        chunk = model_pb2.TimberModelData.FromString(future.result())
+        added = _column_counts(chunk.columns)
+        counts = dict.fromkeys(offsets, 0)
+        for item in getattr(chunk, name):
+            _shift_refs(item, offsets, counts)
+        if counts != added:
+            return None
+        getattr(msg, name).extend(getattr(chunk, name))
+        columns["frame"].append(chunk.columns.frames)
+        columns["transformation"].append(chunk.columns.transformations)
+        columns["polyline"].append(chunk.columns.polyline_points)
+        msg.columns.polyline_lengths.extend(chunk.columns.polyline_lengths)
+        offsets = {column: offsets[column] + added[column] for column in offsets}
+    msg.columns.frames += b"".join(columns["frame"])
+    msg.columns.transformations += b"".join(columns["transformation"])
+    msg.columns.polyline_points += b"".join(columns["polyline"])
+    return msg
+
+
+__all__ = [
+    "dump_model_bts",
+]
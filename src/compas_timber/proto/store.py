@@ -0,0 +1,506 @@
+"""Memory-mapped on-disk store for a TimberModel.
+
+Loading a model, even from a container (see ``container.py``), means creating
+every element and feature of the part that is loaded. A store holds the same
+records as a container, followed by an index of them by guid and type (see
+``store.proto``). :class:`ModelStore` memory-maps the file and reads only the
+index when it is opened; it answers the queries of a ``TimberModel`` and
+decodes an element, or a joint, the first time it is asked for. The features
+of an element are decoded the first time they are accessed.
+"""
+
+import mmap as _mmap
+import struct as _struct
+import uuid as _uuid
+
+import numpy as np
+
+from compas_timber.model import TimberModel
+from compas_timber.proto import container_pb2
+from compas_timber.proto import elements_pb2
+from compas_timber.proto import store_pb2
+from compas_timber.proto.container import _decode_element
+from compas_timber.proto.container import _decode_joint
+from compas_timber.proto.container import _element_records
+from compas_timber.proto.container import _header_to_pb
+from compas_timber.proto.container import _joint_record
+from compas_timber.proto.container import _open
+from compas_timber.proto.container import _subclass_names
+from compas_timber.proto.container import _write_frame
+from compas_timber.proto.conversions import _field_from_pb
+from compas_timber.proto.conversions import _graph_from_pb
+from compas_timber.proto.conversions import _guid_str
+from compas_timber.proto.conversions import _guid_table
+from compas_timber.proto.conversions import _model_settings_from_pb
+from compas_timber.proto.conversions import _raw_guid
+from compas_timber.proto.conversions import _tree_from_pb
+
+MAGIC = b"CTMS"
+VERSION = 1
+
+_TRAILER = _struct.Struct("<Q4s")
+
+
+# ---------------------------------------------------------------------------
+# writing
+# ---------------------------------------------------------------------------
+
+
+def write_model_store(model, file_or_path):
+    """Writes a model into an on-disk model store, to be opened with :class:`ModelStore`.
+
+    Parameters
+    ----------
+    model : :class:`~compas_timber.model.TimberModel`
+        The model to write.
+    file_or_path : str | os.PathLike | file-like
+        The path of the file to write, or a binary stream to write to.
+
+    Returns
+    -------
+    int
+        The number of bytes written.
+
+    """
+    elements = list(model._elements.values())
+    positions = {str(element.guid): position for position, element in enumerate(elements)}
+    types = {}
+
+    index = store_pb2.ModelStoreIndexData(version=VERSION, model_guid=_raw_guid(model.guid))
+    if getattr(model, "_name", None) is not None:
+        index.name = model._name
+
+    with _open(file_or_path, "wb") as stream:
+        start = stream.tell()
+        stream.write(MAGIC)
+
+        def write(msg):
+            offset = stream.tell() - start
+            _write_frame(stream, msg)
+            return offset
+
+        index.header_offset = write(_header_to_pb(model))
+
+        element_types, element_offsets, feature_offsets, element_parents = [], [], [], []
+        for element in elements:
+            records = list(_element_records(element))
+            element_types.append(types.setdefault(type(element).__name__, len(types)))
+            element_offsets.append(write(records[0]))
+            feature_offsets.append(write(records[1]) if len(records) > 1 else 0)
+            parent = element.parent
+            element_parents.append(positions[str(parent.guid)] if parent is not None else -1)
+
+        joint_types, joint_offsets, joint_counts, joint_elements = [], [], [], []
+        for joint in model._joints.values():
+            joint_types.append(types.setdefault(type(joint).__name__, len(types)))
+            joint_offsets.append(write(_joint_record(joint)))
+            joint_counts.append(len(joint.elements))
+            joint_elements.extend(positions[str(element.guid)] for element in joint.elements)
+
+        index.types.extend(types)
+        index.element_guids = b"".join(_raw_guid(element.guid) for element in elements)
+        index.element_types = np.asarray(element_types, dtype="<u4").tobytes()
+        index.element_offsets = np.asarray(element_offsets, dtype="<u8").tobytes()
+        index.feature_offsets = np.asarray(feature_offsets, dtype="<u8").tobytes()
+        index.element_parents = np.asarray(element_parents, dtype="<i4").tobytes()
+        index.joint_guids = b"".join(_raw_guid(joint.guid) for joint in model._joints.values())
+        index.joint_types = np.asarray(joint_types, dtype="<u4").tobytes()
+        index.joint_offsets = np.asarray(joint_offsets, dtype="<u8").tobytes()
+        index.joint_element_counts = np.asarray(joint_counts, dtype="<u4").tobytes()
+        index.joint_elements = np.asarray(joint_elements, dtype="<u4").tobytes()
+
+        index_offset = write(index)
+        stream.write(_TRAILER.pack(index_offset, MAGIC))
+        return stream.tell() - start
+
+
+# ---------------------------------------------------------------------------
+# reading
+# ---------------------------------------------------------------------------
+
+
+def _decode_features(frame, guid_table):
+    msg = elements_pb2.ElementData.FromString(container_pb2.ModelRecordData.FromString(frame).payload)
+    inner = getattr(msg, msg.WhichOneof("element"))
+    with _guid_table(packed=guid_table):
+        return _field_from_pb(inner, inner.DESCRIPTOR.fields_by_name["features"]) or []
+
+
+class ModelStore(object):
+    """A model store written with :func:`write_model_store`, memory-mapped for reading.
+
+    Opening a store reads its index only. Elements and joints are decoded the first time they are asked for, and the
+    same object is returned from then on; the features of an element are decoded the first time they are accessed.
+    The elements do not belong to a model, so their ``parent`` is None, see :meth:`parent_of` instead.
+
+    The store implements the queries of :class:`~compas_timber.model.TimberModel`: :meth:`elements`,
+    :meth:`get_element`, ``store[guid]``, :meth:`has_element`, :meth:`find_all_elements_of_type`, :attr:`beams`,
+    :attr:`plates`, :attr:`panels`, :attr:`layers`, :attr:`fasteners`, :attr:`joints` and
+    :meth:`get_joints_for_element`. :meth:`load_model` creates an actual model from the store, or from a part of it.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        The path of the store file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a model store, or was written by a newer version.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._buffer = _mmap.mmap(self._file.fileno(), 0, access=_mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Not a compas_timber model store.")
+        try:
+            self._index = self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+        index = self._index
+        self._types = list(index.types)
+        self._element_types = np.frombuffer(index.element_types, dtype="<u4")
+        self._element_offsets = np.frombuffer(index.element_offsets, dtype="<u8")
+        self._feature_offsets = np.frombuffer(index.feature_offsets, dtype="<u8")
+        self._element_parents = np.frombuffer(index.element_parents, dtype="<i4")
+        self._joint_offsets = np.frombuffer(index.joint_offsets, dtype="<u8")
+        self._joint_elements = np.frombuffer(index.joint_elements, dtype="<u4")
+        # the joint of each entry in _joint_elements
+        self._joint_owners = np.repeat(np.arange(len(self._joint_offsets)), np.frombuffer(index.joint_element_counts, dtype="<u4"))
+        self._positions = None
+        self._header = None
+        self._hydrated = {}
+        self._hydrated_joints = {}
+
+    def _read_index(self):
+        buffer = self._buffer
+        if len(buffer) < len(MAGIC) + _TRAILER.size or buffer[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a compas_timber model store.")
+        offset, magic = _TRAILER.unpack_from(buffer, len(buffer) - _TRAILER.size)
+        if magic != MAGIC:
+            raise EOFError("The model store has no index, it was not written to the end.")
+        index = store_pb2.ModelStoreIndexData.FromString(self._frame(offset))
+        if index.version > VERSION:
+            raise ValueError("Model store version {} is not supported, expected {} or lower.".format(index.version, VERSION))
+        return index
+
+    def _frame(self, offset):
+        """The bytes of the frame at ``offset``, without its length."""
+        buffer = self._buffer
+        offset = int(offset)
+        length = shift = 0
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            length |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        return buffer[offset : offset + length]
+
+    def _record(self, offset):
+        return container_pb2.ModelRecordData.FromString(self._frame(offset))
+
+    def close(self):
+        """Closes the file. Elements and joints which were decoded stay usable."""
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._element_offsets)
+
+    # =============================================================================
+    # Model
+    # =============================================================================
+
+    @property
+    def guid(self):
+        return _guid_str(self._index.model_guid)
+
+    @property
+    def name(self):
+        return self._index.name if self._index.HasField("name") else None
+
+    @property
+    def header(self):
+        """:class:`~compas_timber.proto.container_pb2.ModelContainerHeaderData` : The model without its elements and joints."""
+        if self._header is None:
+            self._header = container_pb2.ModelContainerHeaderData.FromString(self._frame(self._index.header_offset))
+        return self._header
+
+    def _header_field(self, name):
+        header = self.header
+        with _guid_table(packed=header.guid_table):
+            return _field_from_pb(header, header.DESCRIPTOR.fields_by_name[name])
+
+    @property
+    def transformation(self):
+        return self._header_field("transformation")
+
+    def materials(self):
+        """Iterate over the materials of the model.
+
+        Returns
+        -------
+        Iterator[:class:`~compas_model.materials.Material`]
+
+        """
+        return iter(self._header_field("materials") or [])
+
+    # =============================================================================
+    # Elements
+    # =============================================================================
+
+    def _position(self, guid):
+        if self._positions is None:
+            guids = self._index.element_guids
+            self._positions = {guids[i : i + 16]: i // 16 for i in range(0, len(guids), 16)}
+        return self._positions.get(_raw_guid(guid))
+
+    def _element(self, position):
+        element = self._hydrated.get(position)
+        if element is None:
+            element = self._hydrated[position] = self._decode(position, lazy_features=True)
+        return element
+
+    def _decode(self, position, lazy_features=False, features=True):
+        record = self._record(self._element_offsets[position])
+        offset = self._feature_offsets[position]
+        if not offset or not features:
+            return _decode_element(record)
+        if not lazy_features:
+            return _decode_element(record, self._record(offset))
+        element = _decode_element(record)
+        if not hasattr(element, "defer_features"):
+            return _decode_element(record, self._record(offset))
+        # a copy of the record's bytes rather than the offset, so that the features can be decoded after close()
+        frame = self._frame(offset)
+        element.defer_features(lambda: _decode_features(frame, record.guid_table))
+        return element
+
+    def _select(self, guids=None, types=None):
+        """The positions of the selected elements, in record order."""
+        selected = np.arange(len(self))
+        if types is not None:
+            names = _subclass_names(types)
+            codes = [code for code, name in enumerate(self._types) if name in names]
+            selected = selected[np.isin(self._element_types, codes)]
+        if guids is not None:
+            positions = {self._position(guid) for guid in guids} - {None}
+            selected = selected[np.isin(selected, sorted(positions))]
+        return selected
+
+    def guids(self, types=None):
+        """The guids of the elements, without decoding them.
+
+        Parameters
+        ----------
+        types : list(type | str), optional
+            Only the elements of these types or their subclasses, given as classes or class names.
+
+        Returns
+        -------
+        list(str)
+
+        """
+        guids = self._index.element_guids
+        return [_guid_str(guids[16 * position : 16 * position + 16]) for position in self._select(types=types)]
+
+    def elements(self):
+        """Iterate over the elements of the model, decoding each of them when it is reached.
+
+        Returns
+        -------
+        Iterator[:class:`~compas_model.elements.Element`]
+
+        """
+        return (self._element(position) for position in range(len(self)))
+
+    def get_element(self, guid):
+        """Get an element by its unique identifier.
+
+        Parameters
+        ----------
+        guid : str | :class:`uuid.UUID`
+            The GUID of the element to retrieve.
+
+        Returns
+        -------
+        :class:`~compas_model.elements.Element` or None
+            The element with the specified GUID.
+            None if an element with this GUID is not in the store.
+
+        """
+        position = self._position(guid)
+        return self._element(position) if position is not None else None
+
+    def __getitem__(self, guid):
+        element = self.get_element(guid)
+        if element is None:
+            raise KeyError(guid)
+        return element
+
+    def has_element(self, element):
+        """Returns True if the store contains the given element, or an element with the given guid."""
+        return self._position(getattr(element, "guid", element)) is not None
+
+    def find_all_elements_of_type(self, elementtype):
+        """Find all elements of a given type, decoding only these.
+
+        Parameters
+        ----------
+        elementtype : type | str
+            The type of element, or the name of the class.
+
+        Returns
+        -------
+        list[:class:`~compas_model.elements.Element`]
+
+        """
+        return [self._element(position) for position in self._select(types=[elementtype])]
+
+    def parent_of(self, element):
+        """The parent of an element in the element tree of the model, None at the root."""
+        position = self._position(element.guid)
+        if position is None:
+            raise KeyError(element.guid)
+        parent = int(self._element_parents[position])
+        return self._element(parent) if parent >= 0 else None
+
+    @property
+    def beams(self):
+        return self.find_all_elements_of_type("Beam")
+
+    @property
+    def plates(self):
+        return self.find_all_elements_of_type("Plate")
+
+    @property
+    def panels(self):
+        return self.find_all_elements_of_type("Panel")
+
+    @property
+    def layers(self):
+        return self.find_all_elements_of_type("Layer")
+
+    @property
+    def fasteners(self):
+        return self.find_all_elements_of_type("Fastener")
+
+    # =============================================================================
+    # Joints
+    # =============================================================================
+
+    def _joint(self, position):
+        joint = self._hydrated_joints.get(position)
+        if joint is None:
+            joint = self._hydrated_joints[position] = _decode_joint(self._record(self._joint_offsets[position]))
+            joint.restore_elements_from_keys(self)
+        return joint
+
+    @property
+    def joints(self):
+        return [self._joint(position) for position in range(len(self._joint_offsets))]
+
+    def get_joints_for_element(self, element):
+        """The joints of an element, decoding only these.
+
+        Parameters
+        ----------
+        element : :class:`~compas_model.elements.Element`
+            The element.
+
+        Returns
+        -------
+        list[:class:`~compas_timber.connections.Joint`]
+
+        """
+        position = self._position(element.guid)
+        joints = self._joint_owners[self._joint_elements == position]
+        return [self._joint(joint) for joint in joints]
+
+    # =============================================================================
+    # Loading
+    # =============================================================================
+
+    def load_model(self, guids=None, types=None, features=True, joints=True):
+        """Creates a model from the store, or from a part of it.
+
+        The model has elements and joints of its own, not the ones :class:`ModelStore` returns. Without ``guids`` or
+        ``types`` the whole model is restored, as by ``pb_load_bts``. Otherwise, the model contains the selected
+        elements, with the parent relations among them, and the joints of which all elements were selected.
+
+        Parameters
+        ----------
+        guids : list(str | :class:`uuid.UUID`), optional
+            Only load the elements with these guids.
+        types : list(type | str), optional
+            Only load elements of these types or their subclasses, given as classes or class names.
+        features : bool, optional
+            If False, the elements are loaded without their features. Defaults to True.
+        joints : bool, optional
+            If False, no joints are loaded. Defaults to True.
+
+        Returns
+        -------
+        :class:`~compas_timber.model.TimberModel`
+
+        """
+        selected = self._select(guids, types)
+        elements = {position: self._decode(position, features=features) for position in selected.tolist()}
+        joint_positions = []
+        if joints:
+            loaded = np.isin(self._joint_elements, selected)
+            incomplete = set(self._joint_owners[~loaded].tolist())
+            joint_positions = [position for position in range(len(self._joint_offsets)) if position not in incomplete]
+        decoded_joints = [_decode_joint(self._record(self._joint_offsets[position])) for position in joint_positions]
+
+        if guids is None and types is None:
+            header = self.header
+            with _guid_table(packed=header.guid_table):
+                data = {
+                    "transformation": self.transformation,
+                    "elements": {str(element.guid): element for element in elements.values()},
+                    "materials": {str(material.guid): material for material in self.materials()},
+                    "tree": _tree_from_pb(header.tree),
+                    "graph": _graph_from_pb(header.graph),
+                    "joints": {str(joint.guid): joint for joint in decoded_joints},
+                }
+            model = TimberModel.__from_data__(data)
+        else:
+            model = TimberModel()
+            model._transformation = self.transformation
+            model._materials = {str(material.guid): material for material in self.materials()}
+            for position, element in elements.items():
+                parent = int(self._element_parents[position])
+                while parent >= 0 and parent not in elements:
+                    parent = int(self._element_parents[parent])
+                model.add_element(element, parent=elements[parent] if parent >= 0 else None)
+            for joint in decoded_joints:
+                joint.restore_elements_from_keys(model)
+                model.add_joint(joint)
+
+        model._guid = _uuid.UUID(bytes=self._index.model_guid)
+        if self.name is not None:
+            model.name = self.name
+        _model_settings_from_pb(self.header, model)
+        return model
+
+
+__all__ = [
+    "ModelStore",
+    "write_model_store",
+]
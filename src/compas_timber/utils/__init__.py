@@ -1,3 +1,6 @@
+import hashlib
+import multiprocessing
+import threading
 from math import fabs
 from typing import Optional
 
@@ -26,6 +29,7 @@ from compas.geometry import intersection_line_plane
 from compas.geometry import closest_point_on_segment
 from compas.geometry import intersection_segment_segment
 
+from compas.data import Data
 from compas.tolerance import TOL
 
 try:
@@ -912,6 +916,63 @@ def get_leaf_subclasses(cls):
     return subclasses
 
 
+def parametric_hash(value, precision=None):
+    """Returns a stable hash of (nested) parametric data.
+
+    Floats are rounded to `precision` decimals, so that values differing only by numerical noise hash the same.
+    COMPAS data objects are hashed by their type and `__data__`, dicts regardless of their key order.
+
+    Parameters
+    ----------
+    value : any
+        Numbers, strings, lists, tuples, dicts and :class:`~compas.data.Data` objects, in any nesting.
+    precision : int, optional
+        The number of decimals floats are rounded to. Defaults to `TOL.precision`.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest.
+
+    """
+    digest = hashlib.sha1()
+    _update_parametric_hash(digest, value, TOL.precision if precision is None else precision)
+    return digest.hexdigest()
+
+
+def _can_fork():
+    # a forked child gets a copy of every lock, held or not, but only the forking thread: a lock another thread of
+    # this process held (logging, the import lock, a C library's) can then never be released in the child
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def _update_parametric_hash(digest, value, precision):
+    if value is None or isinstance(value, (bool, str, int)):
+        digest.update("{}:{!r};".format(type(value).__name__, value).encode())
+    elif isinstance(value, float):
+        text = "{:.{}f}".format(value, precision)
+        if float(text) == 0.0:
+            text = "{:.{}f}".format(0.0, precision)  # no distinction between 0.0 and -0.0
+        digest.update("f:{};".format(text).encode())
+    elif isinstance(value, Data):
+        digest.update("{}(".format(type(value).__name__).encode())
+        _update_parametric_hash(digest, value.__data__, precision)
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=str):
+            digest.update("{}=".format(key).encode())
+            _update_parametric_hash(digest, value[key], precision)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_parametric_hash(digest, item, precision)
+        digest.update(b"]")
+    else:
+        digest.update("{}:{};".format(type(value).__name__, value).encode())
+
+
 __all__ = [
     "intersection_line_line_param",
     "intersection_line_beam_param",
@@ -935,6 +996,7 @@ __all__ = [
     "get_brep_loop_vertex_indices",
     "mesh_from_brep_simple",
     "get_leaf_subclasses",
+    "parametric_hash",
     "move_polyline_segment_to_line",
     "join_polyline_segments",
     "polyline_from_brep_loop",
@@ -0,0 +1,106 @@
+"""Representative objects for the serialization size and time budgets.
+
+Used by ``test_serialization_budgets.py`` and ``scripts/benchmark_serialization.py``.
+Everything is built from fixed coordinates, so the encoded sizes only change
+when a codec does.
+"""
+
+import math
+
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.geometry import Vector
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import FastenerTimberInterface
+from compas_timber.elements import LayerDefinition
+from compas_timber.elements import LayerStructure
+from compas_timber.elements import Panel
+from compas_timber.elements import PlateFastener
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+from compas_timber.panel_features import Opening
+from compas_timber.planning import BeamNester
+from compas_timber.planning import BeamStock
+from compas_timber.planning import SimpleSequenceGenerator
+
+
+def _rectangle(x, y, width, height):
+    return Polyline([Point(x, y, 0), Point(x + width, y, 0), Point(x + width, y + height, 0), Point(x, y + height, 0), Point(x, y, 0)])
+
+
+def frames(count):
+    """Rectangular frames of four beams each, with L-miter corners and a T-butt stud, the studs drilled."""
+    model = TimberModel()
+    for index in range(count):
+        x = index * 5000.0
+        corners = [Point(x, 0, 0), Point(x + 3000, 0, 0), Point(x + 3000, 2500, 0), Point(x, 2500, 0)]
+        beams = [Beam.from_centerline(Line(corners[i], corners[(i + 1) % 4]), width=100.0, height=200.0) for i in range(4)]
+        stud = Beam.from_centerline(Line(Point(x + 1500, 0, 0), Point(x + 1500, 2500, 0)), width=80.0, height=160.0)
+        for beam in beams + [stud]:
+            model.add_element(beam)
+        stud.add_features([Drilling(start_x=300.0 * (i + 1), diameter=12.0, depth=50.0, is_joinery=False) for i in range(3)])
+        for i in range(4):
+            LMiterJoint.create(model, beams[i], beams[(i + 1) % 4])
+        TButtJoint.create(model, stud, beams[0])
+    return model
+
+
+def panels(count):
+    """Layered wall panels, each with a window opening."""
+    model = TimberModel()
+    for index in range(count):
+        panel = Panel.from_outline_thickness(_rectangle(index * 6000.0, 0, 5000, 2800), 200.0)
+        panel.layer_structure = LayerStructure([LayerDefinition("sheathing", 20.0), LayerDefinition("framing", 160.0), LayerDefinition("lining", 20.0)])
+        model.add_element(panel)
+        opening = Opening.from_outline_panel(_rectangle(index * 6000.0 + 1000, 800, 1200, 1400), panel)
+        panel.add_feature(opening)
+    return model
+
+
+def fasteners(count):
+    """Plate fasteners with drilled interfaces."""
+    model = TimberModel()
+    for index in range(count):
+        interface = FastenerTimberInterface(
+            outline_points=[Point(0, 0, 0), Point(100, 0, 0), Point(100, 50, 0)],
+            thickness=8.0,
+            holes=[{"point": Point(10 + 20 * i, 10, 0), "diameter": 6.0, "vector": Vector(0, 0, 1)} for i in range(4)],
+            frame=Frame.worldXY(),
+        )
+        fastener = PlateFastener(
+            outline=Polyline([Point(0, 0, 0), Point(100, 0, 0), Point(100, 50, 0), Point(0, 0, 0)]),
+            thickness=8.0,
+            interfaces=[interface],
+            frame=Frame(Point(index * 200.0, 0, 0), Vector(1, 0, 0), Vector(0, 1, 0)),
+            angle=math.pi / 3,
+            topology="L",
+        )
+        model.add_element(fastener)
+    return model
+
+
+def nesting(count):
+    """The nesting of the beams of :func:`frames` into stock lengths."""
+    return BeamNester(frames(count), [BeamStock(6000, (100, 200)), BeamStock(6000, (80, 160))], spacing=5.0).nest()
+
+
+def building_plan(count):
+    """The assembly sequence of the beams of :func:`frames`."""
+    return SimpleSequenceGenerator(frames(count)).result
+
+
+MODELS = {
+    "frames": frames,
+    "panels": panels,
+    "fasteners": fasteners,
+    "nesting": nesting,
+    "building_plan": building_plan,
+}
+
+# the count every budget is given for
+COUNT = 10
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Point
+
+from compas_timber.aio import iterate_in_executor
+from compas_timber.aio import load_model_async
+from compas_timber.aio import read_file_async
+from compas_timber.aio import save_model_async
+from compas_timber.aio import write_file_async
+from compas_timber.btlx import BTLxReader
+from compas_timber.connections import LMiterJoint
+from compas_timber.elements import Beam
+from compas_timber.fabrication import BTLxWriter
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(3000, 0, 0)), width=100.0, height=200.0)
+    beam_b = Beam.from_centerline(Line(Point(3000, 0, 0), Point(3000, 3000, 0)), width=100.0, height=200.0)
+    model.add_element(beam_a)
+    model.add_element(beam_b)
+    beam_a.add_features(Drilling(start_x=100.0, diameter=12.0, depth=50.0, is_joinery=False))
+    LMiterJoint.create(model, beam_a, beam_b)
+    return model
+
+
+@pytest.fixture
+def beams():
+    model = TimberModel()
+    for index in range(20):
+        model.add_element(Beam(Frame(Point(0, index * 200.0, 0), [1, 0, 0], [0, 1, 0]), length=1000, width=100, height=100))
+    return model
+
+
+@pytest.fixture
+def fixed_file_history():
+    # the export time would otherwise differ between two writes
+    attributes = {"CompanyName": "Gramazio Kohler Research", "Date": "2026-01-01", "Time": "00:00:00"}
+    with patch.object(BTLxWriter, "_get_file_history_attributes", return_value=attributes):
+        yield
+
+
+def slow_items(count, closed):
+    try:
+        for index in range(count):
+            time.sleep(0.01)
+            yield index
+    finally:
+        closed.set()
+
+
+async def cancel_soon(coroutine):
+    task = asyncio.ensure_future(coroutine)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.parametrize("name", ["model.json", "model.bts"])
+def test_save_load_model_async(model, tmp_path, name):
+    path = tmp_path / name
+
+    async def roundtrip():
+        await save_model_async(model, path)
+        return await load_model_async(path)
+
+    loaded = asyncio.run(roundtrip())
+
+    assert [beam.guid for beam in loaded.beams] == [beam.guid for beam in model.beams]
+    assert len(loaded.joints) == 1
+    assert len(loaded.beams[0].features) == 1
+
+
+@pytest.mark.parametrize("name", ["model.btlx", "model.btlz", "model.btlx.gz"])
+def test_save_load_model_async_btlx(beams, tmp_path, name):
+    path = tmp_path / name
+
+    async def roundtrip():
+        await save_model_async(beams, path)
+        return await load_model_async(path)
+
+    loaded = asyncio.run(roundtrip())
+
+    assert len(loaded.beams) == 20
+    assert [beam.length for beam in loaded.beams] == [1000] * 20
+
+
+def test_model_format_is_checked(model, tmp_path):
+    with pytest.raises(ValueError):
+        asyncio.run(save_model_async(model, tmp_path / "model.txt"))
+    with pytest.raises(ValueError):
+        asyncio.run(load_model_async(tmp_path / "model.json", format="yaml"))
+
+
+def test_write_async_matches_write_stream(beams, tmp_path, fixed_file_history):
+    writer = BTLxWriter()
+    writer.write_stream(beams, str(tmp_path / "stream"))
+
+    asyncio.run(writer.write_async(beams, tmp_path / "async", batch_size=3))
+
+    assert (tmp_path / "async.btlx").read_text() == (tmp_path / "stream.btlx").read_text()
+
+
+def test_read_async_matches_read(beams, tmp_path):
+    path = str(tmp_path / "model.btlx")
+    BTLxWriter().write(beams, path)
+
+    loaded = asyncio.run(BTLxReader().read_async(path, batch_size=3))
+
+    assert [beam.frame for beam in loaded.beams] == [beam.frame for beam in BTLxReader().read(path).beams]
+
+
+def test_write_async_cancelled_removes_file(beams, tmp_path):
+    writer = BTLxWriter()
+    create_part = writer._create_part
+
+    def slow_create_part(*args):
+        time.sleep(0.01)
+        return create_part(*args)
+
+    with patch.object(writer, "_create_part", side_effect=slow_create_part):
+        asyncio.run(cancel_soon(writer.write_async(beams, tmp_path / "cancelled.btlz", batch_size=1)))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_iterate_in_executor_closes_iterator_on_cancel():
+    closed = threading.Event()
+
+    async def consume():
+        async for _ in iterate_in_executor(slow_items(1000, closed), batch_size=1):
+            pass
+
+    asyncio.run(cancel_soon(consume()))
+
+    assert closed.is_set()
+
+
+def test_iterate_in_executor_yields_batches():
+    closed = threading.Event()
+
+    async def consume():
+        return [batch async for batch in iterate_in_executor(slow_items(5, closed), batch_size=2)]
+
+    assert asyncio.run(consume()) == [[0, 1], [2, 3], [4]]
+    assert closed.is_set()
+
+
+def test_loop_runs_while_reading(beams, tmp_path):
+    path = str(tmp_path / "model.btlx")
+    BTLxWriter().write(beams, path)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        model = await BTLxReader().read_async(path, batch_size=1)
+        ticker.cancel()
+        return model
+
+    assert len(asyncio.run(main()).beams) == 20
+    assert len(ticks) > 1
+
+
+def test_file_async_chunks(tmp_path):
+    path = tmp_path / "data.bin"
+    data = bytes(range(256)) * 100
+
+    async def roundtrip():
+        await write_file_async(path, data, chunk_size=1000)
+        return await read_file_async(path, chunk_size=1000)
+
+    assert asyncio.run(roundtrip()) == data
@@ -1,4 +1,9 @@
+import gzip
+import io
+import math
 import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 import pytest
 from unittest.mock import patch
 
@@ -8,14 +13,19 @@ from compas.geometry import Frame
 from compas.geometry import Point
 from compas.geometry import Polyline
 
+import xml.dom.minidom as MD
 import xml.etree.ElementTree as ET
 
 import compas
 import compas_timber
+from compas_timber.btlx import BTLxIndex
 from compas_timber.btlx import BTLxReader
+from compas_timber.btlx.reader import _iter_part_chunks
 from compas_timber.fabrication import BTLxWriter
 from compas_timber.fabrication import BTLxPart
 from compas_timber.fabrication import BTLxRawpart
+from compas_timber.fabrication import BTLxPartCache
+from compas_timber.fabrication.btlx import _PrettyXMLWriter
 from compas_timber.fabrication import JackRafterCut
 from compas_timber.fabrication import OrientationType
 from compas_timber.fabrication import FreeContour
@@ -334,6 +344,211 @@ def test_btlx_rawpart_contains_correct_part_references(namespaces):
     assert y_vector is not None
 
 
+@pytest.fixture
+def fixed_file_history():
+    # the export time would otherwise differ between two writes
+    attributes = {"CompanyName": "Gramazio Kohler Research", "Date": "2026-01-01", "Time": "00:00:00"}
+    with patch.object(BTLxWriter, "_get_file_history_attributes", return_value=attributes):
+        yield
+
+
+def test_write_stream_matches_model_to_xml(test_model, fixed_file_history):
+    writer = BTLxWriter()
+    stream = io.StringIO()
+
+    writer.write_stream(test_model, stream)
+
+    assert stream.getvalue() == writer.model_to_xml(test_model)
+
+
+def test_write_stream_to_path_with_nesting_result(tmp_path, fixed_file_history):
+    model = TimberModel()
+    beam = Beam(Frame.worldXY(), length=1000, width=100, height=100)
+    model.add_element(beam)
+    stock = BeamStock(length=2000, cross_section=(100, 100))
+    stock.add_element(beam)
+    nesting_result = NestingResult([stock])
+    writer = BTLxWriter()
+
+    with patch("compas_timber.fabrication.btlx.uuid.uuid4", return_value=uuid.UUID(int=1)):  # raw part guids are random
+        writer.write_stream(model, str(tmp_path / "streamed"), nesting_result)
+        expected = writer.model_to_xml(model, nesting_result)
+
+    with open(tmp_path / "streamed.btlx") as file:
+        streamed = file.read()
+    assert streamed.count("<Rawpart ") == 1
+    assert streamed == expected
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_write_encodes_utf8(tmp_path, streamed):
+    model = TimberModel()
+    beam = Beam(Frame.worldXY(), length=1000, width=100, height=100)
+    beam.name = "Sparren Süd"
+    model.add_element(beam)
+    writer = BTLxWriter(project_name="Dachstuhl Zürich")
+    path = str(tmp_path / "umlaut.btlx")
+
+    if streamed:
+        writer.write_stream(model, path)
+    else:
+        writer.write(model, path)
+
+    with open(path, "rb") as file:
+        text = file.read().decode("utf-8")
+    assert 'Name="Dachstuhl Zürich"' in text
+    assert "Sparren Süd" in text
+
+
+def test_write_stream_empty_model(fixed_file_history):
+    writer = BTLxWriter()
+    stream = io.StringIO()
+
+    writer.write_stream(TimberModel(), stream)
+
+    assert "<Parts/>" in stream.getvalue()
+    assert stream.getvalue() == writer.model_to_xml(TimberModel())
+
+
+def test_write_stream_with_workers_matches_serial(test_model, fixed_file_history, mocker):
+    pool = mocker.patch("compas_timber.fabrication.btlx.ProcessPoolExecutor", wraps=ProcessPoolExecutor)
+    writer = BTLxWriter(workers=2, chunk_size=1)
+    stream = io.StringIO()
+
+    writer.write_stream(test_model, stream)
+
+    assert pool.called
+    assert stream.getvalue() == BTLxWriter().model_to_xml(test_model)
+    assert writer.model_to_xml(test_model) == stream.getvalue()
+
+
+def test_part_cache_with_workers(fixed_file_history):
+    model = TimberModel()
+    beams = [Beam(Frame.worldXY(), length=1000 + i, width=100, height=100) for i in range(4)]
+    model.add_elements(beams)
+    cache = BTLxPartCache()
+    writer = BTLxWriter(part_cache=cache, workers=2, chunk_size=1)
+    writer.model_to_xml(model)
+
+    beams[2].add_features(JackRafterCut(orientation=OrientationType.END, start_x=500.0))
+    result = writer.model_to_xml(model)
+
+    assert (cache.misses, cache.hits) == (5, 3)
+    assert result == BTLxWriter().model_to_xml(model)
+
+
+def test_part_cache_reuses_unchanged_parts(fixed_file_history):
+    model = TimberModel()
+    beams = [Beam(Frame.worldXY(), length=1000 + i, width=100, height=100) for i in range(3)]
+    model.add_elements(beams)
+    cache = BTLxPartCache()
+    writer = BTLxWriter(part_cache=cache)
+
+    first = writer.model_to_xml(model)
+    second = writer.model_to_xml(model)
+
+    assert first == second == BTLxWriter().model_to_xml(model)
+    assert (cache.misses, cache.hits) == (3, 3)
+
+    beams[1].add_features(JackRafterCut(orientation=OrientationType.END, start_x=500.0))
+    third = writer.model_to_xml(model)
+
+    assert (cache.misses, cache.hits) == (4, 5)
+    assert third == BTLxWriter().model_to_xml(model)
+    assert len(cache) == 3  # the fragment of the beam before the change was dropped
+
+
+def test_part_cache_misses_on_changed_processing_header(fixed_file_history):
+    model = TimberModel()
+    beam = Beam(Frame.worldXY(), length=1000, width=100, height=100)
+    model.add_element(beam)
+    cut = JackRafterCut(orientation=OrientationType.END, start_x=500.0)
+    beam.add_features(cut)
+    cache = BTLxPartCache()
+    writer = BTLxWriter(part_cache=cache)
+    writer.model_to_xml(model)
+
+    cut._tool_id = 7  # read-only, e.g. changed by a tool assignment step
+    result = writer.model_to_xml(model)
+
+    assert (cache.misses, cache.hits) == (2, 0)
+    assert 'ToolID="7"' in result
+    assert result == BTLxWriter().model_to_xml(model)
+
+    cut.add_subprocessing(JackRafterCut(orientation=OrientationType.START, start_x=100.0))
+    writer.model_to_xml(model)
+
+    assert (cache.misses, cache.hits) == (3, 0)
+
+
+def test_part_cache_persisted(tmp_path, fixed_file_history):
+    model = TimberModel()
+    model.add_element(Beam(Frame.worldXY(), length=1000, width=100, height=100))
+    path = str(tmp_path / "parts.json")
+    expected = BTLxWriter(part_cache=BTLxPartCache(path)).model_to_xml(model)
+
+    cache = BTLxPartCache(path)
+    result = BTLxWriter(part_cache=cache).model_to_xml(model)
+
+    assert result == expected
+    assert (cache.misses, cache.hits) == (0, 1)
+
+
+def test_pretty_xml_writer_escapes_like_minidom():
+    root = ET.Element("Root", {"Name": "root", "xmlns": "https://www.design2machine.com"})
+    element = ET.SubElement(root, "Comment", {"Value": 'a "quoted" <value> & more'})
+    ET.SubElement(element, "Text").text = "x < y & y > z"
+    ET.SubElement(element, "Empty")
+    stream = io.StringIO()
+
+    writer = _PrettyXMLWriter(stream)
+    writer.start(root.tag, root.attrib)
+    writer.element(element)
+    writer.end()
+
+    assert stream.getvalue() == MD.parseString(ET.tostring(root)).toprettyxml(indent="   ")
+
+
+def test_btlx_part_shape_strings_box():
+    beam = Beam(Frame.worldXY(), length=1000, width=100, height=200)
+    _ = beam.geometry
+
+    indices, vertices = BTLxPart(beam, order_num=0).shape_strings
+
+    faces = [face.split() for face in indices.split("-1") if face.strip()]
+    coordinates = [tuple(float(value) for value in vertices.split()[i : i + 3]) for i in range(0, len(vertices.split()), 3)]
+    assert len(faces) == 6
+    assert all(len(face) == 4 for face in faces)
+    assert len(set(coordinates)) == 8
+    assert [min(axis) for axis in zip(*coordinates)] == [0.0, 0.0, 0.0]
+    assert sorted(max(axis) for axis in zip(*coordinates)) == [100.0, 200.0, 1000.0]
+    # every edge is shared by two faces, running in opposite directions
+    edges = [(face[i], face[(i + 1) % 4]) for face in faces for i in range(4)]
+    assert all((end, start) in edges for start, end in edges)
+
+
+def test_btlx_part_shape_strings_many_vertices():
+    points = [Point(500 * math.cos(2 * math.pi * i / 200), 500 * math.sin(2 * math.pi * i / 200), 0) for i in range(200)]
+    plate = Plate.from_outline_thickness(Polyline(points + points[:1]), 20)
+    _ = plate.geometry
+
+    indices, vertices = BTLxPart(plate, order_num=0).shape_strings
+
+    assert len(vertices.split()) == 400 * 3
+    assert sorted(len(face.split()) for face in indices.split("-1") if face.strip()) == [4] * 200 + [200, 200]
+
+
+def test_btlx_writes_shape_of_computed_geometry(fixed_file_history):
+    model = TimberModel()
+    beam = Beam(Frame.worldXY(), length=1000, width=100, height=200)
+    model.add_element(beam)
+    _ = beam.geometry
+
+    btlx = ET.fromstring(BTLxWriter().model_to_xml(model))
+
+    assert btlx.find(".//d2m:Part/d2m:Shape/d2m:IndexedFaceSet", {"d2m": "https://www.design2machine.com"}) is not None
+
+
 def test_btlx_generic_part_inheritance():
     """Test that BTLxPart and BTLxRawpart both inherit from BTLxGenericPart."""
     # Create a beam and stock for testing
@@ -554,6 +769,295 @@ def test_btlx_reader_with_processings():
     assert TOL.is_close(feature_read.inclination, original_feature.inclination)
 
 
+@pytest.mark.parametrize("file_name, compression", [("model.btlz", None), ("model.btlx.gz", None), ("model", "zip"), ("model", "gzip")])
+def test_btlx_compressed_roundtrip(tmp_path, test_model, file_name, compression):
+    file_path = str(tmp_path / file_name)
+    result = BTLxWriter().write(test_model, file_path, compression=compression)
+    written = [path for path in tmp_path.iterdir()]
+
+    assert result is None  # streamed into the archive
+    assert len(written) == 1
+    assert written[0].stat().st_size * 5 < len(BTLxWriter().model_to_xml(test_model))
+
+    reader = BTLxReader()
+    model_read = reader.read(str(written[0]))
+
+    assert reader.errors == []
+    assert sorted(str(beam.guid) for beam in model_read.beams) == sorted(str(beam.guid) for beam in test_model.beams)
+    assert sum(len(beam.features) for beam in model_read.beams) == sum(len(beam.features) for beam in test_model.beams)
+
+
+def test_btlx_compression_is_detected_from_content(tmp_path, test_model):
+    path = str(tmp_path / "compressed.btlz")
+    BTLxWriter().write(test_model, path)
+    os.rename(path, str(tmp_path / "misnamed.btlx"))
+
+    with open(str(tmp_path / "misnamed.btlx"), "rb") as file:
+        model_read = BTLxReader().read(file)
+
+    assert len(model_read.beams) == len(test_model.beams)
+
+
+def test_btlx_compression_level(tmp_path, test_model):
+    BTLxWriter().write(test_model, str(tmp_path / "fast.btlx.gz"), compression_level=1)
+    BTLxWriter().write(test_model, str(tmp_path / "small.btlx.gz"), compression_level=9)
+
+    assert (tmp_path / "small.btlx.gz").stat().st_size <= (tmp_path / "fast.btlx.gz").stat().st_size
+
+
+def test_btlx_unsupported_compression(tmp_path, test_model):
+    with pytest.raises(ValueError):
+        BTLxWriter().write(test_model, str(tmp_path / "model"), compression="bz2")
+
+
+def test_btlx_reader_iter_elements_matches_read():
+    btlx_path = os.path.join(compas_timber.DATA, "model_test.btlx")
+    with open(btlx_path) as file:
+        expected = BTLxReader().xml_to_model(file.read())
+
+    elements = list(BTLxReader().iter_elements(btlx_path))
+
+    assert [element.guid for element in elements] == [beam.guid for beam in expected.beams]
+    assert [len(element.features) for element in elements] == [len(beam.features) for beam in expected.beams]
+
+
+def test_btlx_reader_iter_elements_is_incremental(tmp_path):
+    # the file is cut off after the second part, the parts before it are yielded before the parse error is raised
+    with open(os.path.join(compas_timber.DATA, "model_test.btlx")) as file:
+        xml_string = file.read()
+    cut = xml_string.index("</Part>", xml_string.index("</Part>") + 1) + len("</Part>")
+    path = tmp_path / "truncated.btlx"
+    path.write_text(xml_string[:cut] + "\n<Part")
+
+    elements = []
+    with pytest.raises(ET.ParseError):
+        for element in BTLxReader().iter_elements(str(path)):
+            elements.append(element)
+
+    assert len(elements) == 2
+
+
+def test_btlx_reader_iter_elements_missing_project(tmp_path):
+    path = tmp_path / "empty.btlx"
+    path.write_text('<?xml version="1.0" ?>\n<BTLx/>')
+
+    with pytest.raises(ValueError, match="No Project element"):
+        list(BTLxReader().iter_elements(str(path)))
+
+
+def _btlx_with_errors(count, prefix=""):
+    # parts with an unsupported processing, an out of range processing and invalid dimensions, the rest valid
+    processings = {
+        1: "<{p}UnknownProcessing><{p}SomeParameter>value</{p}SomeParameter></{p}UnknownProcessing>",
+        2: '<{p}JackRafterCut Orientation="start" ReferencePlaneID="1"><{p}StartX>10.000</{p}StartX><{p}Angle>200.000</{p}Angle></{p}JackRafterCut>',
+    }
+    parts = []
+    for i in range(count):
+        length = "invalid" if i == 3 else "1000.000"
+        parts.append(
+            '<{p}Part Length="' + length + '" Width="100.000" Height="100.000" SingleMemberNumber="' + str(i) + '" Annotation="part_' + str(i) + '">'
+            '<{p}Transformations><{p}Transformation GUID="{{' + str(uuid.UUID(int=i + 1)) + '}}"><{p}Position>'
+            '<{p}ReferencePoint X="' + str(i * 200) + '" Y="0" Z="0"/><{p}XVector X="1" Y="0" Z="0"/><{p}YVector X="0" Y="1" Z="0"/>'
+            "</{p}Position></{p}Transformation></{p}Transformations>"
+            "<{p}Processings>" + processings.get(i % 5, "") + "</{p}Processings></{p}Part>"
+        )
+    namespace = 'xmlns:btlx="https://www.design2machine.com"' if prefix else 'xmlns="https://www.design2machine.com"'
+    document = '<?xml version="1.0" ?>\n<{p}BTLx ' + namespace + '>\n<{p}Project Name="Test">\n<{p}Parts>\n' + "\n".join(parts) + "\n</{p}Parts>\n</{p}Project>\n</{p}BTLx>\n"
+    return document.replace("{p}", prefix).replace("{{", "{").replace("}}", "}")
+
+
+@pytest.mark.parametrize("prefix", ["", "btlx:"])
+def test_btlx_reader_parallel_matches_serial(tmp_path, prefix):
+    path = tmp_path / "parts.btlx"
+    path.write_text(_btlx_with_errors(23, prefix))
+
+    serial = BTLxReader()
+    with pytest.warns(UserWarning):
+        expected = serial.read(str(path))
+    parallel = BTLxReader(workers=2, chunk_size=4)
+    with pytest.warns(UserWarning):
+        model = parallel.read(str(path))
+
+    assert [beam.guid for beam in model.beams] == [beam.guid for beam in expected.beams]
+    assert [beam.name for beam in model.beams] == [beam.name for beam in expected.beams]
+    assert [beam.frame for beam in model.beams] == [beam.frame for beam in expected.beams]
+    assert [len(beam.features) for beam in model.beams] == [len(beam.features) for beam in expected.beams]
+    assert [str(error) for error in parallel.errors] == [str(error) for error in serial.errors]
+    assert len(parallel.errors) == 11  # 5 unsupported processings, 5 out of range processings and 1 invalid part
+
+
+def test_btlx_reader_parallel_compressed(tmp_path, test_model):
+    path = str(tmp_path / "model.btlz")
+    BTLxWriter().write(test_model, path)
+
+    model = BTLxReader(workers=2, chunk_size=7).read(path)
+
+    assert [beam.guid for beam in model.beams] == [beam.guid for beam in test_model.beams]
+
+
+def test_iter_part_chunks():
+    document = _btlx_with_errors(10).encode()
+
+    chunks = list(_iter_part_chunks(io.BytesIO(document), 4, block_size=100))
+
+    assert [len(ET.fromstring(chunk)) for chunk in chunks] == [4, 4, 2]
+    assert list(_iter_part_chunks(io.BytesIO(b'<BTLx><Project Name="a"><Parts /></Project></BTLx>'), 4)) == []
+    assert list(_iter_part_chunks(io.BytesIO(b'<BTLx><Project Name="a"><Parts/></Project></BTLx>'), 4)) == []
+    with pytest.raises(ValueError, match="No Project element"):
+        list(_iter_part_chunks(io.BytesIO(b"<BTLx><Parts></Parts></BTLx>"), 4))
+
+
+def test_btlx_reader_lazy_defers_processings():
+    btlx_path = os.path.join(compas_timber.DATA, "model_test.btlx")
+    expected = BTLxReader().read(btlx_path)
+
+    model = BTLxReader(lazy=True).read(btlx_path)
+
+    assert all(beam.has_deferred_features for beam in model.beams)
+    assert [beam.frame for beam in model.beams] == [beam.frame for beam in expected.beams]
+    assert [len(beam.features) for beam in model.beams] == [len(beam.features) for beam in expected.beams]
+    assert not any(beam.has_deferred_features for beam in model.beams)
+
+
+def test_btlx_reader_lazy_errors_on_access(tmp_path):
+    path = tmp_path / "parts.btlx"
+    path.write_text(_btlx_with_errors(10))
+    reader = BTLxReader(lazy=True)
+    with pytest.warns(UserWarning):
+        model = reader.read(str(path))
+
+    assert len(reader.errors) == 1  # the invalid part, processings are not parsed yet
+
+    with pytest.warns(UserWarning):
+        _ = [beam.features for beam in model.beams]
+
+    assert len(reader.errors) == 5
+    assert reader.errors[1].part_id == "1"
+
+
+@pytest.mark.parametrize("prefix", ["", "btlx:"])
+def test_btlx_reader_lazy_parallel_matches_serial(tmp_path, prefix):
+    path = tmp_path / "parts.btlx"
+    path.write_text(_btlx_with_errors(23, prefix))
+    serial = BTLxReader()
+    with pytest.warns(UserWarning):
+        expected = serial.read(str(path))
+
+    lazy = BTLxReader(workers=2, chunk_size=4, lazy=True)
+    with pytest.warns(UserWarning):
+        model = lazy.read(str(path))
+        features = [len(beam.features) for beam in model.beams]
+
+    assert [beam.guid for beam in model.beams] == [beam.guid for beam in expected.beams]
+    assert features == [len(beam.features) for beam in expected.beams]
+    assert sorted(str(error) for error in lazy.errors) == sorted(str(error) for error in serial.errors)
+
+
+def test_btlx_reader_lazy_added_features_come_last():
+    btlx_path = os.path.join(compas_timber.DATA, "model_test.btlx")
+    beam = next(BTLxReader(lazy=True).iter_elements(btlx_path))
+    feature = JackRafterCut()
+
+    beam.add_feature(feature)
+
+    assert len(beam.features) > 1
+    assert beam.features[-1] is feature
+
+
+@pytest.mark.parametrize("prefix", ["", "btlx:"])
+def test_btlx_index(tmp_path, prefix):
+    path = tmp_path / "parts.btlx"
+    path.write_text(_btlx_with_errors(10, prefix))
+
+    index = BTLxIndex.build(str(path))
+
+    assert len(index) == 10
+    assert index.find(uuid.UUID(int=3)) == [2]
+    assert index.find("{" + str(uuid.UUID(int=3)).upper() + "}") == [2]
+    assert index.find("4") == [4]
+    assert index.find("part_5", by="annotation") == [5]
+    assert index.find("5", by="annotation") == []
+    with pytest.raises(ValueError):
+        index.find("5", by="name")
+    for offset, length, guid, *_ in index.parts:
+        assert guid in path.read_bytes()[offset : offset + length].decode()
+
+
+@pytest.mark.parametrize("prefix", ["", "btlx:"])
+def test_btlx_index_and_lazy_reading_use_parser_positions(tmp_path, prefix):
+    # ">" in attribute values, tags in comments and CDATA sections do not split the parts or their processings
+    document = _btlx_with_errors(6, prefix)
+    document = document.replace('Annotation="part_2"', 'Annotation="part_2 > part_1"')
+    document = document.replace("</{}Part>".format(prefix), "</{}Part><!-- <Part> </Parts> -->".format(prefix), 1)
+    document = document.replace("<{}Processings>".format(prefix), "<{}Processings><!-- </Processings> --><![CDATA[ </Part> ]]>".format(prefix), 1)
+    path = tmp_path / "parts.btlx"
+    path.write_text(document)
+    serial = BTLxReader()
+    with pytest.warns(UserWarning):
+        expected = serial.read(str(path))
+
+    index = BTLxIndex.build(str(path))
+    lazy = BTLxReader(chunk_size=2, lazy=True)
+    with pytest.warns(UserWarning):
+        model = lazy.read(str(path))
+        features = [len(beam.features) for beam in model.beams]
+
+    assert len(index) == 6
+    assert index.find("part_2 > part_1", by="annotation") == [2]
+    assert [beam.guid for beam in model.beams] == [beam.guid for beam in expected.beams]
+    assert features == [len(beam.features) for beam in expected.beams]
+    with pytest.warns(UserWarning):
+        parts = BTLxReader().read_parts(str(path), ["0", "2"])
+    assert [beam.name for beam in parts.beams] == ["part_0", "part_2 > part_1"]
+
+
+def test_btlx_reader_read_parts(tmp_path):
+    path = str(tmp_path / "model.btlx")
+    with open(os.path.join(compas_timber.DATA, "model_test.btlx")) as file:
+        xml_string = file.read()
+    with open(path, "w") as file:
+        file.write(xml_string)
+    expected = BTLxReader().read(path).beams
+    keys = [expected[7].guid, expected[2].attributes["single_member_number"]]
+
+    model = BTLxReader().read_parts(path, keys)
+
+    assert os.path.exists(path + BTLxIndex.SUFFIX)
+    assert [beam.guid for beam in model.beams] == [expected[2].guid, expected[7].guid]
+    assert [beam.frame for beam in model.beams] == [expected[2].frame, expected[7].frame]
+    assert [len(beam.features) for beam in model.beams] == [len(expected[2].features), len(expected[7].features)]
+    with pytest.raises(KeyError, match="missing"):
+        BTLxReader().read_parts(path, [expected[0].guid, "missing"])
+
+
+def test_btlx_index_rebuilt_when_file_changed(tmp_path):
+    path = str(tmp_path / "parts.btlx")
+    with open(path, "w") as file:
+        file.write(_btlx_with_errors(5))
+    assert len(BTLxIndex.for_file(path)) == 5
+
+    with open(path, "w") as file:
+        file.write(_btlx_with_errors(8))
+
+    assert not BTLxIndex.load(path + BTLxIndex.SUFFIX).is_current(path)
+    with pytest.warns(UserWarning):
+        model = BTLxReader().read_parts(path, ["7"])
+    assert [beam.name for beam in model.beams] == ["part_7"]
+
+
+def test_btlx_reader_read_parts_compressed(tmp_path, test_model):
+    path = str(tmp_path / "model.btlx.gz")
+    BTLxWriter().write(test_model, path)
+
+    beams = [test_model.beams[7], test_model.beams[5]]
+
+    # the parts are read in file order in one pass, seeking back would decompress the file again from its start
+    with patch.object(gzip.GzipFile, "seek", side_effect=AssertionError("seek in a compressed file")):
+        model = BTLxReader().read_parts(path, [beam.guid for beam in beams])
+
+    assert [element.guid for element in model.beams] == [beams[1].guid, beams[0].guid]
+
+
 @pytest.mark.parametrize(
     "dimensions, expected_type",
     [
@@ -1,10 +1,13 @@
+import io
 import pytest
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from compas.geometry import Frame
 from compas.tolerance import Tolerance
 from compas_timber.btlx import BTLxReader
 from compas_timber.fabrication.btlx import AttributeSpec
 from compas_timber.fabrication import BTLxWriter
+from compas_timber.fabrication import BTLxPartCache
 from compas_timber.fabrication import BTLxProcessing
 from compas_timber.errors import BTLxProcessingError
 from compas_timber.errors import BTLxParsingError
@@ -190,6 +193,18 @@ def test_model_to_xml_with_multiple_beams_and_errors(btlx_writer):
     assert all(isinstance(error, BTLxProcessingError) for error in btlx_writer.errors)
 
 
+def test_part_cache_does_not_keep_parts_with_errors(mock_model):
+    beam = list(mock_model.beams)[0]
+    beam.add_features(MockProcessingWithBadAttribute(error_message="Processing failed"))
+    writer = BTLxWriter(part_cache=BTLxPartCache())
+
+    writer.model_to_xml(mock_model)
+    writer.model_to_xml(mock_model)
+
+    assert len(writer.errors) == 1
+    assert len(writer.part_cache) == 0
+
+
 def test_model_to_xml_with_unsupported_type_error(btlx_writer, mock_model):
     """Test that unsupported value types are caught and reported."""
     processing = MockProcessingWithUnsupportedType()
@@ -248,6 +263,28 @@ def test_model_to_xml_with_successful_processing(btlx_writer, mock_model):
     assert len(btlx_writer.errors) == 0
 
 
+@pytest.mark.parametrize("streamed", [False, True])
+def test_errors_with_workers_keep_part_and_processing(streamed, mocker):
+    pool = mocker.patch("compas_timber.fabrication.btlx.ProcessPoolExecutor", wraps=ProcessPoolExecutor)
+    model = TimberModel(Tolerance(unit="MM", absolute=1e-3, relative=1e-3))
+    beams = [Beam(Frame.worldXY(), length=1000.0 + i, width=100.0, height=100.0) for i in range(5)]
+    model.add_elements(beams)
+    for i, beam in enumerate(beams):
+        beam.add_features([MockProcessingSuccess(), MockProcessingWithBadAttribute(error_message="Error {}".format(i))])
+    writer = BTLxWriter(workers=2, chunk_size=2)
+
+    if streamed:
+        writer.write_stream(model, io.StringIO())
+    else:
+        writer.model_to_xml(model)
+
+    assert pool.called
+    assert [error.message for error in writer.errors] == ["Failed to create processing: Error {}".format(i) for i in range(5)]
+    assert [error.part.order_num for error in writer.errors] == list(range(5))
+    assert all(error.part.element is beam for error, beam in zip(writer.errors, beams))
+    assert all(error.failed_processing is beam.features[1] for error, beam in zip(writer.errors, beams))
+
+
 # =============================================================================
 # BTLxReader Error Handling Tests
 # =============================================================================
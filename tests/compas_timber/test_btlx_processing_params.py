@@ -1,5 +1,8 @@
+import xml.etree.ElementTree as ET
 from collections import OrderedDict
 
+import pytest
+
 from compas.geometry import Point
 from compas.geometry import Polyline
 
@@ -7,11 +10,15 @@ from compas_timber.elements import Plate
 from compas_timber.fabrication import BTLxProcessing
 from compas_timber.fabrication import BTLxWriter
 from compas_timber.fabrication import Contour
+from compas_timber.fabrication import DualContour
 from compas_timber.fabrication import FreeContour
 from compas_timber.fabrication import MachiningLimits
 from compas_timber.fabrication import Mortise
 from compas_timber.fabrication.btlx import AttributeSpec
 from compas_timber.fabrication.btlx import BTLxProcessingParams
+from compas_timber.fabrication.btlx import _emit_formatted
+from compas_timber.fabrication.btlx import compile_param_fields
+from compas_timber.utils import get_leaf_subclasses
 
 
 class _MockProcessing(BTLxProcessing):
@@ -114,6 +121,92 @@ def test_as_dict_formats_machining_limits():
     assert result["FaceLimitedEnd"] == "no"
 
 
+# --- compiled fields ---
+
+
+def test_fields_follow_attribute_map():
+    fields = _MockProcessing().params.fields
+
+    assert [tag for tag, _, _, _ in fields] == list(_MockProcessing.ATTRIBUTE_MAP)
+    assert _MockProcessing._param_fields is fields  # compiled once, at class creation
+
+
+def test_fields_inherited_with_attribute_map():
+    class _DerivedProcessing(_MockProcessing):
+        pass
+
+    assert _DerivedProcessing._param_fields is _MockProcessing._param_fields
+
+
+def test_compiled_formatters_fall_back_on_undeclared_types():
+    fields = compile_param_fields({"Value": AttributeSpec("value", float), "Flag": AttributeSpec("flag", bool), "Name": AttributeSpec("name", str)})
+    formatters = {tag: formatter for tag, _, formatter, _ in fields}
+
+    assert formatters["Value"](2) == "2.000"
+    assert formatters["Value"]("start") == "start"
+    assert formatters["Value"](True) == "yes"
+    assert formatters["Flag"](False) == "no"
+    assert formatters["Flag"](1.5) == "1.500"
+    assert formatters["Name"](MachiningLimits()) == BTLxProcessingParams._format_value(MachiningLimits())
+
+
+def test_compiled_emitters_fall_back_on_undeclared_types():
+    fields = compile_param_fields({"Value": AttributeSpec("value", float), "Flag": AttributeSpec("flag", bool), "Name": AttributeSpec("name", str)})
+    emitters = {tag: emitter for tag, _, _, emitter in fields}
+    parent = ET.Element("Processing")
+
+    emitters["Value"](parent, "Value", 2)
+    emitters["Value"](parent, "Start", "start")
+    emitters["Flag"](parent, "Flag", 1.5)
+    emitters["Name"](parent, "MachiningLimits", MachiningLimits(face_limited_start=True))
+
+    assert [(child.tag, child.text) for child in parent][:3] == [("Value", "2.000"), ("Start", "start"), ("Flag", "1.500")]
+    assert parent[3].attrib == BTLxProcessingParams._format_value(MachiningLimits(face_limited_start=True))
+
+
+def test_append_to_uses_overridden_as_dict():
+    class _CustomParams(BTLxProcessingParams):
+        def as_dict(self):
+            result = super(_CustomParams, self).as_dict()
+            result["Extra"] = "added"
+            return result
+
+    processing = _MockProcessing(test_str="value")
+    element = ET.Element("Processing")
+
+    _CustomParams(processing).append_to(element)
+
+    assert [child.tag for child in element] == list(_MockProcessing.ATTRIBUTE_MAP) + ["Extra"]
+    assert element.find("Extra").text == "added"
+
+
+PROCESSING_TYPES = sorted((cls for cls in get_leaf_subclasses(BTLxProcessing) if cls.__module__.startswith("compas_timber.")), key=lambda cls: cls.__name__)
+
+
+@pytest.mark.parametrize("processing_type", PROCESSING_TYPES, ids=lambda cls: cls.__name__)
+def test_compiled_as_dict_matches_generic_formatting(processing_type):
+    arguments = {
+        "StepJoint": {"strut_inclination": 45.0},
+        "StepJointNotch": {"strut_inclination": 45.0},
+        "Text": {"text": "A1"},
+        "FreeContour": {"contour_param_object": Contour(Polyline([Point(0, 0, 0), Point(100, 0, 0), Point(0, 0, 0)]), depth=10.0)},
+    }
+    processing = processing_type(**arguments.get(processing_type.__name__, {}))
+    tags = [tag for tag, _, _, _ in processing.params.fields]
+
+    expected = OrderedDict((tag, BTLxProcessingParams._format_value(getattr(processing, spec.python_name))) for tag, spec in processing.ATTRIBUTE_MAP.items() if tag in tags)
+
+    assert processing.params.as_dict() == expected
+
+    emitted = ET.Element(processing.PROCESSING_NAME)
+    processing.params.append_to(emitted)
+    from_dict = ET.Element(processing.PROCESSING_NAME)
+    for tag, value in expected.items():
+        _emit_formatted(from_dict, tag, value)
+
+    assert ET.tostring(emitted) == ET.tostring(from_dict)
+
+
 # --- _format_value() ---
 
 
@@ -248,3 +341,11 @@ def test_free_contour_params_contour_passthrough():
     assert "Contour" in result
     assert isinstance(result["Contour"], Contour)
     assert result["Contour"].depth == 5.0
+
+
+def test_free_contour_params_dual_contour_field():
+    principal = Polyline([Point(0, 0, 0), Point(100, 0, 0), Point(100, 50, 0), Point(0, 0, 0)])
+    free_contour = FreeContour(DualContour(principal, principal.translated([0, 0, -10])))
+
+    assert [tag for tag, _, _, _ in free_contour.params.fields if "Contour" in tag] == ["DualContour"]
+    assert isinstance(free_contour.params.as_dict()["DualContour"], DualContour)
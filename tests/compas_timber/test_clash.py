@@ -0,0 +1,167 @@
+import itertools
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from compas.data import json_dumps
+from compas.data import json_loads
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+
+from compas_timber.clash import Clash
+from compas_timber.clash import ClashDetector
+from compas_timber.clash import _intersection_volume
+from compas_timber.clash import _sweep_and_prune
+from compas_timber.connections import LButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import Panel
+from compas_timber.geometry import GeometryBackend
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture
+def crossing_beams():
+    # two beams crossing each other at mid-span, not joined
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), width=100, height=100, name="a")
+    beam_b = Beam.from_centerline(Line(Point(500, -500, 0), Point(500, 500, 0)), width=100, height=100, name="b")
+    return beam_a, beam_b
+
+
+@pytest.fixture
+def model(crossing_beams):
+    model = TimberModel()
+    model.add_elements(crossing_beams)
+    return model
+
+
+def test_crossing_beams_clash(model, crossing_beams):
+    clashes = model.find_clashes()
+
+    assert len(clashes) == 1
+    clash = clashes[0]
+    assert isinstance(clash, Clash)
+    assert {clash.element_a, clash.element_b} == set(crossing_beams)
+    assert clash.depth == pytest.approx(100.0)
+    assert clash.location == Point(500, 0, 0)
+
+
+def test_touching_beams_do_not_clash():
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), width=100, height=100)
+    beam_b = Beam.from_centerline(Line(Point(0, 0, 100), Point(1000, 0, 100)), width=100, height=100)
+    model = TimberModel()
+    model.add_elements([beam_a, beam_b])
+
+    assert model.find_clashes() == []
+
+
+def test_rotated_beams_separated_by_sat_axis():
+    # the aabbs of these overlap, the oriented boxes do not
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 1000, 0)), width=100, height=100)
+    beam_b = Beam.from_centerline(Line(Point(300, 0, 0), Point(1000, 700, 0)), width=100, height=100)
+    model = TimberModel()
+    model.add_elements([beam_a, beam_b])
+    detector = ClashDetector(model)
+
+    assert len(detector.broad_phase([beam_a, beam_b])) == 1
+    assert detector.find_clashes() == []
+
+
+def test_joined_beams_are_excluded(model, crossing_beams):
+    LButtJoint.create(model, *crossing_beams)
+
+    assert model.find_clashes() == []
+    assert len(model.find_clashes(exclude_joined=False)) == 1
+
+
+def test_parent_and_child_are_excluded():
+    outline = Polyline([Point(0, 0, 0), Point(0, 1000, 0), Point(1000, 1000, 0), Point(1000, 0, 0), Point(0, 0, 0)])
+    panel = Panel.from_outline_thickness(outline, 100)
+    beam = Beam.from_centerline(Line(Point(100, 500, 50), Point(900, 500, 50)), width=50, height=50)
+    model = TimberModel()
+    model.add_element(panel)
+    model.add_element(beam, parent=panel)
+
+    assert model.find_clashes() == []
+
+
+def test_parallel_narrow_phase_matches_serial():
+    beams = [Beam.from_centerline(Line(Point(0, i * 50, 0), Point(1000, i * 50, 0)), width=100, height=100) for i in range(5)]
+    beams += [Beam.from_centerline(Line(Point(i * 200, -100, 0), Point(i * 200, 400, 0)), width=100, height=100) for i in range(5)]
+    model = TimberModel()
+    model.add_elements(beams)
+
+    serial = ClashDetector(model).find_clashes()
+    parallel = ClashDetector(model, workers=4, chunk_size=3).find_clashes()
+
+    assert len(serial) > 0
+    assert [(c.element_a, c.element_b, c.depth) for c in serial] == [(c.element_a, c.element_b, c.depth) for c in parallel]
+
+
+def test_sweep_and_prune_matches_brute_force():
+    rng = np.random.default_rng(0)
+    mins = rng.uniform(0, 100, size=(200, 3))
+    maxs = mins + rng.uniform(0, 15, size=(200, 3))
+
+    expected = [(i, j) for i, j in itertools.combinations(range(200), 2) if np.all(np.minimum(maxs[i], maxs[j]) - np.maximum(mins[i], mins[j]) > 0)]
+
+    assert [tuple(pair) for pair in _sweep_and_prune(mins, maxs)] == expected
+
+
+def test_clash_data_uses_guids(model):
+    clash = model.find_clashes()[0]
+
+    data = clash.__data__
+    assert data["element_a"] == str(clash.element_a.guid)
+    assert "depth" in json_dumps(clash)
+
+
+def test_clash_data_roundtrip(model, crossing_beams):
+    clash = model.find_clashes()[0]
+
+    other = json_loads(json_dumps(clash))
+    assert other.element_a is None
+    other.restore_elements_from_keys(model)
+
+    assert (other.element_a, other.element_b) == (clash.element_a, clash.element_b)
+    assert other.depth == clash.depth
+    assert other.location == clash.location
+
+
+def test_check_geometry_mesh_backend(crossing_beams):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_elements(crossing_beams)
+
+    clashes = model.find_clashes(check_geometry=True)
+
+    assert len(clashes) == 1
+    assert clashes[0].volume == pytest.approx(100 * 100 * 100)
+
+
+@pytest.mark.parametrize("panel_first", [True, False])
+def test_check_geometry_mesh_backend_with_panel(panel_first):
+    # panels are breps on the mesh backend too, a beam through one is intersected as a mesh
+    outline = Polyline([Point(0, 0, 0), Point(0, 1000, 0), Point(1000, 1000, 0), Point(1000, 0, 0), Point(0, 0, 0)])
+    panel = Panel.from_outline_thickness(outline, 100)
+    beam = Beam.from_centerline(Line(Point(500, -500, 50), Point(500, 1500, 50)), width=50, height=50)
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_elements([panel, beam] if panel_first else [beam, panel])
+
+    clashes = model.find_clashes(check_geometry=True)
+
+    assert len(clashes) == 1
+    assert clashes[0].volume == pytest.approx(50 * 50 * 1000)
+
+
+def test_failed_boolean_is_reported_with_unknown_volume(model):
+    class FailingGeometry(object):
+        def __and__(self, other):
+            raise RuntimeError("boolean failed")
+
+    assert _intersection_volume(FailingGeometry(), FailingGeometry()) is None
+    with patch("compas_timber.clash._intersection_volume", return_value=None):
+        clashes = model.find_clashes(check_geometry=True)
+
+    assert len(clashes) == 1
+    assert clashes[0].volume is None
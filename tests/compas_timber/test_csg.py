@@ -0,0 +1,207 @@
+import pytest
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.geometry import Translation
+
+from compas_timber.csg import mesh_boolean_difference
+from compas_timber.csg import mesh_boolean_intersection
+from compas_timber.csg import mesh_boolean_union
+from compas_timber.csg import mesh_components
+from compas_timber.csg import mesh_contains_point
+from compas_timber.csg import mesh_trimmed
+from compas_timber.elements import Beam
+from compas_timber.elements import Panel
+from compas_timber.elements import Plate
+from compas_timber.errors import FeatureApplicationError
+from compas_timber.fabrication import Drilling
+from compas_timber.fabrication import JackRafterCut
+from compas_timber.fabrication import Text
+from compas_timber.geometry import GeometryBackend
+from compas_timber.geometry import mesh_from_outlines
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture
+def box_a():
+    return Box(2.0, 2.0, 2.0).to_mesh()
+
+
+@pytest.fixture
+def box_b():
+    return Box(1.0, 1.0, 4.0).to_mesh()
+
+
+@pytest.fixture
+def beam():
+    return Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), width=100, height=200)
+
+
+def test_mesh_boolean_difference(box_a, box_b):
+    result = mesh_boolean_difference(box_a, box_b)
+
+    assert result.is_closed()
+    assert result.volume() == pytest.approx(6.0)
+
+
+def test_mesh_boolean_union(box_a, box_b):
+    result = mesh_boolean_union(box_a, box_b)
+
+    assert result.is_closed()
+    assert result.volume() == pytest.approx(10.0)
+
+
+def test_mesh_boolean_intersection(box_a, box_b):
+    result = mesh_boolean_intersection(box_a, box_b)
+
+    assert result.is_closed()
+    assert result.volume() == pytest.approx(2.0)
+
+
+def test_mesh_boolean_difference_inward_facing_cutter(box_a, box_b):
+    box_b.flip_cycles()
+
+    assert mesh_boolean_difference(box_a, box_b).volume() == pytest.approx(6.0)
+
+
+def test_mesh_trimmed_keeps_back_side(box_a):
+    result = mesh_trimmed(box_a, Plane([0, 0, 0.5], [0, 0, 1]))
+
+    assert result.is_closed()
+    assert result.volume() == pytest.approx(6.0)
+    assert max(z for _, _, z in result.vertices_attributes("xyz")) == pytest.approx(0.5)
+
+
+def test_mesh_trimmed_with_frame(box_a):
+    result = mesh_trimmed(box_a, Frame([0, 0, 0], [1, 0, 0], [0, 1, 0]))
+
+    assert result.volume() == pytest.approx(4.0)
+
+
+def test_mesh_components_and_contains_point(box_a):
+    far_box = Box(1.0, 1.0, 1.0).to_mesh()
+    far_box.transform(Translation.from_vector([5, 0, 0]))
+
+    components = mesh_components(mesh_boolean_union(box_a, far_box))
+
+    assert sorted(component.volume() for component in components) == pytest.approx([1.0, 8.0])
+    assert mesh_contains_point(box_a, Point(0.5, 0.5, 0.5))
+    assert not mesh_contains_point(box_a, Point(1.5, 0.0, 0.0))
+
+
+def test_mesh_from_outlines_non_convex():
+    outline_a = Polyline([[0, 0, 0], [2, 0, 0], [2, 1, 0], [1, 1, 0], [1, 3, 0], [0, 3, 0], [0, 0, 0]])
+    outline_b = outline_a.translated([0, 0, 0.5])
+
+    for a, b in [(outline_a, outline_b), (outline_b, outline_a)]:
+        mesh = mesh_from_outlines(a, b)
+        assert mesh.is_closed()
+        assert mesh.volume() == pytest.approx(2.0)
+
+
+def test_model_geometry_backend_default():
+    assert TimberModel().geometry_backend == GeometryBackend.BREP
+
+
+def test_model_geometry_backend_invalid():
+    model = TimberModel()
+
+    with pytest.raises(ValueError):
+        model.geometry_backend = "nurbs"
+
+
+def test_model_geometry_backend_invalid_in_constructor():
+    with pytest.raises(ValueError):
+        TimberModel(geometry_backend="nurbs")
+
+
+def test_model_geometry_settings_copy(beam):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH, instancing=False)
+    model.add_element(beam)
+
+    copied = model.copy()
+
+    assert copied.geometry_backend == GeometryBackend.MESH
+    assert copied.instancing is False
+    assert isinstance(copied.beams[0].geometry, Mesh)
+
+
+def test_beam_geometry_mesh_backend(beam):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_element(beam)
+
+    assert isinstance(beam.geometry, Mesh)
+    assert beam.geometry.volume() == pytest.approx(1000 * 100 * 200)
+
+
+def test_beam_geometry_mesh_backend_jack_rafter_cut(beam):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_element(beam)
+    beam.add_features(JackRafterCut.from_plane_and_beam(Plane([500, 0, 0], [1, 0, 0]), beam))
+
+    geometry = beam.compute_elementgeometry()
+
+    assert not beam.debug_info
+    assert geometry.is_closed()
+    assert geometry.volume() == pytest.approx(500 * 100 * 200)
+
+
+def test_beam_geometry_mesh_backend_drilling(beam):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_element(beam)
+    beam.add_features(Drilling.from_line_and_element(Line(Point(500, 0, -200), Point(500, 0, 200)), beam, diameter=20))
+
+    geometry = beam.compute_elementgeometry()
+
+    assert not beam.debug_info
+    assert geometry.is_closed()
+    assert 1000 * 100 * 200 - geometry.volume() == pytest.approx(3.14159 * 10**2 * 200, rel=0.05)
+
+
+def test_beam_geometry_mesh_backend_unsupported_processing(beam):
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_element(beam)
+    beam.add_features(Text(text="A"))
+
+    beam.compute_elementgeometry()
+
+    assert len(beam.debug_info) == 1
+    assert isinstance(beam.debug_info[0], FeatureApplicationError)
+
+
+def test_switching_backend_resets_geometry(beam):
+    model = TimberModel()
+    model.add_element(beam)
+    _ = beam.geometry
+
+    model.geometry_backend = GeometryBackend.MESH
+
+    assert isinstance(beam.geometry, Mesh)
+
+
+def test_switching_backend_with_panel():
+    outline = Polyline([Point(0, 0, 0), Point(0, 200, 0), Point(100, 200, 0), Point(100, 0, 0), Point(0, 0, 0)])
+    model = TimberModel()
+    model.add_element(Panel.from_outline_thickness(outline, 10))
+
+    model.geometry_backend = GeometryBackend.MESH
+
+    assert model.geometry_backend == GeometryBackend.MESH
+
+
+def test_plate_geometry_mesh_backend():
+    outline = Polyline([Point(0, 0, 0), Point(0, 200, 0), Point(100, 200, 0), Point(100, 0, 0), Point(0, 0, 0)])
+    plate = Plate.from_outline_thickness(outline, 10)
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    model.add_element(plate)
+
+    geometry = plate.compute_elementgeometry()
+
+    assert isinstance(geometry, Mesh)
+    assert geometry.is_closed()
+    assert geometry.volume() == pytest.approx(200 * 100 * 10)
@@ -1,3 +1,5 @@
+import warnings
+
 import pytest
 from compas.geometry import Frame
 from compas.geometry import Plane
@@ -6,6 +8,7 @@ from compas.geometry import Polygon
 from compas.geometry import Polyline
 from compas.geometry import Vector
 from compas.tolerance import TOL
+from compas_brep import Brep
 
 from compas_timber.geometry import brep_from_outlines
 
@@ -188,3 +191,20 @@ def test_brep_from_outlines_raises_if_outlines_not_parallel():
 
     with pytest.raises(ValueError):
         brep_from_outlines(outline_a, outline_b)
+
+
+@pytest.mark.requires_occ
+def test_brep_from_outlines_only_silences_the_cap_ends_warning(mocker):
+    def extrusion(*args, **kwargs):
+        warnings.warn("cap_ends parameter is not implemented in OCC backend", UserWarning)
+        warnings.warn("something else", UserWarning)
+        return from_extrusion(*args, **kwargs)
+
+    from_extrusion = Brep.from_extrusion
+    mocker.patch.object(Brep, "from_extrusion", side_effect=extrusion)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        brep_from_outlines(_rectangle(z=0), _rectangle(z=1))
+
+    assert [str(warning.message) for warning in caught] == ["something else"]
@@ -0,0 +1,135 @@
+import pytest
+
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.geometry import Transformation
+from compas.geometry import Vector
+
+from compas_timber.elements import Beam
+from compas_timber.elements import Plate
+from compas_timber.errors import FeatureApplicationError
+from compas_timber.fabrication import JackRafterCut
+from compas_timber.fabrication import Text
+from compas_timber.geometry import GeometryBackend
+from compas_timber.model import TimberModel
+from compas_timber.utils import parametric_hash
+
+
+def _studs(count):
+    # identical studs standing along a wall, plus one rotated copy
+    beams = [Beam.from_centerline(Line(Point(i * 600, 0, 0), Point(i * 600, 0, 2500)), width=60, height=120) for i in range(count)]
+    beams.append(Beam.from_centerline(Line(Point(0, 3000, 0), Point(2500, 3000, 0)), width=60, height=120))
+    return beams
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    model.add_elements(_studs(5))
+    return model
+
+
+def test_parametric_hash_ignores_noise_and_key_order():
+    assert parametric_hash([1.0, Point(0, 0, 0)]) == parametric_hash([1.0000001, Point(0, -1e-9, 0)])
+    assert parametric_hash({"a": 1, "b": 2}) == parametric_hash({"b": 2, "a": 1})
+    assert parametric_hash([1.0, 2.0]) != parametric_hash([2.0, 1.0])
+
+
+def test_identical_beams_have_equal_instance_keys(model):
+    keys = {beam.compute_instance_key() for beam in model.beams}
+
+    assert len(keys) == 1
+
+
+def test_identical_beams_share_element_geometry(model, mocker):
+    spy = mocker.spy(Beam, "compute_elementgeometry")
+
+    geometries = [beam.elementgeometry for beam in model.beams]
+
+    assert spy.call_count == 1
+    assert all(geometry is geometries[0] for geometry in geometries)
+
+
+def test_model_geometry_is_placed_per_element(model):
+    beams = model.beams
+
+    for beam in beams:
+        assert beam.geometry.volume == pytest.approx(60 * 120 * 2500)
+        assert beam.geometry.aabb.frame.point == beam.centerline.midpoint
+
+
+def test_geometry_instances(model):
+    instances = model.geometry_instances()
+
+    assert len(instances) == 1
+    assert instances[0].elements == model.beams
+    assert [t for t in instances[0].transformations] == [beam.modeltransformation for beam in model.beams]
+
+
+def test_different_features_are_not_shared(model):
+    beam = model.beams[0]
+    beam.add_features(JackRafterCut.from_plane_and_beam(Plane(Point(0, 0, 2000), Vector(0, 0, 1)), beam))
+
+    instances = model.geometry_instances()
+
+    assert sorted(len(instance.elements) for instance in instances) == [1, 5]
+    assert beam.geometry.volume == pytest.approx(60 * 120 * 2000)
+
+
+def test_changed_element_releases_shared_geometry():
+    model = TimberModel()
+    beam = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), width=60, height=120)
+    model.add_element(beam)
+    _ = beam.elementgeometry
+    beam.add_features(JackRafterCut.from_plane_and_beam(Plane(Point(500, 0, 0), Vector(1, 0, 0)), beam))
+    _ = beam.elementgeometry
+
+    assert len(model._shared_geometries) == 1
+
+
+def test_instancing_disabled(mocker):
+    model = TimberModel(instancing=False)
+    model.add_elements(_studs(3))
+    spy = mocker.spy(Beam, "compute_elementgeometry")
+
+    instances = model.geometry_instances()
+
+    assert spy.call_count == 4
+    assert len(instances) == 4
+
+
+def test_identical_plates_share_element_geometry(mocker):
+    outline = Polyline([Point(0, 0, 0), Point(0, 500, 0), Point(1000, 500, 0), Point(1000, 0, 0), Point(0, 0, 0)])
+    plates = [Plate.from_outline_thickness(outline.translated([0, 0, i * 100]), 20) for i in range(3)]
+    plates.append(Plate.from_outline_thickness(outline.transformed(Transformation.from_frame(Frame(Point(0, 0, 1000), [0, 1, 0], [0, 0, 1]))), 20))
+    model = TimberModel()
+    model.add_elements(plates)
+    spy = mocker.spy(Plate, "compute_elementgeometry")
+
+    instances = model.geometry_instances()
+
+    assert spy.call_count == 1
+    assert len(instances) == 1
+    assert all(plate.geometry.volume == pytest.approx(1000 * 500 * 20) for plate in plates)
+
+
+def test_feature_errors_are_reported_on_every_instance(mocker):
+    # the text processing is not supported by the mesh backend, so it fails on both beams
+    model = TimberModel(geometry_backend=GeometryBackend.MESH)
+    beams = _studs(2)[:2]
+    model.add_elements(beams)
+    for beam in beams:
+        beam.add_features(Text(text="A"))
+    spy = mocker.spy(Beam, "compute_elementgeometry")
+
+    for beam in beams:
+        _ = beam.elementgeometry
+
+    assert spy.call_count == 1
+    for beam in beams:
+        assert len(beam.debug_info) == 1
+        assert isinstance(beam.debug_info[0], FeatureApplicationError)
+        assert beam.debug_info[0].element_geometry.aabb().frame.point == beam.centerline.midpoint
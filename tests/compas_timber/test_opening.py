@@ -5,6 +5,7 @@ from compas.geometry import Point
 from compas.geometry import Polyline
 from compas.geometry import Vector
 from compas.tolerance import TOL
+from compas_brep import Brep
 
 from compas_timber.elements import Panel
 from compas_timber.panel_features.opening import Opening
@@ -159,3 +160,48 @@ def test_from_outline_panel_outlines_differ_by_thickness(flat_panel):
     # world-space outline_a and outline_b should differ by panel.thickness in z
     for pt_a, pt_b in zip(opening.outline_a.points, opening.outline_b.points):
         assert TOL.is_close(abs(pt_b[2] - pt_a[2]), flat_panel.thickness)
+
+
+# ==========================================================================
+# Opening.shape tests
+# ==========================================================================
+
+
+def test_opening_shape_extruded(simple_opening_outlines, mocker):
+    Opening.clear_shape_cache()
+    loft = mocker.spy(Brep, "from_loft")
+    opening = Opening(Frame.worldXY(), *simple_opening_outlines)
+
+    assert TOL.is_close(opening.shape.volume, 0.2)
+    assert loft.call_count == 0
+
+
+def test_opening_shape_lofted_if_outlines_are_not_translates():
+    Opening.clear_shape_cache()
+    outline_a = Polyline([Point(1, 1, 0), Point(2, 1, 0), Point(2, 2, 0), Point(1, 2, 0), Point(1, 1, 0)])
+    outline_b = Polyline([Point(1, 1, 0.2), Point(2.2, 1, 0.2), Point(2.2, 2, 0.2), Point(1, 2, 0.2), Point(1, 1, 0.2)])
+    opening = Opening(Frame.worldXY(), outline_a, outline_b)
+
+    assert TOL.is_close(opening.shape.volume, 0.22)
+
+
+def test_opening_shape_shared_between_openings(simple_opening_outlines, mocker):
+    Opening.clear_shape_cache()
+    outline_a, outline_b = simple_opening_outlines
+    opening = Opening(Frame.worldXY(), outline_a, outline_b)
+    other = Opening(Frame(Point(5, 0, 0), Vector(0, 1, 0), Vector(-1, 0, 0)), outline_a.copy(), outline_b.copy())
+    spy = mocker.spy(Opening, "_compute_shape")
+
+    assert opening.shape is other.shape
+    assert other.copy().shape is opening.shape
+    assert spy.call_count == 1
+
+
+def test_opening_shape_cache_size(simple_opening_outlines, monkeypatch):
+    Opening.clear_shape_cache()
+    monkeypatch.setattr(Opening, "SHAPE_CACHE_SIZE", 2)
+    outline_a, outline_b = simple_opening_outlines
+    for offset in range(3):
+        _ = Opening(Frame.worldXY(), outline_a.translated([offset, 0, 0]), outline_b.translated([offset, 0, 0])).shape
+
+    assert len(Opening._shape_cache) == 2
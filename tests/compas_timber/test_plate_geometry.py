@@ -10,6 +10,8 @@ from compas.data import json_loads
 from compas.tolerance import TOL
 
 from compas_timber.elements import PlateGeometry
+from compas_timber.elements import plate_geometry as plate_geometry_module
+from compas_timber.utils import move_polyline_segment_to_plane
 
 
 def test_plate_geometry_serialization():
@@ -192,3 +194,38 @@ def test_from_global_outlines_orientation_consistent_when_outline_b_flipped():
     # regardless of which side outline_b was offset to, local outline_b always ends up at +thickness
     assert all(TOL.is_close(p[2], pg_pos.thickness) for p in pg_pos.outline_b.points)
     assert all(TOL.is_close(p[2], pg_neg.thickness) for p in pg_neg.outline_b.points)
+
+
+def test_compute_shape_is_cached_per_outline_state(mocker):
+    polyline_a = Polyline([Point(0, 0, 0), Point(0, 20, 0), Point(10, 20, 0), Point(10, 0, 0), Point(0, 0, 0)])
+    polyline_b = Polyline([Point(0, 0, 1), Point(0, 20, 1), Point(10, 20, 1), Point(10, 0, 1), Point(0, 0, 1)])
+    pg = PlateGeometry(polyline_a, polyline_b)
+    spy = mocker.spy(plate_geometry_module, "brep_from_outlines")
+
+    shape = pg.compute_shape()
+    shape_again = pg.compute_shape()
+    pg.set_extension_plane(3, Plane([0, -1, 0], [0, -1, 0]))
+    extended_shape = pg.compute_shape()
+
+    assert spy.call_count == 2
+    assert shape is not shape_again  # callers get a copy they can modify
+    assert TOL.is_close(shape_again.volume, 200.0)
+    assert TOL.is_close(extended_shape.volume, 210.0)
+
+
+def test_apply_edge_extensions_matches_moving_single_segments():
+    polyline_a = Polyline([Point(0, 0, 0), Point(0, 20, 0), Point(5, 25, 0), Point(10, 20, 0), Point(10, 0, 0), Point(0, 0, 0)])
+    polyline_b = Polyline([Point(p[0], p[1], 2) for p in polyline_a.points])
+    pg = PlateGeometry(polyline_a, polyline_b)
+    pg.set_extension_plane(0, Plane([-1, 0, 0], [-1, 0, -0.5]))
+    pg.set_extension_plane(2, Plane([5, 26, 0], [1, 1.2, 0.3]))
+    pg.set_extension_plane(4, Plane([0, -2, 0], [0.1, -1, 0]))
+    expected = [polyline.copy() for polyline in (pg.outline_a, pg.outline_b)]
+    for polyline in expected:
+        for edge_index, plane in pg.edge_planes.items():
+            move_polyline_segment_to_plane(polyline, edge_index, plane)
+
+    pg.apply_edge_extensions()
+
+    for polyline, expected_polyline in zip((pg.outline_a, pg.outline_b), expected):
+        assert all(TOL.is_allclose(point, expected_point) for point, expected_point in zip(polyline.points, expected_polyline.points))
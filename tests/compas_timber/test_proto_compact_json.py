@@ -0,0 +1,127 @@
+import json
+import uuid
+
+import pytest
+from compas.data import json_dumps
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import LayerDefinition
+from compas_timber.elements import LayerStructure
+from compas_timber.elements import Panel
+from compas_timber.elements import Plate
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture
+def compact_json():
+    from compas_timber.proto import compact_json
+
+    return compact_json
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    model.name = "compact"
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(3000, 0, 0)), width=100.0, height=200.0)
+    beam_b = Beam.from_centerline(Line(Point(3000, 0, 0), Point(3000, 3000, 0)), width=100.0, height=200.0)
+    beam_c = Beam.from_centerline(Line(Point(1500, 0, 0), Point(1500, 2000, 0)), width=80.123456, height=160.0)
+    for beam in (beam_a, beam_b, beam_c):
+        model.add_element(beam)
+    beam_a.add_features(Drilling(start_x=100.0, diameter=12.0, depth=50.0, is_joinery=False))
+
+    outline = Polyline([Point(0, 0, 0), Point(1000, 0, 0), Point(1000, 1000, 0), Point(0, 1000, 0), Point(0, 0, 0)])
+    model.add_element(Plate.from_outline_thickness(outline, 20.0))
+    panel = Panel.from_outline_thickness(outline, 50.0)
+    panel.layer_structure = LayerStructure([LayerDefinition("exterior", 10.0), LayerDefinition("core", 40.0)])
+    model.add_element(panel)
+
+    LMiterJoint.create(model, beam_a, beam_b)
+    TButtJoint.create(model, beam_c, beam_a)
+    return model
+
+
+def minimal(model):
+    return json.loads(json_dumps(model, minimal=True))
+
+
+def test_compact_json_roundtrip(compact_json, model):
+    from compas_timber.proto.conversions import _model_to_pb
+
+    text = compact_json.model_to_json(model)
+    document = json.loads(text)
+    guids = document["model"].pop("guid_table")
+    msg = compact_json._build(type(_model_to_pb(model)), document["model"])
+    msg.guid_table = b"".join(uuid.UUID(guid).bytes for guid in guids)
+
+    assert msg == _model_to_pb(model)
+    assert minimal(compact_json.model_from_json(text)) == minimal(pb_load_bts(pb_dump_bts(model)))
+
+
+def test_compact_json_document(compact_json, model):
+    document = json.loads(compact_json.model_to_json(model))
+    data = document["model"]
+
+    assert document["format"] == compact_json.FORMAT
+    assert document["version"] == compact_json.VERSION
+    assert data["guid_table"][0] == str(model.guid)
+    assert data["name"] == "compact"
+    beam = data["elements"][0]["beam"]
+    assert isinstance(beam["guid"], int)
+    assert isinstance(beam["features"][0]["drilling"]["guid"], str)  # named once, so not in the table
+    assert data["columns"]["frames"][:3] == [0.0, 0.0, 0.0]
+    assert len(data["tree"]["parent"]) == len(list(model.elements())) + 1
+
+
+def test_compact_json_is_smaller(compact_json, model):
+    assert len(compact_json.model_to_json(model)) * 2 < len(json_dumps(model))
+
+
+def test_compact_json_quantize(compact_json, model):
+    precise = json.loads(compact_json.model_to_json(model))
+    rounded = json.loads(compact_json.model_to_json(model, quantize=True))
+
+    assert precise["model"]["elements"][2]["beam"]["width"] == 80.123456
+    assert rounded["model"]["elements"][2]["beam"]["width"] == round(80.123456, model.tolerance.precision)
+    loaded = compact_json.model_from_json(json.dumps(rounded))
+    assert [beam.width for beam in loaded.beams] == [100.0, 100.0, round(80.123456, model.tolerance.precision)]
+
+
+def test_compact_json_file(compact_json, model, tmp_path):
+    path = tmp_path / "model.json"
+    written = compact_json.write_model_json(model, path)
+
+    assert written == len(path.read_text())
+    assert minimal(compact_json.read_model_json(str(path))) == minimal(pb_load_bts(pb_dump_bts(model)))
+
+
+def test_read_model_json_reads_compas_json(compact_json, model, tmp_path):
+    path = tmp_path / "model.json"
+    path.write_text(json_dumps(model))
+
+    loaded = compact_json.read_model_json(path)
+
+    assert isinstance(loaded, TimberModel)
+    assert len(list(loaded.elements())) == 5
+    assert len(loaded.joints) == 2
+
+
+def test_compact_json_later_version(compact_json, model):
+    document = json.loads(compact_json.model_to_json(model))
+    document["version"] = compact_json.VERSION + 1
+
+    with pytest.raises(ValueError):
+        compact_json.model_from_json(json.dumps(document))
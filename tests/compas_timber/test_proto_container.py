@@ -0,0 +1,137 @@
+import io
+import json
+
+import pytest
+from compas.data import json_dumps
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import LayerDefinition
+from compas_timber.elements import LayerStructure
+from compas_timber.elements import Panel
+from compas_timber.elements import Plate
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture
+def container():
+    from compas_timber.proto import container
+
+    return container
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(3000, 0, 0)), width=100.0, height=200.0)
+    beam_b = Beam.from_centerline(Line(Point(3000, 0, 0), Point(3000, 3000, 0)), width=100.0, height=200.0)
+    beam_c = Beam.from_centerline(Line(Point(1500, 0, 0), Point(1500, 2000, 0)), width=80.0, height=160.0)
+    for beam in (beam_a, beam_b, beam_c):
+        model.add_element(beam)
+    beam_a.add_features(Drilling(start_x=100.0, diameter=12.0, depth=50.0, is_joinery=False))
+
+    outline = Polyline([Point(0, 0, 0), Point(1000, 0, 0), Point(1000, 1000, 0), Point(0, 1000, 0), Point(0, 0, 0)])
+    model.add_element(Plate.from_outline_thickness(outline, 20.0))
+    panel = Panel.from_outline_thickness(outline, 50.0)
+    panel.layer_structure = LayerStructure([LayerDefinition("exterior", 10.0), LayerDefinition("core", 40.0)])
+    model.add_element(panel)
+
+    LMiterJoint.create(model, beam_a, beam_b)
+    TButtJoint.create(model, beam_c, beam_a)
+    model.process_joinery()
+    return model
+
+
+def written(container, model):
+    stream = io.BytesIO()
+    container.write_model_container(model, stream)
+    return stream.getvalue()
+
+
+def test_container_roundtrip_matches_single_message(container, model):
+    other = container.read_model_container(io.BytesIO(written(container, model)))
+
+    assert json.loads(json_dumps(other, minimal=True)) == json.loads(json_dumps(pb_load_bts(pb_dump_bts(model)), minimal=True))
+    assert [len(beam.features) for beam in other.beams] == [1, 0, 0]  # joinery features are not serialized
+
+
+def test_container_geometry_settings(container, model):
+    model.instancing = False
+    data = written(container, model)
+
+    assert container.read_model_container(io.BytesIO(data)).instancing is False
+    assert container.read_model_container(io.BytesIO(data), guids=[model.beams[0].guid]).instancing is False
+
+
+def test_container_records(container, model):
+    reader = container.ModelContainerReader(io.BytesIO(written(container, model)))
+    records = list(reader.iter_records())
+
+    kinds = [(record.kind, record.type) for record in records]
+    assert kinds[:3] == [(container.ELEMENT, "Beam"), (container.FEATURES, "Beam"), (container.ELEMENT, "Beam")]
+    assert kinds[-2:] == [(container.JOINT, "LMiterJoint"), (container.JOINT, "TButtJoint")]
+    assert records[1].guid == records[0].guid
+    assert len(records[1].guid_table) == 0  # shares the table of its element record
+
+
+def test_container_header(container, model, tmp_path):
+    path = str(tmp_path / "model.ctmc")
+    container.write_model_container(model, path)
+
+    header = container.ModelContainerReader(path).read_header()
+
+    assert header.version == container.VERSION
+    assert header.element_count == len(list(model.elements()))
+    assert header.joint_count == 2
+
+
+def test_container_subset_by_guid(container, model):
+    beam_a, beam_b, beam_c = model.beams
+
+    subset = container.read_model_container(io.BytesIO(written(container, model)), guids=[beam_a.guid, str(beam_b.guid)])
+
+    assert [str(beam.guid) for beam in subset.beams] == [str(beam_a.guid), str(beam_b.guid)]
+    assert [type(joint).__name__ for joint in subset.joints] == ["LMiterJoint"]  # the T-butt joint needs beam_c
+    assert len(subset.beams[0].features) == 1
+    assert str(subset.guid) == str(model.guid)
+
+
+def test_container_subset_by_type_without_features(container, model):
+    data = written(container, model)
+
+    beams = list(container.ModelContainerReader(io.BytesIO(data)).iter_elements(types=["Beam"], features=False))
+    panels = container.read_model_container(io.BytesIO(data), types=[Panel], joints=False)
+
+    assert len(beams) == 3
+    assert all(not beam.features for beam in beams)
+    assert [type(element).__name__ for element in panels.elements()] == ["Panel"]
+
+
+def test_container_framing(container):
+    stream = io.BytesIO()
+    for value in (0, 127, 128, 2**31 + 1, 3 * 2**32):  # lengths past the 2 GB limit of a single message
+        stream.write(container._varint(value))
+    stream.seek(0)
+
+    assert [container._read_varint(stream) for _ in range(6)] == [0, 127, 128, 2**31 + 1, 3 * 2**32, None]
+
+
+def test_container_truncated_and_invalid(container, model):
+    data = written(container, model)
+
+    with pytest.raises(EOFError):
+        list(container.ModelContainerReader(io.BytesIO(data[:-5])).iter_records())
+    with pytest.raises(ValueError, match="Not a compas_timber model container"):
+        container.ModelContainerReader(io.BytesIO(b"PK" + data)).read_header()
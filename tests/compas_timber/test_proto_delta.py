@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from compas.data import json_dumps
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas.geometry import Translation
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import Plate
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture
+def delta():
+    from compas_timber.proto import delta
+
+    return delta
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(3000, 0, 0)), width=100.0, height=200.0)
+    beam_b = Beam.from_centerline(Line(Point(3000, 0, 0), Point(3000, 3000, 0)), width=100.0, height=200.0)
+    beam_c = Beam.from_centerline(Line(Point(1500, 0, 0), Point(1500, 2000, 0)), width=80.0, height=160.0)
+    for beam in (beam_a, beam_b, beam_c):
+        model.add_element(beam)
+    outline = Polyline([Point(0, 0, 0), Point(1000, 0, 0), Point(1000, 1000, 0), Point(0, 1000, 0), Point(0, 0, 0)])
+    model.add_element(Plate.from_outline_thickness(outline, 20.0))
+    LMiterJoint.create(model, beam_a, beam_b)
+    TButtJoint.create(model, beam_c, beam_a)
+    return model
+
+
+def copy_of(model):
+    return pb_load_bts(pb_dump_bts(model))
+
+
+def as_json(model):
+    return json.loads(json_dumps(model, minimal=True))
+
+
+def test_identical_models_give_an_empty_delta(delta, model):
+    assert delta.diff_models(model, copy_of(model)).ByteSize() == 0
+
+
+def test_changed_element_carries_only_the_changed_fields(delta, model):
+    target = copy_of(model)
+    target.beams[0].width = 120.0
+    target.beams[1].add_features(Drilling(start_x=100.0, diameter=12.0, is_joinery=False))
+
+    result = delta.diff_models(model, target)
+
+    changes = {str(_guid(change.element.beam.guid)): change for change in result.changed_elements}
+    assert set(changes) == {str(target.beams[0].guid), str(target.beams[1].guid)}
+    width = changes[str(target.beams[0].guid)]
+    assert [width.element.beam.DESCRIPTOR.fields_by_number[number].name for number in width.fields] == ["width"]
+    assert not width.element.beam.HasField("frame")
+    assert len(result.added_elements) == len(result.removed_elements) == len(result.joints) == 0
+
+
+def test_patch_gives_the_target(delta, model):
+    base = copy_of(model)
+    target = copy_of(model)
+    target.beams[0].width = 120.0
+    target.beams[2].transformation = Translation.from_vector([0, 0, 500]) * target.beams[2].transformation
+    target.remove_element(target.plates[0])
+    new_beam = target.add_element(Beam.from_centerline(Line(Point(0, 3000, 0), Point(3000, 3000, 0)), width=100.0, height=200.0))
+    LMiterJoint.create(target, target.beams[1], new_beam)
+
+    patched = delta.patch_model(base, delta.diff_models(base, target).SerializeToString())
+
+    assert patched is base
+    assert as_json(patched) == as_json(target)
+    assert {str(j.guid) for j in patched.joints} == {str(j.guid) for j in target.joints}
+    # the joints follow the patched elements
+    assert all(element is patched[str(element.guid)] for joint in patched.joints for element in joint.elements)
+
+
+def test_removed_joint(delta, model):
+    base = copy_of(model)
+    target = copy_of(model)
+    target.remove_joint(next(joint for joint in target.joints if isinstance(joint, TButtJoint)))
+
+    result = delta.diff_models(base, target)
+    delta.patch_model(base, result)
+
+    assert len(result.removed_joints) == 1
+    assert [type(joint).__name__ for joint in base.joints] == ["LMiterJoint"]
+
+
+def test_moved_element_is_added_again_with_its_joints(delta, model):
+    base = copy_of(model)
+    target = copy_of(model)
+    beam = target.beams[0]
+    joints = target.get_joints_for_element(beam)
+    target.remove_element(beam)
+    target.add_element(beam, parent=target.plates[0])
+    for joint in joints:
+        joint.restore_elements_from_keys(target)
+        target.add_joint(joint)
+
+    result = delta.diff_models(base, target)
+    delta.patch_model(base, result)
+
+    assert len(result.added_elements) == len(result.removed_elements) == 1
+    assert base[str(beam.guid)].parent is base.plates[0]
+    assert len(base.joints) == 2
+
+
+def test_delta_is_proportional_to_the_edit(delta):
+    model = TimberModel()
+    for index in range(200):
+        model.add_element(Beam.from_centerline(Line(Point(0, index * 500, 0), Point(3000, index * 500, 0)), width=100.0, height=200.0))
+    target = copy_of(model)
+    target.beams[7].height = 240.0
+
+    size = len(delta.diff_models(model, target).SerializeToString())
+
+    assert size < len(pb_dump_bts(model)) / 100
+
+
+def _guid(ref):
+    from compas_timber.proto.conversions import _guid_from_pb
+
+    return _guid_from_pb(ref)
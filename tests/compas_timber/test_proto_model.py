@@ -6,13 +6,22 @@ losing data.
 """
 
 import json
+import uuid
+from unittest.mock import patch
 
 import pytest
 from compas.data import json_dumps
 from compas.data import json_loads
+from compas.geometry import Frame
 from compas.geometry import Line
+from compas.geometry import Plane
 from compas.geometry import Point
 from compas.geometry import Polyline
+from compas.geometry import Reflection
+from compas.geometry import Scale
+from compas.geometry import Transformation
+from compas.geometry import Vector
+from compas.tolerance import TOL
 from compas_model.materials import Concrete
 from compas_model.materials import Material
 from compas_model.materials import Steel
@@ -143,6 +152,17 @@ def test_model_tree_and_graph_preserved(model):
     assert other.__data__["graph"] == model.__data__["graph"]
 
 
+def test_model_geometry_settings_preserved(model):
+    from compas_timber.geometry import GeometryBackend
+
+    model.geometry_backend = GeometryBackend.MESH
+    model.instancing = False
+    other = roundtrip(model)
+    assert other.geometry_backend == GeometryBackend.MESH
+    assert other.instancing is False
+    assert roundtrip(TimberModel()).instancing is True
+
+
 def test_empty_model_roundtrip():
     model = TimberModel()
     other = roundtrip(model)
@@ -160,7 +180,7 @@ def test_model_interns_guids_into_a_table(model):
 
     msg = _nested_to_pb(model)
     assert len(msg.guid_table) > 0
-    assert all(len(raw) == 16 for raw in msg.guid_table)
+    assert len(msg.guid_table) % 16 == 0  # 16 raw bytes per guid, back to back
     # inside a model every guid is an index into that table
     assert msg.guid.WhichOneof("id") == "index"
     assert msg.elements[0].beam.guid.WhichOneof("id") == "index"
@@ -177,11 +197,73 @@ def test_standalone_message_carries_the_guid_itself():
     assert str(roundtrip(beam).guid) == str(beam.guid)
 
 
+def test_guid_as_uuid_or_string_encodes_the_same():
+    from compas_timber.proto.common_pb2 import GuidRef
+    from compas_timber.proto.conversions import _guid_into
+
+    beam = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), 100.0, 200.0)
+    from_uuid, from_str = GuidRef(), GuidRef()
+    _guid_into(from_uuid, beam.guid)
+    _guid_into(from_str, str(beam.guid))
+    assert from_uuid == from_str
+    assert from_uuid.raw == beam.guid.bytes
+
+
+def test_guid_as_raw_bytes_encodes_the_same():
+    from compas_timber.proto.common_pb2 import GuidRef
+    from compas_timber.proto.conversions import _guid_into
+    from compas_timber.proto.conversions import _guid_table
+
+    guid = uuid.uuid4()
+    with _guid_table() as table:
+        from_uuid, from_bytes = GuidRef(), GuidRef()
+        _guid_into(from_uuid, guid)
+        _guid_into(from_bytes, guid.bytes)
+    assert from_uuid == from_bytes
+    assert table.entries == [guid.bytes]
+
+
+def test_packed_guid_table_resolves_entries_when_referenced():
+    from compas_timber.proto.conversions import _PackedGuidTable
+
+    guids = [uuid.uuid4() for _ in range(3)]
+    table = _PackedGuidTable(b"".join(guid.bytes for guid in guids))
+
+    assert len(table) == 3
+    assert table.resolve(1) == str(guids[1])
+    assert table.resolve_uuid(2) == guids[2]
+    assert list(table._strings) == [1]  # the others were not converted
+    with pytest.raises(IndexError):
+        table.resolve(3)
+
+
+def test_decoded_objects_get_uuid_guids(model):
+    other = roundtrip(model)
+
+    assert isinstance(other.guid, uuid.UUID)
+    assert other.guid == model.guid
+    assert [beam.guid for beam in other.beams] == [beam.guid for beam in model.beams]
+    assert all(isinstance(feature.guid, uuid.UUID) for feature in other.beams[0].features)
+
+
+def test_field_codecs_are_compiled_once_per_field():
+    from compas_timber.proto import model_pb2
+    from compas_timber.proto.conversions import _decoder
+    from compas_timber.proto.conversions import _encoder
+
+    field = model_pb2.TimberModelData.DESCRIPTOR.fields_by_name["elements"]
+    assert _encoder(field) is _encoder(field)
+    assert _decoder(field) is _decoder(field)
+
+
 def test_guid_table_holds_each_guid_once(model):
     from compas_timber.proto.conversions import _nested_to_pb
 
+    from compas_timber.proto.conversions import _unpack_guid_table
+
     msg = _nested_to_pb(model)
-    assert len(set(msg.guid_table)) == len(msg.guid_table)
+    table = _unpack_guid_table(msg.guid_table)
+    assert len(set(table)) == len(table)
 
 
 def test_model_is_smaller_than_the_same_data_without_interning(model):
@@ -191,6 +273,51 @@ def test_model_is_smaller_than_the_same_data_without_interning(model):
     assert packed < as_json / 2
 
 
+# ---------------------------------------------------------------------------
+# geometry columns
+# ---------------------------------------------------------------------------
+
+
+def test_model_packs_frames_and_outlines_into_columns(model):
+    from compas_timber.proto.conversions import _nested_to_pb
+
+    msg = _nested_to_pb(model)
+    beam = msg.elements[0].beam
+    plate = msg.elements[3].plate
+    assert beam.HasField("frame_ref") and not beam.HasField("frame")
+    assert plate.plate_geometry.HasField("local_outline_a_ref")
+    assert len(msg.columns.frames) == 9 * 8 * len(model.beams) + 9 * 8 * 2  # beams, then plate and panel geometry
+    assert len(msg.columns.polyline_lengths) == 4
+
+
+def test_standalone_message_keeps_its_frame_inline():
+    from compas_timber.proto.conversions import _nested_to_pb
+
+    beam = Beam.from_centerline(Line(Point(0, 0, 0), Point(1000, 0, 0)), 100.0, 200.0)
+    msg = _nested_to_pb(beam)
+    assert msg.HasField("frame") and not msg.HasField("frame_ref")
+    assert roundtrip(beam).frame == beam.frame
+
+
+def test_named_outline_is_not_packed(model):
+    from compas_timber.proto.conversions import _nested_to_pb
+
+    plate = next(e for e in model.elements() if type(e).__name__ == "Plate")
+    plate.plate_geometry._original_outlines[0].name = "top"
+    geometry = _nested_to_pb(model).elements[3].plate.plate_geometry
+    assert geometry.local_outline_a.name == "top" and not geometry.HasField("local_outline_a_ref")
+    assert geometry.HasField("local_outline_b_ref")
+
+    other = next(e for e in roundtrip(model).elements() if type(e).__name__ == "Plate")
+    assert other.plate_geometry._original_outlines[0].name == "top"
+
+
+def test_columns_decode_to_plain_floats(model):
+    frame = roundtrip(model).beams[1].frame
+    assert frame == model.beams[1].frame
+    assert type(frame.point.x) is float
+
+
 # ---------------------------------------------------------------------------
 # materials
 # ---------------------------------------------------------------------------
@@ -279,3 +406,69 @@ def test_graph_unknown_edge_attribute_still_roundtrips(model):
     assert other._graph.edge_attribute(edge, "some_future_attribute") == {"a": 1, "b": [2.0, "three"]}
     # and the guid-valued one next to it is still interned
     assert other._graph.edge_attribute(edge, "joints") == model._graph.edge_attribute(edge, "joints")
+
+
+# ---------------------------------------------------------------------------
+# codec cost
+# ---------------------------------------------------------------------------
+
+
+def test_codecs_are_compiled_once(model):
+    # the codec of a field is compiled when its message is registered, not per value
+    from compas_timber.proto import conversions
+
+    pb_dump_bts(model)
+    with patch.object(conversions, "_compile_encoder", side_effect=AssertionError), patch.object(conversions, "_compile_decoder", side_effect=AssertionError):
+        roundtrip(model)
+
+
+def test_beam_frames_are_not_decomposed():
+    # decomposing the transformation of every beam was most of the time of dumping a model of beams
+    model = TimberModel()
+    for i in range(3):
+        beam = Beam.from_centerline(Line(Point(0, 1000 * i, 0), Point(3000, 1000 * i, 500)), width=100.0, height=200.0)
+        beam.add_features(Drilling(start_x=500.0, diameter=20.0, is_joinery=False))
+        model.add_element(beam)
+
+    with patch.object(Frame, "from_transformation", side_effect=AssertionError):
+        data = pb_dump_bts(model)
+
+    assert [beam.frame for beam in pb_load_bts(data).beams] == [beam.frame for beam in model.beams]
+
+
+def test_beam_encoder_data_matches_beam_data(model):
+    from compas_timber.proto.conversions import _beam_data
+
+    for beam in model.beams:
+        beam.attributes["category"] = "rafter"
+        data, expected = _beam_data(beam), beam.__data__
+
+        assert list(data) == list(expected)
+        assert data == expected
+
+
+_FRAME = Frame(Point(100, 200, 300), Vector(1, 1, 0), Vector(-1, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "transformation",
+    [
+        Transformation.from_frame(_FRAME),
+        Transformation.from_frame(_FRAME) * Scale.from_factors([2.0, 0.5, 3.0]),
+        Transformation.from_frame(_FRAME) * Reflection.from_plane(Plane([0, 0, 0], [1, 0, 0])),
+        Transformation.from_matrix([[1, 0.5, 0.2, 3], [0.3, 1, 0.4, 2], [0.1, 0.2, 2, 1], [0, 0, 0, 1]]),
+    ],
+    ids=["rigid", "scaled", "mirrored", "sheared"],
+)
+def test_encoded_beam_frame_is_the_decomposed_frame(transformation):
+    model = TimberModel()
+    beam = Beam(Frame.worldXY(), length=1000.0, width=100.0, height=60.0)
+    model.add_element(beam)
+    beam.transformation = transformation
+    expected = Frame.from_transformation(beam.modeltransformation)
+
+    frame = pb_load_bts(pb_dump_bts(model)).beams[0].frame
+
+    assert TOL.is_allclose(frame.point, expected.point)
+    assert TOL.is_allclose(frame.xaxis, expected.xaxis)
+    assert TOL.is_allclose(frame.yaxis, expected.yaxis)
@@ -0,0 +1,124 @@
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from compas.data import json_dumps
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+from compas_pb.generated import message_pb2
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import Plate
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+from compas_timber.proto import model_pb2
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture
+def parallel():
+    from compas_timber.proto import parallel
+
+    return parallel
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    beams = [Beam.from_centerline(Line(Point(0, 1000 * i, 0), Point(3000, 1000 * i, 0)), width=100.0, height=200.0) for i in range(4)]
+    for beam in beams:
+        model.add_element(beam)
+    beams[0].add_features(Drilling(start_x=100.0, diameter=12.0, depth=50.0, is_joinery=False))
+    cross = Beam.from_centerline(Line(Point(1500, -500, 0), Point(1500, 3500, 0)), width=80.0, height=160.0)
+    model.add_element(cross)
+
+    outline = Polyline([Point(0, 0, 0), Point(1000, 0, 0), Point(1000, 1000, 0), Point(0, 1000, 0), Point(0, 0, 0)])
+    model.add_element(Plate.from_outline_thickness(outline, 20.0))
+
+    LMiterJoint.create(model, beams[0], beams[1])
+    for beam in beams[1:]:
+        TButtJoint.create(model, cross, beam)
+    model.process_joinery()
+    return model
+
+
+def as_json(model):
+    return json.loads(json_dumps(model, minimal=True))
+
+
+def deterministic(data):
+    # pb_dump_bts serializes map entries in no particular order, the model is serialized again with sorted ones
+    envelope = message_pb2.MessageData.FromString(data)
+    msg = model_pb2.TimberModelData()
+    assert envelope.data.message.Unpack(msg)
+    envelope.data.message.Pack(msg, deterministic=True)
+    return envelope.SerializeToString(deterministic=True)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_parallel_bytes_match_serial(parallel, model, chunk_size):
+    serial = deterministic(pb_dump_bts(model))
+
+    with patch.object(parallel, "ProcessPoolExecutor", wraps=ProcessPoolExecutor) as executor:
+        data = parallel.dump_model_bts(model, workers=2, chunk_size=chunk_size)
+
+    assert executor.called
+    assert data == serial
+    assert parallel.dump_model_bts(model, workers=1) == serial
+    assert as_json(pb_load_bts(data)) == as_json(pb_load_bts(pb_dump_bts(model)))
+
+
+def test_no_fork_with_other_threads_running(parallel, model):
+    # a forked worker could deadlock on a lock the other thread holds
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    thread.start()
+    try:
+        with patch.object(parallel, "ProcessPoolExecutor", side_effect=AssertionError("forked with threads running")):
+            data = parallel.dump_model_bts(model, workers=2, chunk_size=1)
+    finally:
+        release.set()
+        thread.join()
+
+    assert data == deterministic(pb_dump_bts(model))
+
+
+def test_guids_are_settled_before_the_workers_start(parallel, model):
+    # the drilling has not been asked for its guid yet, a worker would make one up
+    data = parallel.dump_model_bts(model, workers=2)
+
+    assert data == parallel.dump_model_bts(model, workers=1)
+
+
+def test_refs_inside_any_data_fall_back_to_serial(parallel, model):
+    # a Beam in the attributes is packed into AnyData, its frame ref can not be moved without decoding it
+    model.beams[2].attributes["twin"] = Beam.from_centerline(Line(Point(0, 0, 9), Point(10, 0, 0)), width=10.0, height=20.0)
+
+    data = parallel.dump_model_bts(model, workers=2, chunk_size=2)
+
+    assert data == parallel.dump_model_bts(model, workers=1)
+    assert pb_load_bts(data).beams[2].attributes["twin"].frame == model.beams[2].attributes["twin"].frame
+
+
+def test_guid_table_holds_the_shared_guids_only(model):
+    from compas_timber.proto.conversions import _model_to_pb
+    from compas_timber.proto.conversions import _unpack_guid_table
+
+    msg = _model_to_pb(model)
+    table = _unpack_guid_table(msg.guid_table)
+
+    assert table == [str(model.guid)] + list(model._elements) + list(model._materials) + list(model._joints)
+    feature = msg.elements[0].beam.features[0]
+    drilling = getattr(feature, feature.WhichOneof(feature.DESCRIPTOR.oneofs[0].name))
+    assert drilling.guid.WhichOneof("id") == "raw"  # named once, so not worth a table entry
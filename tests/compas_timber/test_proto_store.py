@@ -0,0 +1,139 @@
+import json
+
+import pytest
+from compas.data import json_dumps
+from compas.geometry import Line
+from compas.geometry import Point
+from compas.geometry import Polyline
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+from compas_timber.connections import LMiterJoint
+from compas_timber.connections import TButtJoint
+from compas_timber.elements import Beam
+from compas_timber.elements import LayerDefinition
+from compas_timber.elements import LayerStructure
+from compas_timber.elements import Panel
+from compas_timber.elements import Plate
+from compas_timber.fabrication import Drilling
+from compas_timber.model import TimberModel
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture
+def store_module():
+    from compas_timber.proto import store
+
+    return store
+
+
+@pytest.fixture
+def model():
+    model = TimberModel()
+    model.name = "store"
+    beam_a = Beam.from_centerline(Line(Point(0, 0, 0), Point(3000, 0, 0)), width=100.0, height=200.0)
+    beam_b = Beam.from_centerline(Line(Point(3000, 0, 0), Point(3000, 3000, 0)), width=100.0, height=200.0)
+    beam_c = Beam.from_centerline(Line(Point(1500, 0, 0), Point(1500, 2000, 0)), width=80.0, height=160.0)
+    outline = Polyline([Point(0, 0, 0), Point(1000, 0, 0), Point(1000, 1000, 0), Point(0, 1000, 0), Point(0, 0, 0)])
+    panel = Panel.from_outline_thickness(outline, 50.0)
+    panel.layer_structure = LayerStructure([LayerDefinition("exterior", 10.0), LayerDefinition("core", 40.0)])
+    model.add_element(panel)
+    for beam in (beam_a, beam_b, beam_c):
+        model.add_element(beam, parent=panel)
+    model.add_element(Plate.from_outline_thickness(outline, 20.0))
+    beam_a.add_features(Drilling(start_x=100.0, diameter=12.0, depth=50.0, is_joinery=False))
+
+    LMiterJoint.create(model, beam_a, beam_b)
+    TButtJoint.create(model, beam_c, beam_a)
+    return model
+
+
+@pytest.fixture
+def store(store_module, model, tmp_path):
+    path = str(tmp_path / "model.ctms")
+    store_module.write_model_store(model, path)
+    with store_module.ModelStore(path) as store:
+        yield store
+
+
+def as_json(model):
+    return json.loads(json_dumps(model, minimal=True))
+
+
+def test_store_loads_the_whole_model(store, model):
+    assert as_json(store.load_model()) == as_json(pb_load_bts(pb_dump_bts(model)))
+    assert store.guid == str(model.guid)
+    assert store.name == "store"
+
+
+def test_store_decodes_only_what_is_asked_for(store, model):
+    beam_a = model.beams[0]
+
+    element = store[str(beam_a.guid)]
+
+    assert list(store._hydrated) == [1]
+    assert store.get_element(beam_a.guid) is element
+    assert element.has_deferred_features
+    assert [type(feature).__name__ for feature in element.features] == ["Drilling"]
+    assert store.get_element("00000000-0000-0000-0000-000000000000") is None
+
+
+def test_store_elements_stay_usable_after_close(store_module, model, tmp_path):
+    path = str(tmp_path / "model.ctms")
+    store_module.write_model_store(model, path)
+    with store_module.ModelStore(path) as store:
+        element = store[str(model.beams[0].guid)]
+        joints = store.joints
+
+    assert element.has_deferred_features
+    assert [type(feature).__name__ for feature in element.features] == ["Drilling"]
+    assert element.features[0].diameter == 12.0
+    assert joints[1].cross_beam is element
+
+
+def test_store_queries_by_type(store, model):
+    assert [str(beam.guid) for beam in store.beams] == [str(beam.guid) for beam in model.beams]
+    assert store.guids(types=[Panel, "Plate"]) == [str(model.panels[0].guid), str(model.plates[0].guid)]
+    assert len(store._hydrated) == 3
+    assert len(store) == 5
+    assert [type(element).__name__ for element in store.elements()] == ["Panel", "Beam", "Beam", "Beam", "Plate"]
+
+
+def test_store_joints_and_parents(store, model):
+    beam_a, _, beam_c = store.beams
+
+    joints = store.get_joints_for_element(beam_c)
+
+    assert [type(joint).__name__ for joint in joints] == ["TButtJoint"]
+    assert joints[0].main_beam is beam_c and joints[0].cross_beam is beam_a
+    assert [type(joint).__name__ for joint in store.joints] == ["LMiterJoint", "TButtJoint"]
+    assert store.parent_of(beam_a) is store.panels[0]
+    assert store.parent_of(store.panels[0]) is None
+
+
+def test_store_loads_a_part_of_the_model(store, model):
+    beam_a, beam_b, _ = model.beams
+
+    part = store.load_model(guids=[beam_a.guid, beam_b.guid, model.panels[0].guid], features=False)
+
+    assert [type(element).__name__ for element in part.elements()] == ["Panel", "Beam", "Beam"]
+    assert part.beams[0].parent is part.panels[0]
+    assert [type(joint).__name__ for joint in part.joints] == ["LMiterJoint"]
+    assert not part.beams[0].features
+
+
+def test_store_invalid_and_truncated(store_module, model, tmp_path):
+    path = tmp_path / "model.ctms"
+    store_module.write_model_store(model, str(path))
+    data = path.read_bytes()
+
+    path.write_bytes(data[:-3])
+    with pytest.raises(EOFError):
+        store_module.ModelStore(str(path))
+    path.write_bytes(b"CTMC" + data[4:])
+    with pytest.raises(ValueError, match="Not a compas_timber model store"):
+        store_module.ModelStore(str(path))
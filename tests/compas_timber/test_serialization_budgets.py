@@ -0,0 +1,48 @@
+"""Size budgets of the protobuf and JSON encodings of representative objects.
+
+A codec change which makes one of them larger than its budget fails here. If the growth is intended, record new
+budgets with ``python scripts/benchmark_serialization.py --update``, which also measures and checks the encode and
+decode times.
+"""
+
+import json
+import os
+
+import pytest
+from compas.data import json_dumps
+from compas.data import json_loads
+from compas_pb import pb_dump_bts
+from compas_pb import pb_load_bts
+
+from fixtures.serialization_models import COUNT
+from fixtures.serialization_models import MODELS
+
+BUDGETS = os.path.join(os.path.dirname(__file__), "fixtures", "serialization_budgets.json")
+
+
+@pytest.fixture(autouse=True)
+def load_serializers():
+    import compas_timber.proto.conversions  # noqa: F401
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    with open(BUDGETS) as f:
+        return json.load(f)
+
+
+def test_every_object_has_a_budget(budgets):
+    assert sorted(budgets) == sorted(MODELS)
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_size_within_budget(budgets, name):
+    obj = MODELS[name](COUNT)
+
+    data = pb_dump_bts(obj)
+    text = json_dumps(obj)
+
+    assert len(data) <= budgets[name]["protobuf_bytes"]
+    assert len(text.encode("utf-8")) <= budgets[name]["json_bytes"]
+    assert type(pb_load_bts(data)) is type(obj)
+    assert type(json_loads(text)) is type(obj)